@@ -0,0 +1,246 @@
+"""
+Benchmark suite for the backend hot paths, run against recorded upstream fixtures
+(benchmarks/fixtures/) so it needs no network access.
+
+Each benchmark reports per-call latency (median / p95 / mean) and allocations
+(peak traced bytes during one call, via tracemalloc). Results are compared against
+a JSON baseline so regressions are caught in CI or before merging:
+
+    python benchmarks/bench.py                      # run and compare to baseline.json
+    python benchmarks/bench.py --update             # run and overwrite baseline.json
+    python benchmarks/bench.py -k parse --json out.json
+
+Exit code is 1 if any benchmark regresses past the tolerances.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import journal  # noqa: E402
+import simulator  # noqa: E402
+import util  # noqa: E402
+import wire  # noqa: E402
+from pbp import actions_frame  # noqa: E402
+from standings import normalize_league_standings  # noqa: E402
+from util import (  # noqa: E402
+    calculate, compute_win_probabilities, list_model_names, load_model,
+    merge_gp, parse_dashboard_game_data, parse_game_data, parse_scoreboard, parse_status,
+)
+
+BROADCAST_CLIENTS = (1, 100, 1000)
+JOURNAL_SNAPSHOTS = 500  # size of the journal journal_latest restores from
+STATUSES = [
+    "Final", "Final/OT", "1:23 - 4th", "40.2 - 4th", "7:07 - 3rd", "Halftime",
+    "End of 1st", "3:10 - 2nd", "2/11 - 7:30 PM EST", "0:04.1 - 2OT",
+]
+
+
+def load_fixture(name: str) -> Any:
+    with open(FIXTURES_DIR / name) as f:
+        return json.load(f)
+
+
+class _NullWebSocket:
+    """Stand-in client that accepts every frame and discards it."""
+
+    async def send_text(self, data: str) -> None:
+        pass
+
+    async def send_bytes(self, data: bytes) -> None:
+        pass
+
+
+def _model_benchmarks(games: list) -> dict[str, Callable[[], Any]]:
+    benches = {}
+    for name in list_model_names():
+        try:
+            model = load_model(name)
+        except Exception as e:
+            print(f"  skipping model {name}: {e}")
+            continue
+
+        def with_model(fn, model=model):
+            def run():
+                previous, util._wp_model = util._wp_model, model
+                try:
+                    return fn()
+                finally:
+                    util._wp_model = previous
+            return run
+
+        benches[f"calculate[{name}]"] = with_model(
+            lambda: calculate(88, 84, 30, 24, 28, 26, 6, 4, "1:23 - 4th")
+        )
+        benches[f"compute_win_probabilities[{name}]"] = with_model(
+            lambda: compute_win_probabilities(games)
+        )
+    return benches
+
+
+def _broadcast_benchmarks(payload: list[dict]) -> dict[str, Callable[[], Any]]:
+    from main import ConnectionManager
+
+    loop = asyncio.new_event_loop()
+    benches = {}
+    for n in BROADCAST_CLIENTS:
+        manager = ConnectionManager()
+        manager.active_connections.extend(_NullWebSocket() for _ in range(n))
+        benches[f"broadcast_json[{n}]"] = (
+            lambda manager=manager: loop.run_until_complete(manager.broadcast_json(payload))
+        )
+    for fmt in wire.available_formats():
+        benches[f"encode_games[{fmt}]"] = lambda fmt=fmt: wire.encode_games(payload, fmt)
+    return benches
+
+
+def _journal_benchmarks(games: list) -> dict[str, Callable[[], Any]]:
+    """Per-poll append and the boot-time restore, in throwaway directories."""
+    appended = journal.Journal(Path(tempfile.mkdtemp(prefix="bench-journal-")), 4 * 1024 * 1024, 2)
+    # latest() reads its own journal of a fixed size, not the one journal_append keeps growing
+    restored = journal.Journal(Path(tempfile.mkdtemp(prefix="bench-journal-")), 4 * 1024 * 1024, 2)
+    for i in range(JOURNAL_SNAPSHOTS):
+        restored.append(1_700_000_000.0 + i, games)
+    return {
+        "journal_append": lambda: appended.append(time.time(), games),
+        "journal_latest": restored.latest,
+    }
+
+
+def build_benchmarks() -> dict[str, Callable[[], Any]]:
+    scoreboard = load_fixture("espn_scoreboard.json")
+    standings = load_fixture("standings.json")
+    actions = load_fixture("playbyplay.json")["game"]["actions"]
+    events = scoreboard["events"]
+    games = parse_scoreboard(events)
+    for game in games:
+        game.home_win_prob, game.away_win_prob = 55.0, 45.0
+    full_games = [g.full_dict(extras=False) for g in games]
+    probabilities = {g.game_id: {"home_win_prob": 55.0, "away_win_prob": 45.0} for g in games}
+    payload = [g.dashboard_dict() for g in games]
+
+    benches: dict[str, Callable[[], Any]] = {
+        "parse_dashboard_game_data": lambda: [parse_dashboard_game_data(e) for e in events],
+        "parse_game_data": lambda: [parse_game_data(e) for e in events],
+        "parse_scoreboard": lambda: parse_scoreboard(events),
+        "parse_status": lambda: [parse_status(s) for s in STATUSES],
+        "merge_gp": lambda: merge_gp(full_games, probabilities),
+        "dashboard_payload": lambda: [g.dashboard_dict() for g in games],
+        "full_payload": lambda: [g.full_dict() for g in games],
+        "normalize_league_standings": lambda: normalize_league_standings(standings),
+        "actions_frame": lambda: actions_frame(actions),
+        # Uncached: one full-game Monte Carlo (the point tables are built on the first call)
+        "simulate_100k": lambda: simulator.simulate(0, 0, 2880, 1.16, 1.13, 100_000),
+    }
+    benches.update(_model_benchmarks(games))
+    benches.update(_broadcast_benchmarks(payload))
+    benches.update(_journal_benchmarks(games))
+    return benches
+
+
+def measure(fn: Callable[[], Any], min_time: float = 0.5, max_iters: int = 10_000) -> dict[str, float]:
+    """Time `fn` until `min_time` seconds or `max_iters` calls, then trace one call's allocations."""
+    for _ in range(3):
+        fn()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_iters and (len(samples) < 5 or time.perf_counter() < deadline):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - start)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fn()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "iterations": len(samples),
+        "median_us": statistics.median(samples) / 1000,
+        "p95_us": samples[min(len(samples) - 1, int(len(samples) * 0.95))] / 1000,
+        "mean_us": statistics.fmean(samples) / 1000,
+        "peak_alloc_bytes": peak - before,
+        "retained_bytes": after - before,
+    }
+
+
+def compare(results: dict, baseline: dict, latency_tol: float, alloc_tol: float) -> list[str]:
+    """Names + reasons of benchmarks that regressed against the baseline."""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if r["median_us"] > base["median_us"] * (1 + latency_tol):
+            regressions.append(f"{name}: median {base['median_us']:.1f}us -> {r['median_us']:.1f}us")
+        if r["peak_alloc_bytes"] > base["peak_alloc_bytes"] * (1 + alloc_tol) + 1024:
+            regressions.append(
+                f"{name}: peak alloc {base['peak_alloc_bytes']:,}B -> {r['peak_alloc_bytes']:,}B"
+            )
+    return regressions
+
+
+def print_table(results: dict, baseline: dict) -> None:
+    print(f"\n{'benchmark':<44}{'median us':>12}{'p95 us':>12}{'peak alloc':>14}{'vs base':>10}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        delta = f"{100 * (r['median_us'] / base['median_us'] - 1):+.0f}%" if base else "new"
+        print(f"{name:<44}{r['median_us']:>12.1f}{r['p95_us']:>12.1f}{r['peak_alloc_bytes']:>14,}{delta:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark backend hot paths against recorded fixtures.")
+    parser.add_argument("-k", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend timing each benchmark")
+    parser.add_argument("--update", action="store_true", help="overwrite the baseline with these results")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--latency-tol", type=float, default=0.5, help="allowed median slowdown (0.5 = 50%%)")
+    parser.add_argument("--alloc-tol", type=float, default=0.10, help="allowed peak allocation growth")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    benches = build_benchmarks()
+    results = {}
+    for name, fn in benches.items():
+        if args.k and args.k not in name:
+            continue
+        results[name] = measure(fn, args.min_time)
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text())["results"] if baseline_path.is_file() else {}
+    print_table(results, baseline)
+
+    doc = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(), "platform": platform.platform()},
+        "results": results,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(doc, indent=2))
+    if args.update:
+        if baseline_path.is_file() and args.k:
+            doc["results"] = {**baseline, **results}
+        baseline_path.write_text(json.dumps(doc, indent=2) + "\n")
+        print(f"\nBaseline written to {baseline_path}")
+        sys.exit(0)
+
+    regressions = compare(results, baseline, args.latency_tol, args.alloc_tol)
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
@@ -0,0 +1,53 @@
+"""
+Re-record the upstream fixtures used by bench.py from the live services.
+
+    python benchmarks/record_fixtures.py --date 20260211 --pbp-game 0022500788
+
+Pick a busy slate (ideally with games in every state) so the parse benchmarks
+cover pregame, live and final events.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import requests
+
+BENCH_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from pbp import CDN_HEADERS, PBP_URL  # noqa: E402
+
+SCOREBOARD_URL = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
+LINEUPS_URL = "https://stats.nba.com/js/data/leaders/00_daily_lineups_{game_date}.json"
+
+
+def _write(name: str, payload) -> None:
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    (FIXTURES_DIR / name).write_text(json.dumps(payload, separators=(",", ":")))
+    print(f"wrote {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--date", required=True, help="slate date, YYYYMMDD")
+    parser.add_argument("--pbp-game", required=True, help="NBA game id for the play-by-play fixture")
+    args = parser.parse_args()
+
+    resp = requests.get(SCOREBOARD_URL, params={"dates": args.date}, timeout=10)
+    resp.raise_for_status()
+    _write("espn_scoreboard.json", resp.json())
+
+    from nba_api.stats.endpoints import leaguestandings
+    _write("standings.json", leaguestandings.LeagueStandings().get_dict())
+
+    resp = requests.get(LINEUPS_URL.format(game_date=args.date), headers=CDN_HEADERS, timeout=10)
+    if resp.ok:
+        _write("lineups.json", resp.json())
+    else:
+        print(f"lineups not available ({resp.status_code}); keeping the old fixture")
+
+    resp = requests.get(PBP_URL.format(game_id=args.pbp_game), headers=CDN_HEADERS, timeout=10)
+    resp.raise_for_status()
+    _write("playbyplay.json", resp.json())
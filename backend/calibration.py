@@ -0,0 +1,201 @@
+"""
+Streaming calibration monitor for the live win probabilities.
+
+Every probability the server emits for a game in play (each poll, and each per-play
+update from live_pbp.py) is observed with its game state, unless it's the same as the
+game's last one. Nothing is kept per prediction: each is folded into the game's pending
+sums for its group (model version, source, quarter, margin bucket):
+
+    n, sum p, sum p^2, sum log p, sum log(1 - p), and per probability bin: n, sum p
+
+Those are enough to settle every prediction at once when the game goes Final and its
+outcome y is known (Brier = sum p^2 - 2y sum p + y n; log loss from the log sums), so
+the settled totals are fixed-size arrays per group however long a game runs. Games that
+leave the slate without a result are dropped.
+
+Totals are saved to CALIBRATION_PATH on each settle and reloaded on boot, exposed at
+/api/monitor/calibration and as calibration_brier / calibration_log_loss gauges, so a
+regression shows up the night it ships.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from metrics import CALIBRATION_BRIER, CALIBRATION_LOG_LOSS, CALIBRATION_PREDICTIONS
+from models.game_state import GameState
+from scheduler import game_phase
+from util import parse_status
+
+BINS = 10
+MARGIN_BUCKETS = ((0, 5), (6, 10), (11, 20), (21, None))
+_EPS = 1e-6
+
+# Pending vector: n, sum p, sum p^2, sum log p, sum log(1-p), then bin counts and bin sums of p
+_PENDING = 5 + 2 * BINS
+# Settled vector: n, Brier sum, log loss sum, then bin counts, bin sums of p, bin wins
+_SETTLED = 3 + 3 * BINS
+
+Group = tuple[str, str, str, str]  # model, source, quarter, margin
+
+
+def quarter(status: str) -> str | None:
+    """Q1..Q4 or OT; a break between quarters counts as the next one."""
+    period, _ = parse_status(status)
+    if period is None:
+        return None
+    return f"Q{period}" if period <= 4 else "OT"
+
+
+def margin_bucket(margin: int) -> str:
+    margin = abs(margin)
+    for lo, hi in MARGIN_BUCKETS[:-1]:
+        if margin <= hi:
+            return f"{lo}-{hi}"
+    return f"{MARGIN_BUCKETS[-1][0]}+"
+
+
+class CalibrationMonitor:
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.pending: dict[str, dict[Group, np.ndarray]] = {}  # game_id -> group -> sums
+        self.settled: dict[Group, np.ndarray] = {}
+        self._last: dict[str, float] = {}  # game_id -> last observed home probability
+        if path is not None:
+            self._load()
+
+    def observe(self, games: list[GameState], model: str, source: str) -> int:
+        """Add each game's current home win probability; returns how many were new."""
+        added = 0
+        for game in games:
+            p = game.home_win_prob
+            if p is None or game_phase(game.status) in ("pre", "final") or self._last.get(game.game_id) == p:
+                continue
+            q = quarter(game.status)
+            if q is None:
+                continue
+            self._last[game.game_id] = p
+            group = (model, source, q, margin_bucket(game.home.score - game.away.score))
+            sums = self.pending.setdefault(game.game_id, {}).get(group)
+            if sums is None:
+                sums = self.pending[game.game_id][group] = np.zeros(_PENDING)
+            p = min(max(p / 100, _EPS), 1 - _EPS)
+            b = min(int(p * BINS), BINS - 1)
+            sums[:5] += (1.0, p, p * p, np.log(p), np.log1p(-p))
+            sums[5 + b] += 1
+            sums[5 + BINS + b] += p
+            added += 1
+        CALIBRATION_PREDICTIONS.inc(amount=added)
+        return added
+
+    def settle(self, games: list[GameState]) -> int:
+        """
+        Settle the pending predictions of games that are now Final, and drop state for
+        games that left the slate. Returns how many games were settled.
+        """
+        settled = 0
+        for game in games:
+            if not game.status.startswith("Final") or game.game_id not in self.pending:
+                continue
+            y = 1.0 if game.home.score > game.away.score else 0.0
+            for group, s in self.pending.pop(game.game_id).items():
+                total = self.settled.get(group)
+                if total is None:
+                    total = self.settled[group] = np.zeros(_SETTLED)
+                n, sum_p, sum_p2, sum_log_p, sum_log_q = s[:5]
+                total[0] += n
+                total[1] += sum_p2 - 2 * y * sum_p + y * n
+                total[2] -= y * sum_log_p + (1 - y) * sum_log_q
+                total[3:3 + BINS] += s[5:5 + BINS]
+                total[3 + BINS:3 + 2 * BINS] += s[5 + BINS:]
+                total[3 + 2 * BINS:] += y * s[5:5 + BINS]
+            settled += 1
+        current = {game.game_id for game in games}
+        for game_id in [g for g in self.pending if g not in current]:
+            del self.pending[game_id]
+        for game_id in [g for g in self._last if g not in current]:
+            del self._last[game_id]
+        if settled:
+            self._export()
+            self._save()
+        return settled
+
+    def summary(self, group_by: tuple[str, ...] = (), model: str | None = None) -> list[dict[str, Any]]:
+        """
+        Settled totals per model version and source, broken down by the `group_by`
+        dimensions ("quarter", "margin"): count, Brier, log loss, expected calibration
+        error and the reliability bins (mean prediction vs observed home win rate).
+        """
+        dims = ("quarter", "margin")
+        rolled: dict[tuple, np.ndarray] = {}
+        for (m, source, q, margin), total in self.settled.items():
+            if model is not None and m != model:
+                continue
+            by = dict(zip(dims, (q, margin)))
+            key = (m, source) + tuple(by[d] for d in group_by)
+            rolled[key] = rolled.get(key, 0) + total
+        return [
+            {"model": key[0], "source": key[1], **dict(zip(group_by, key[2:])), **_describe(total)}
+            for key, total in sorted(rolled.items())
+        ]
+
+    def _export(self) -> None:
+        for row in self.summary():
+            CALIBRATION_BRIER.set(row["brier"], row["model"], row["source"])
+            CALIBRATION_LOG_LOSS.set(row["log_loss"], row["model"], row["source"])
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        data = {"bins": BINS, "settled": [[*group, total.tolist()] for group, total in self.settled.items()]}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"calibration: save failed: {e}")
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"calibration: ignoring {self.path}: {e}")
+            return
+        if data.get("bins") != BINS:
+            return
+        for *group, total in data.get("settled", []):
+            self.settled[tuple(group)] = np.array(total, dtype=float)
+        self._export()
+
+
+def _describe(total: np.ndarray) -> dict[str, Any]:
+    n = total[0]
+    bin_n = total[3:3 + BINS]
+    bin_p = total[3 + BINS:3 + 2 * BINS]
+    bin_wins = total[3 + 2 * BINS:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_p = bin_p / bin_n
+        observed = bin_wins / bin_n
+    filled = bin_n > 0
+    return {
+        "predictions": int(n),
+        "brier": round(float(total[1] / n), 5),
+        "log_loss": round(float(total[2] / n), 5),
+        "ece": round(float(np.sum(bin_n[filled] * np.abs(mean_p[filled] - observed[filled])) / n), 5),
+        "bins": [
+            {
+                "lo": i / BINS,
+                "hi": (i + 1) / BINS,
+                "predictions": int(bin_n[i]),
+                "mean_prediction": round(float(mean_p[i]), 4),
+                "observed": round(float(observed[i]), 4),
+            }
+            for i in np.flatnonzero(filled)
+        ],
+    }
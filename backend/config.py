@@ -0,0 +1,109 @@
+"""
+Runtime configuration read from the environment (or backend/.env).
+
+Upstream URLs default to the real services; point them at a local stand-in
+(see loadtest/upstream_stub.py) to run the backend without ESPN or stats.nba.com.
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ESPN_SCOREBOARD_URL = os.getenv(
+    "ESPN_SCOREBOARD_URL", "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
+)
+NBA_LINEUPS_URL = os.getenv(
+    "NBA_LINEUPS_URL", "https://stats.nba.com/js/data/leaders/00_daily_lineups_{game_date}.json"
+)
+# When set, standings are fetched from this URL (same JSON as LeagueStandings.get_dict())
+# instead of through nba_api.
+NBA_STANDINGS_URL = os.getenv("NBA_STANDINGS_URL", "")
+# Set to 0 to never backfill the team-form store from the NBA stats game log
+TEAM_FORM_BOOTSTRAP = os.getenv("TEAM_FORM_BOOTSTRAP", "1") != "0"
+# Live win probability model: ml/<WP_MODEL>.joblib (ml/train.py --promote writes this name)
+WP_MODEL = os.getenv("WP_MODEL", "nn")
+
+# Span tracing of the poll loop and routes (see tracing.py); off by default
+TRACING = os.getenv("TRACING", "0") == "1"
+# Finished traces kept for /debug/traces, and the duration above which one is printed
+TRACE_BUFFER = int(os.getenv("TRACE_BUFFER", "200"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "2000"))
+# /debug/* endpoints respond only when this is set and sent as the X-Debug-Token header
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+
+# Adaptive poll intervals in seconds (see scheduler.py)
+POLL_LIVE_SECONDS = float(os.getenv("POLL_LIVE_SECONDS", "5"))
+POLL_CRUNCH_SECONDS = float(os.getenv("POLL_CRUNCH_SECONDS", "2"))
+POLL_STOPPAGE_SECONDS = float(os.getenv("POLL_STOPPAGE_SECONDS", "10"))
+POLL_BREAK_SECONDS = float(os.getenv("POLL_BREAK_SECONDS", "20"))
+POLL_HALFTIME_SECONDS = float(os.getenv("POLL_HALFTIME_SECONDS", "60"))
+POLL_TIPOFF_LEAD_SECONDS = float(os.getenv("POLL_TIPOFF_LEAD_SECONDS", "120"))
+POLL_PREGAME_MAX_SECONDS = float(os.getenv("POLL_PREGAME_MAX_SECONDS", "1800"))
+# Hour (US Eastern) to look for the next slate once every game is final
+POLL_DAILY_HOUR_ET = int(os.getenv("POLL_DAILY_HOUR_ET", "10"))
+
+# Events kept for /api/games/stream clients resuming with Last-Event-ID
+SSE_BUFFER = int(os.getenv("SSE_BUFFER", "2048"))
+
+# Circuit breaker per upstream host (see upstream.py): consecutive failures that open it,
+# and how long it stays open before a half-open probe (doubling per failed probe, up to the max)
+CIRCUIT_FAILURES = int(os.getenv("CIRCUIT_FAILURES", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "15"))
+CIRCUIT_MAX_RESET_SECONDS = float(os.getenv("CIRCUIT_MAX_RESET_SECONDS", "120"))
+
+# Stale-while-revalidate caches for upstream-backed routes (see swr.py): how long a response
+# counts as fresh, and how long a request with nothing cached waits for the first fetch
+STANDINGS_TTL_SECONDS = float(os.getenv("STANDINGS_TTL_SECONDS", "300"))
+LINEUPS_TTL_SECONDS = float(os.getenv("LINEUPS_TTL_SECONDS", "60"))
+STATS_TTL_SECONDS = float(os.getenv("STATS_TTL_SECONDS", "60"))
+SWR_WAIT_SECONDS = float(os.getenv("SWR_WAIT_SECONDS", "2"))
+
+# Dedicated thread pools for blocking upstream calls (see executors.py): workers per upstream,
+# calls allowed to queue per pool, and the default per-request deadline (clients may ask for
+# less with X-Request-Timeout)
+ESPN_WORKERS = int(os.getenv("ESPN_WORKERS", "4"))
+NBA_STATS_WORKERS = int(os.getenv("NBA_STATS_WORKERS", "4"))
+NBA_CDN_WORKERS = int(os.getenv("NBA_CDN_WORKERS", "4"))
+EXECUTOR_QUEUE = int(os.getenv("EXECUTOR_QUEUE", "32"))
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "10"))
+
+# Snapshot journal (see journal.py): every poll's slate is appended under JOURNAL_DIR
+# (JOURNAL=0 turns it off), in segments of up to JOURNAL_SEGMENT_BYTES, keeping the newest
+# JOURNAL_MAX_SEGMENTS. On boot the latest snapshot is restored if it is younger than
+# JOURNAL_RESTORE_MAX_AGE_SECONDS.
+JOURNAL = os.getenv("JOURNAL", "1") != "0"
+JOURNAL_DIR = os.getenv("JOURNAL_DIR", os.path.join(os.path.dirname(__file__), "data", "journal"))
+JOURNAL_SEGMENT_BYTES = int(os.getenv("JOURNAL_SEGMENT_BYTES", str(4 * 1024 * 1024)))
+JOURNAL_MAX_SEGMENTS = int(os.getenv("JOURNAL_MAX_SEGMENTS", "32"))
+JOURNAL_RESTORE_MAX_AGE_SECONDS = float(os.getenv("JOURNAL_RESTORE_MAX_AGE_SECONDS", "21600"))
+# Replay mode: with REPLAY_SPEED set, the server broadcasts the journal's snapshots between
+# REPLAY_SINCE and REPLAY_UNTIL (epoch seconds, optional) at that multiple of real time
+# (0 = as fast as possible; REPLAY_LOOP=1 starts over at the end) instead of polling ESPN
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED")) if os.getenv("REPLAY_SPEED") else None
+REPLAY_SINCE = float(os.getenv("REPLAY_SINCE")) if os.getenv("REPLAY_SINCE") else None
+REPLAY_UNTIL = float(os.getenv("REPLAY_UNTIL")) if os.getenv("REPLAY_UNTIL") else None
+REPLAY_LOOP = os.getenv("REPLAY_LOOP", "0") == "1"
+
+# Per-play win probabilities for live games from the NBA CDN play-by-play (see live_pbp.py):
+# LIVE_PBP=0 turns it off; otherwise how often live games' feeds are checked
+LIVE_PBP = os.getenv("LIVE_PBP", "1") != "0"
+LIVE_PBP_SECONDS = float(os.getenv("LIVE_PBP_SECONDS", "3"))
+
+# Startup warm-up (see startup.py): set WARMUP=0 to start serving immediately, cold;
+# otherwise how long startup waits for the model preload and cache prefills
+WARMUP = os.getenv("WARMUP", "1") != "0"
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "20"))
+
+# Monte Carlo paths per game for the "simulation" block of /api/games/stats/{game_id}
+# (see simulator.py)
+SIM_PATHS = int(os.getenv("SIM_PATHS", "100000"))
+
+# Sportsbook odds feed for model-vs-market edges (see odds.py), off unless set: a
+# file:///path/odds.json or tcp://host:port URL. Quotes older than ODDS_MAX_AGE_SECONDS
+# are ignored.
+ODDS_FEED = os.getenv("ODDS_FEED", "")
+ODDS_MAX_AGE_SECONDS = float(os.getenv("ODDS_MAX_AGE_SECONDS", "900"))
+
+# Calibration monitor totals (see calibration.py), kept across restarts
+CALIBRATION_PATH = os.getenv("CALIBRATION_PATH", os.path.join(os.path.dirname(__file__), "data", "calibration.json"))
@@ -0,0 +1,159 @@
+"""
+Bounded thread pools for blocking upstream work, one per upstream, and per-request deadlines.
+
+Routes that reach ESPN, stats.nba.com or the NBA CDN run that work on the upstream's own
+pool (ESPN, NBA_STATS, NBA_CDN) instead of Starlette's shared threadpool, so a burst
+against one upstream queues behind its own workers and cannot starve the rest. Each
+pool queues at most EXECUTOR_QUEUE calls; past that, submit() raises Overloaded.
+
+Every HTTP request gets a deadline (DeadlineMiddleware): REQUEST_DEADLINE_SECONDS, or
+less if the client sends X-Request-Timeout (seconds). The deadline travels with the
+work through a contextvar:
+- run() stops waiting at the deadline and cancels the call if it hasn't started.
+- A queued call whose deadline passed is dropped when a worker picks it up.
+- upstream.get() caps its HTTP timeout at the time left.
+All of these raise DeadlineExceeded.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable
+
+import config
+from metrics import EXECUTOR_ACTIVE, EXECUTOR_QUEUE_DEPTH, EXECUTOR_REJECTED, EXECUTOR_WAIT
+
+# time.monotonic() by which the current request's work must finish, if any
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out before the work finished."""
+
+
+class Overloaded(Exception):
+    """The upstream's pool already has EXECUTOR_QUEUE calls waiting."""
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Work in this block must finish within `seconds` (or an enclosing, earlier deadline)."""
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(at, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline (may be negative), or None without one."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def check_deadline() -> None:
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queued = 0
+        self.active = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"io-{name}")
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _publish(self) -> None:
+        EXECUTOR_QUEUE_DEPTH.set(self.queued, self.name)
+        EXECUTOR_ACTIVE.set(self.active, self.name)
+
+    def submit(self, fn: Callable[..., Any], *args, detached: bool = False) -> Future:
+        """
+        Queue fn(*args) on this pool, with the caller's context (deadline, trace span).
+        detached=True runs it without them, for background work that outlives the request.
+        """
+        with self._lock:
+            if self.queued >= self.max_queue:
+                EXECUTOR_REJECTED.inc(self.name, "full")
+                raise Overloaded(f"{self.name} pool has {self.queued} calls queued")
+            self.queued += 1
+            self._publish()
+        ctx = contextvars.Context() if detached else contextvars.copy_context()
+        submitted = time.perf_counter()
+
+        def task():
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self._publish()
+            EXECUTOR_WAIT.observe(time.perf_counter() - submitted, self.name)
+            try:
+                return ctx.run(self._call, fn, args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self._publish()
+
+        future = self._pool.submit(task)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        # Cancelled before a worker took it: task() never ran to take it off the queue
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+                self._publish()
+
+    def _call(self, fn: Callable[..., Any], args: tuple) -> Any:
+        left = remaining()
+        if left is not None and left <= 0:
+            EXECUTOR_REJECTED.inc(self.name, "deadline")
+            raise DeadlineExceeded(f"deadline passed while queued on {self.name}")
+        return fn(*args)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Await fn(*args) on this pool, giving up at the current deadline."""
+        check_deadline()
+        future = self.submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), remaining())
+        except asyncio.TimeoutError:
+            # wait_for has cancelled the future, which only takes if it hadn't started yet
+            EXECUTOR_REJECTED.inc(self.name, "deadline")
+            raise DeadlineExceeded(f"request deadline exceeded waiting on {self.name}")
+
+
+ESPN = BoundedExecutor("espn", config.ESPN_WORKERS, config.EXECUTOR_QUEUE)
+NBA_STATS = BoundedExecutor("nba_stats", config.NBA_STATS_WORKERS, config.EXECUTOR_QUEUE)
+NBA_CDN = BoundedExecutor("nba_cdn", config.NBA_CDN_WORKERS, config.EXECUTOR_QUEUE)
+
+
+class DeadlineMiddleware:
+    """ASGI middleware giving each HTTP request its deadline (see module docstring)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        budget = config.REQUEST_DEADLINE_SECONDS
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-timeout":
+                try:
+                    budget = min(budget, max(0.0, float(value)))
+                except ValueError:
+                    pass
+                break
+        with deadline(budget):
+            await self.app(scope, receive, send)
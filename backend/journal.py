@@ -0,0 +1,179 @@
+"""
+Append-only journal of poll snapshots, for crash recovery and replay.
+
+Every successful poll appends the slate (GameState.to_record() per game, plus the poll
+time) to the current segment under JOURNAL_DIR as one frame:
+
+    <u32 length> <u32 crc32> <zlib-compressed JSON>
+
+Segments are named after their first snapshot's time in ms (<ms>.seg). A new one is
+started by each process and whenever the current one reaches JOURNAL_SEGMENT_BYTES;
+only the newest JOURNAL_MAX_SEGMENTS are kept. Each segment has an <ms>.idx file of
+fixed-size (poll time, frame offset) entries, so the latest snapshot (restore on boot)
+or the first one at a given time (replay) is one seek away instead of a scan.
+
+A frame is written before its index entry, and readers stop at the first torn or
+corrupt frame, so a crash mid-append loses at most that snapshot; latest() also reads
+any frames past the last index entry.
+"""
+import asyncio
+import json
+import struct
+import zlib
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Iterator
+
+from models.game_state import GameState
+
+RECORD_VERSION = 1
+# Longest pause replay() takes between two snapshots, in journal time (skips overnight gaps)
+REPLAY_MAX_GAP_SECONDS = 60.0
+
+_FRAME = struct.Struct("<II")  # payload length, crc32
+_INDEX = struct.Struct("<dQ")  # poll time, frame offset
+
+Snapshot = tuple[float, list[GameState]]
+
+
+def _encode(updated_at: float, games: list[GameState]) -> bytes:
+    record = {"v": RECORD_VERSION, "ts": updated_at, "games": [game.to_record() for game in games]}
+    payload = zlib.compress(json.dumps(record, separators=(",", ":")).encode())
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode(payload: bytes) -> Snapshot | None:
+    record = json.loads(zlib.decompress(payload))
+    if record.get("v") != RECORD_VERSION:
+        return None
+    return record["ts"], [GameState.from_record(r) for r in record["games"]]
+
+
+def _read_frame(f: BinaryIO) -> bytes | None:
+    """The next frame's payload, or None at the end of the segment or a torn/corrupt frame."""
+    header = f.read(_FRAME.size)
+    if len(header) < _FRAME.size:
+        return None
+    length, crc = _FRAME.unpack(header)
+    payload = f.read(length)
+    if len(payload) < length or zlib.crc32(payload) != crc:
+        return None
+    return payload
+
+
+def _read_index(segment: Path) -> list[tuple[float, int]]:
+    try:
+        data = segment.with_suffix(".idx").read_bytes()
+    except FileNotFoundError:
+        return []
+    return list(_INDEX.iter_unpack(data[: len(data) - len(data) % _INDEX.size]))
+
+
+class Journal:
+    def __init__(self, directory: Path, segment_bytes: int, max_segments: int):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self._segment: BinaryIO | None = None
+        self._index: BinaryIO | None = None
+        self._size = 0
+
+    def segments(self) -> list[Path]:
+        """Segment files, oldest first (names are zero-padded start times)."""
+        return sorted(self.directory.glob("*.seg"))
+
+    def append(self, updated_at: float, games: list[GameState]) -> None:
+        frame = _encode(updated_at, games)
+        if self._segment is None or (self._size and self._size + len(frame) > self.segment_bytes):
+            self._rotate(updated_at)
+        offset = self._size
+        self._segment.write(frame)
+        self._segment.flush()
+        self._index.write(_INDEX.pack(updated_at, offset))
+        self._index.flush()
+        self._size += len(frame)
+
+    def _rotate(self, updated_at: float) -> None:
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{int(updated_at * 1000):013d}.seg"
+        self._segment = open(path, "ab")
+        self._index = open(path.with_suffix(".idx"), "ab")
+        self._size = self._segment.tell()
+        for old in self.segments()[: -self.max_segments]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".idx").unlink(missing_ok=True)
+
+    def close(self) -> None:
+        for f in (self._segment, self._index):
+            if f is not None:
+                f.close()
+        self._segment = self._index = None
+
+    def latest(self) -> Snapshot | None:
+        """The newest readable snapshot: one index lookup and a short read from there."""
+        for segment in reversed(self.segments()):
+            index = _read_index(segment)
+            last = None
+            with open(segment, "rb") as f:
+                f.seek(index[-1][1] if index else 0)
+                while (payload := _read_frame(f)) is not None:
+                    last = payload
+            snapshot = _decode(last) if last is not None else None
+            if snapshot is not None:
+                return snapshot
+        return None
+
+    def read(self, since: float | None = None, until: float | None = None) -> Iterator[Snapshot]:
+        """Snapshots with since <= poll time <= until (either open-ended), oldest first."""
+        segments = self.segments()
+        if since is not None:
+            starts = [int(s.stem) / 1000 for s in segments]
+            segments = segments[max(0, bisect_right(starts, since) - 1):]
+        for segment in segments:
+            offset = 0
+            if since is not None:
+                index = _read_index(segment)
+                i = bisect_left([t for t, _ in index], since)
+                if index:
+                    offset = index[min(i, len(index) - 1)][1]
+            with open(segment, "rb") as f:
+                f.seek(offset)
+                while (payload := _read_frame(f)) is not None:
+                    snapshot = _decode(payload)
+                    if snapshot is None or (since is not None and snapshot[0] < since):
+                        continue
+                    if until is not None and snapshot[0] > until:
+                        return
+                    yield snapshot
+
+    def describe(self) -> list[dict]:
+        """Per segment: file, first/last poll time and snapshot count (from the index)."""
+        out = []
+        for segment in self.segments():
+            index = _read_index(segment)
+            out.append({
+                "segment": segment.name,
+                "bytes": segment.stat().st_size,
+                "snapshots": len(index),
+                "first": index[0][0] if index else None,
+                "last": index[-1][0] if index else None,
+            })
+        return out
+
+
+async def replay(
+    journal: Journal, since: float | None, until: float | None, speed: float,
+) -> AsyncIterator[Snapshot]:
+    """
+    Journaled snapshots paced like the original polls, `speed` times faster (0 = no
+    waiting). Gaps longer than REPLAY_MAX_GAP_SECONDS are shortened to it.
+    """
+    previous = None
+    for snapshot in journal.read(since, until):
+        if previous is not None and speed > 0:
+            await asyncio.sleep(min(snapshot[0] - previous, REPLAY_MAX_GAP_SECONDS) / speed)
+        else:
+            await asyncio.sleep(0)
+        previous = snapshot[0]
+        yield snapshot
@@ -0,0 +1,143 @@
+"""
+Per-play win probabilities for live games, from the NBA CDN play-by-play feed.
+
+The scoreboard poll only sees ESPN's status string ("7:07 - 3rd") and score every few
+seconds. Every LIVE_PBP_SECONDS, for each game on the slate that is in play:
+
+1. The ESPN event ID is mapped to the NBA game ID by matching home/away tricodes and
+   tipoff time against the CDN's today's scoreboard (fetched again only when a live
+   game is still unmapped, at most once a minute).
+2. The play-by-play is fetched with If-None-Match, so an unchanged feed is a 304 with
+   nothing to download or parse.
+3. Only actions after the game's last actionNumber are turned into rows, and the new
+   plays of every game are scored in one model call (wp_curve.extend_live). The same
+   cached curves back /api/games/{game_id}/wp-curve.
+4. main.py puts the newest per-play probability on the stored GameStates (apply())
+   and broadcasts if any moved; the scoreboard poll applies it too, so the next poll
+   doesn't overwrite it with the coarser estimate.
+
+The per-play value is used only while the feed is at least as far along as the
+scoreboard (same or more total points), so a lagging feed never rolls a game back.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any
+
+import requests
+
+import executors
+from models.game_state import GameState
+from pbp import fetch_playbyplay_if_changed, fetch_todays_games
+from scheduler import game_phase
+from team_form import normalize_abbrev
+from wp_curve import extend_live
+
+# Minimum time between CDN scoreboard fetches while a live game has no NBA game ID
+_REMAP_SECONDS = 60.0
+# Tipoff times on the two feeds must agree to within this to count as the same game
+_TIPOFF_SLACK_SECONDS = 6 * 3600
+
+
+def _parse_utc(value: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+
+
+class LivePlayByPlay:
+    """
+    Ingestion state, owned by the event loop: the blocking fetches run on the NBA CDN
+    pool and return their results, which are only stored back here on the loop, so
+    forget() never races a pool thread.
+    """
+
+    def __init__(self):
+        self.nba_ids: dict[str, str] = {}  # ESPN event ID -> NBA game ID
+        self.latest: dict[str, dict[str, Any]] = {}  # ESPN event ID -> newest curve point
+        self._etags: dict[str, str | None] = {}
+        self._mapped_at = 0.0
+
+    @staticmethod
+    def _match(unmapped: list[GameState]) -> dict[str, str]:
+        """NBA game IDs for `unmapped` from the CDN scoreboard (ESPN event ID -> NBA game ID)."""
+        matched: dict[str, str] = {}
+        by_teams: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        for nba_game in fetch_todays_games():
+            key = (normalize_abbrev(nba_game["home_abbreviation"]), normalize_abbrev(nba_game["away_abbreviation"]))
+            by_teams.setdefault(key, []).append(nba_game)
+        for game in unmapped:
+            key = (normalize_abbrev(game.home.abbreviation), normalize_abbrev(game.away.abbreviation))
+            tipoff = _parse_utc(game.start_time)
+            for nba_game in by_teams.get(key, ()):
+                nba_tipoff = _parse_utc(nba_game["game_time_utc"])
+                if tipoff and nba_tipoff and abs((tipoff - nba_tipoff).total_seconds()) > _TIPOFF_SLACK_SECONDS:
+                    continue
+                matched[game.game_id] = nba_game["game_id"]
+                break
+        return matched
+
+    async def poll(self, games: list[GameState]) -> int:
+        """One ingestion pass over the slate; returns how many games had new plays."""
+        live = [g for g in games if game_phase(g.status) in ("live", "break")]
+        if not live:
+            return 0
+        unmapped = [g for g in live if g.game_id not in self.nba_ids]
+        if unmapped and time.monotonic() - self._mapped_at >= _REMAP_SECONDS:
+            self._mapped_at = time.monotonic()
+            try:
+                self.nba_ids.update(await executors.NBA_CDN.run(self._match, unmapped))
+            except requests.exceptions.RequestException as e:
+                print(f"live pbp: CDN scoreboard fetch failed: {e}")
+        ids = {g.game_id: self.nba_ids[g.game_id] for g in live if g.game_id in self.nba_ids}
+        if not ids:
+            return 0
+
+        feeds = await asyncio.gather(
+            *(executors.NBA_CDN.run(fetch_playbyplay_if_changed, nba_id, self._etags.get(nba_id))
+              for nba_id in ids.values()),
+            return_exceptions=True,
+        )
+        mapped = set(self.nba_ids.values())  # forget() may have run during the fetches
+        changed = {}
+        for nba_id, feed in zip(ids.values(), feeds):
+            if isinstance(feed, Exception):
+                print(f"live pbp: {nba_id} fetch failed: {feed}")
+                continue
+            actions, etag = feed
+            if nba_id in mapped:
+                self._etags[nba_id] = etag
+            if actions is not None:
+                changed[nba_id] = actions
+        if not changed:
+            return 0
+
+        points = await executors.NBA_CDN.run(extend_live, changed)
+        for espn_id, nba_id in ids.items():
+            if nba_id in points and self.nba_ids.get(espn_id) == nba_id:
+                self.latest[espn_id] = points[nba_id]
+        return len(points)
+
+    def apply(self, game: GameState) -> bool:
+        """
+        Put the newest per-play probability on `game` if the feed is at least as far
+        along as its scoreboard line. Returns whether the probability changed.
+        """
+        point = self.latest.get(game.game_id)
+        if point is None or game_phase(game.status) == "final":
+            return False
+        if point["home_score"] + point["away_score"] < game.home.score + game.away.score:
+            return False
+        home = float(point["home_win_prob"])
+        if game.home_win_prob == home:
+            return False
+        game.home_win_prob, game.away_win_prob = home, round(100 - home, 2)
+        return True
+
+    def forget(self, games: list[GameState]) -> None:
+        """Drop state for games no longer on the slate."""
+        current = {g.game_id for g in games}
+        for espn_id in [k for k in self.nba_ids if k not in current]:
+            self._etags.pop(self.nba_ids.pop(espn_id), None)
+            self.latest.pop(espn_id, None)
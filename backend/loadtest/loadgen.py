@@ -0,0 +1,227 @@
+"""
+Load generator for the backend: opens thousands of /ws clients plus REST pollers of
+/api/games and reports end-to-end update latency, i.e. how long after the upstream
+stub published a new version of the slate a client first saw it.
+
+    python loadtest/upstream_stub.py --port 9000 &
+    (backend on :8000 pointed at the stub, see upstream_stub.py)
+    python loadtest/loadgen.py --ws-clients 2000 --pollers 50 --duration 120 --server-pid <uvicorn pid>
+
+Only --measure-fraction of the WebSocket clients decode messages, so the generator
+itself doesn't become the bottleneck; the rest just drain their sockets. Run the
+generator on a different core (taskset) than the server for cleaner numbers.
+
+--encoding picks the /ws wire format (see wire.py) and --no-deflate stops clients
+offering permessage-deflate, to compare egress and server CPU across the two.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+from upstream_stub import slate_fingerprint
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import wire  # noqa: E402
+
+
+def games_fingerprint(games: list[dict]) -> str:
+    return slate_fingerprint(
+        (g.get("game_id"), g.get("home_score"), g.get("away_score"), g.get("status")) for g in games
+    )
+
+
+@dataclass
+class Stats:
+    ws_connected: int = 0
+    ws_failed: int = 0
+    ws_disconnected: int = 0
+    ws_messages: int = 0
+    ws_bytes: int = 0
+    ws_deflate: int = 0
+    rest_requests: int = 0
+    rest_errors: int = 0
+    rest_latency: list[float] = field(default_factory=list)
+    # fingerprint -> first-receipt wall times (one per measuring client)
+    ws_seen: list[tuple[str, float]] = field(default_factory=list)
+    rest_seen: list[tuple[str, float]] = field(default_factory=list)
+    cpu_percent: list[float] = field(default_factory=list)
+    rss_bytes: list[int] = field(default_factory=list)
+
+
+def raise_fd_limit() -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def ws_client(url: str, measure: bool, stats: Stats, stop: asyncio.Event,
+                    encoding: str = wire.JSON, deflate: bool = True) -> None:
+    subprotocols = None if encoding == wire.JSON else [encoding]
+    compression = "deflate" if deflate else None
+    try:
+        async with connect(url, open_timeout=30, max_size=None, ping_interval=None,
+                           subprotocols=subprotocols, compression=compression) as ws:
+            stats.ws_connected += 1
+            if any(e.name == "permessage-deflate" for e in ws.protocol.extensions):
+                stats.ws_deflate += 1
+            seen: set[str] = set()
+            while not stop.is_set():
+                try:
+                    msg = await asyncio.wait_for(ws.recv(), timeout=1.0)
+                except TimeoutError:
+                    continue
+                now = time.time()
+                stats.ws_messages += 1
+                stats.ws_bytes += len(msg)
+                if not measure:
+                    continue
+                data = wire.decode(msg, encoding)
+                if isinstance(data, list):
+                    fp = games_fingerprint(data)
+                    if fp not in seen:
+                        seen.add(fp)
+                        stats.ws_seen.append((fp, now))
+    except ConnectionClosed:
+        stats.ws_disconnected += 1
+    except Exception:
+        stats.ws_failed += 1
+
+
+async def rest_poller(client: httpx.AsyncClient, url: str, interval: float, stats: Stats, stop: asyncio.Event) -> None:
+    seen: set[str] = set()
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            resp = await client.get(url)
+            stats.rest_requests += 1
+            stats.rest_latency.append(time.perf_counter() - start)
+            if resp.status_code != 200:
+                stats.rest_errors += 1
+            else:
+                fp = games_fingerprint(resp.json())
+                if fp not in seen:
+                    seen.add(fp)
+                    stats.rest_seen.append((fp, time.time()))
+        except httpx.HTTPError:
+            stats.rest_requests += 1
+            stats.rest_errors += 1
+        await asyncio.sleep(interval)
+
+
+async def sample_process(pid: int, stats: Stats, stop: asyncio.Event, interval: float = 1.0) -> None:
+    """Sample CPU% and RSS of the server process from /proc (Linux only)."""
+    ticks = os.sysconf("SC_CLK_TCK")
+    page = os.sysconf("SC_PAGE_SIZE")
+
+    def cpu_seconds() -> float:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / ticks
+
+    last_cpu, last_t = cpu_seconds(), time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        try:
+            cpu, t = cpu_seconds(), time.perf_counter()
+            with open(f"/proc/{pid}/statm") as f:
+                rss_pages = int(f.read().split()[1])
+        except (FileNotFoundError, ProcessLookupError):
+            return
+        stats.cpu_percent.append(100 * (cpu - last_cpu) / (t - last_t))
+        stats.rss_bytes.append(rss_pages * page)
+        last_cpu, last_t = cpu, t
+
+
+def percentiles(values: list[float]) -> str:
+    if not values:
+        return "n/a"
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(len(values) * q))]  # noqa: E731
+    return (f"p50={pick(0.5) * 1000:.0f}ms p90={pick(0.9) * 1000:.0f}ms "
+            f"p99={pick(0.99) * 1000:.0f}ms max={values[-1] * 1000:.0f}ms (n={len(values)})")
+
+
+def update_latencies(seen: list[tuple[str, float]], timeline: list[dict]) -> list[float]:
+    published = {t["fingerprint"]: t["published_at"] for t in timeline}
+    return [received - published[fp] for fp, received in seen if fp in published and received >= published[fp]]
+
+
+async def run(args: argparse.Namespace) -> None:
+    raise_fd_limit()
+    stats = Stats()
+    stop = asyncio.Event()
+    ws_url = args.server.replace("http", "ws", 1) + "/ws"
+    every = max(1, round(1 / args.measure_fraction)) if args.measure_fraction > 0 else 0
+
+    tasks = []
+    for i in range(args.ws_clients):
+        tasks.append(asyncio.create_task(
+            ws_client(ws_url, every and i % every == 0, stats, stop, args.encoding, not args.no_deflate)
+        ))
+        if args.ramp and i % 100 == 99:
+            await asyncio.sleep(args.ramp)
+
+    limits = httpx.Limits(max_connections=args.pollers, max_keepalive_connections=args.pollers)
+    client = httpx.AsyncClient(timeout=10, limits=limits)
+    for _ in range(args.pollers):
+        tasks.append(asyncio.create_task(rest_poller(client, f"{args.server}/api/games", args.poll_interval, stats, stop)))
+    if args.server_pid:
+        tasks.append(asyncio.create_task(sample_process(args.server_pid, stats, stop)))
+
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.duration:
+        await asyncio.sleep(5)
+        print(f"[{time.perf_counter() - start:5.0f}s] ws connected={stats.ws_connected} "
+              f"failed={stats.ws_failed} msgs={stats.ws_messages} rest={stats.rest_requests} "
+              f"rest_errors={stats.rest_errors}")
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    async with httpx.AsyncClient(timeout=10) as stub:
+        timeline = (await stub.get(f"{args.stub}/_stub/timeline")).json()["timeline"]
+    await client.aclose()
+
+    print("\n=== results ===")
+    print(f"ws clients: {stats.ws_connected} connected, {stats.ws_failed} failed, "
+          f"{stats.ws_disconnected} dropped; {stats.ws_messages} msgs, {stats.ws_bytes / 1e6:.1f} MB "
+          f"({args.encoding}, permessage-deflate on {stats.ws_deflate})")
+    print(f"ws update latency:   {percentiles(update_latencies(stats.ws_seen, timeline))}")
+    print(f"rest update latency: {percentiles(update_latencies(stats.rest_seen, timeline))}")
+    print(f"rest request latency: {percentiles(stats.rest_latency)}; "
+          f"{stats.rest_errors}/{stats.rest_requests} errors")
+    print(f"slate versions published: {len(timeline)}")
+    if stats.cpu_percent:
+        print(f"server cpu: mean={statistics.fmean(stats.cpu_percent):.0f}% max={max(stats.cpu_percent):.0f}%; "
+              f"rss max={max(stats.rss_bytes) / 2**20:.0f} MiB")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="WebSocket + REST load generator for the backend.")
+    parser.add_argument("--server", default="http://127.0.0.1:8000", help="backend base URL")
+    parser.add_argument("--stub", default="http://127.0.0.1:9000", help="upstream stub base URL")
+    parser.add_argument("--ws-clients", type=int, default=1000)
+    parser.add_argument("--pollers", type=int, default=20, help="concurrent /api/games pollers")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run after ramp-up")
+    parser.add_argument("--ramp", type=float, default=0.05, help="pause after every 100 ws connects")
+    parser.add_argument("--measure-fraction", type=float, default=0.1,
+                        help="fraction of ws clients that decode messages for latency")
+    parser.add_argument("--encoding", default=wire.JSON, choices=(wire.JSON, wire.MSGPACK, wire.MSGPACK_ZLIB),
+                        help="/ws wire format to negotiate")
+    parser.add_argument("--no-deflate", action="store_true", help="don't offer permessage-deflate")
+    parser.add_argument("--server-pid", type=int, help="sample CPU / RSS of this process")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,260 @@
+"""
+Local stand-in for the upstream services the backend polls (ESPN scoreboard,
+stats.nba.com standings and daily lineups), for load testing without touching them.
+
+The scoreboard is built from the recorded fixture in benchmarks/fixtures and evolves
+as a simulated slate: live games run their clock and score, pregame games tip off
+after a configurable number of ticks, and games go Final. Every response can be
+delayed and can randomly fail with a 500 or 404.
+
+Run it, then start the backend pointed at it:
+
+    python loadtest/upstream_stub.py --port 9000 --latency-ms 80 --error-rate 0.02
+
+    ESPN_SCOREBOARD_URL=http://127.0.0.1:9000/apis/site/v2/sports/basketball/nba/scoreboard \\
+    NBA_STANDINGS_URL=http://127.0.0.1:9000/stats/leaguestandings \\
+    NBA_LINEUPS_URL='http://127.0.0.1:9000/js/data/leaders/00_daily_lineups_{game_date}.json' \\
+    TEAM_FORM_BOOTSTRAP=0 uvicorn main:app --port 8000
+
+GET /_stub/timeline lists when each version of the slate was published, which
+loadgen.py uses to measure end-to-end update latency.
+"""
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import random
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+_PERIOD_NAMES = {1: "1st", 2: "2nd", 3: "3rd", 4: "4th"}
+# Points per team per game-second (~115 points per 48 minutes)
+_SCORING_RATE = 115 / 2880
+
+
+def slate_fingerprint(games) -> str:
+    """Stable hash of (game_id, home_score, away_score, status) for a set of games."""
+    key = "|".join(
+        f"{gid}:{hs}:{as_}:{status}" for gid, hs, as_, status in sorted(games)
+    )
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def _period_name(period: int) -> str:
+    if period <= 4:
+        return _PERIOD_NAMES[period]
+    return "OT" if period == 5 else f"{period - 4}OT"
+
+
+class _SimGame:
+    def __init__(self, event: dict, tipoff_tick: int):
+        comp = event["competitions"][0]
+        status_type = comp["status"]["type"]
+        home = next(c for c in comp["competitors"] if c["homeAway"] == "home")
+        away = next(c for c in comp["competitors"] if c["homeAway"] == "away")
+        self.game_id = event["id"]
+        self.state = status_type["state"]
+        self.status = status_type["shortDetail"]
+        self.period = max(1, int(comp["status"].get("period") or 1))
+        self.clock = 720.0 if self.state == "pre" else float(comp["status"].get("clock") or 360.0)
+        self.home = int(home.get("score") or 0)
+        self.away = int(away.get("score") or 0)
+        self.home_q = [ls["value"] for ls in home.get("linescores", [])] or [0.0]
+        self.away_q = [ls["value"] for ls in away.get("linescores", [])] or [0.0]
+        self.tipoff_tick = tipoff_tick
+        self.break_ticks = 0
+        if self.state == "in" and (self.status == "Halftime" or self.status.startswith("End of")):
+            self.break_ticks = 3
+
+    def advance(self, tick: int, game_seconds: float, rng: random.Random) -> None:
+        if self.state == "post":
+            return
+        if self.state == "pre":
+            if tick < self.tipoff_tick:
+                return
+            self.state, self.period, self.clock = "in", 1, 720.0
+            self.home_q, self.away_q = [0.0], [0.0]
+        if self.break_ticks:
+            self.break_ticks -= 1
+            if self.break_ticks:
+                return
+            self._start_period(self.period + 1)
+
+        step = min(game_seconds, self.clock)
+        self.clock -= step
+        for side in ("home", "away"):
+            pts = sum(rng.choice((2, 2, 3, 1)) for _ in range(self._poisson(rng, step * _SCORING_RATE / 2.2)))
+            setattr(self, side, getattr(self, side) + pts)
+            quarters = self.home_q if side == "home" else self.away_q
+            quarters[-1] += pts
+
+        if self.clock > 0:
+            self.status = self._clock_status()
+        elif self.period >= 4 and self.home != self.away:
+            self.state = "post"
+            self.status = "Final" if self.period == 4 else "Final/OT"
+        elif self.period == 2:
+            self.status, self.break_ticks = "Halftime", 4
+        else:
+            self.status, self.break_ticks = f"End of {_period_name(self.period)}", 2
+
+    def _start_period(self, period: int) -> None:
+        self.period = period
+        self.clock = 720.0 if period <= 4 else 300.0
+        self.home_q.append(0.0)
+        self.away_q.append(0.0)
+        self.status = self._clock_status()
+
+    def _clock_status(self) -> str:
+        if self.clock >= 60:
+            clock = f"{int(self.clock // 60)}:{int(self.clock % 60):02d}"
+        else:
+            clock = f"{self.clock:.1f}"
+        return f"{clock} - {_period_name(self.period)}"
+
+    @staticmethod
+    def _poisson(rng: random.Random, lam: float) -> int:
+        # Knuth; lam is small (a few possessions per tick)
+        limit, k, p = pow(2.718281828459045, -lam), 0, 1.0
+        while True:
+            p *= rng.random()
+            if p <= limit:
+                return k
+            k += 1
+
+
+class SimulatedSlate:
+    """Evolves the recorded scoreboard fixture one tick at a time."""
+
+    def __init__(self, scoreboard: dict, game_seconds_per_tick: float, tipoff_every: int, seed: int):
+        self.template = scoreboard
+        self.game_seconds_per_tick = game_seconds_per_tick
+        self.rng = random.Random(seed)
+        pre = 0
+        self.games = []
+        for event in scoreboard["events"]:
+            is_pre = event["competitions"][0]["status"]["type"]["state"] == "pre"
+            pre += is_pre
+            self.games.append(_SimGame(event, tipoff_tick=pre * tipoff_every if is_pre else 0))
+        self.tick = 0
+        self.timeline: list[dict] = []
+        self.body = b""
+        self._publish()
+
+    def advance(self) -> None:
+        self.tick += 1
+        for game in self.games:
+            game.advance(self.tick, self.game_seconds_per_tick, self.rng)
+        self._publish()
+
+    def _publish(self) -> None:
+        payload = copy.deepcopy(self.template)
+        for event, game in zip(payload["events"], self.games):
+            comp = event["competitions"][0]
+            status = comp["status"]
+            status["period"] = game.period
+            status["clock"] = game.clock
+            status["type"]["state"] = game.state
+            status["type"]["completed"] = game.state == "post"
+            status["type"]["shortDetail"] = game.status
+            status["type"]["detail"] = game.status
+            event["status"] = status
+            for c in comp["competitors"]:
+                score, quarters = (game.home, game.home_q) if c["homeAway"] == "home" else (game.away, game.away_q)
+                c["score"] = str(score)
+                if game.state != "pre":
+                    c["linescores"] = [
+                        {"value": v, "displayValue": str(int(v)), "period": i}
+                        for i, v in enumerate(quarters, start=1)
+                    ]
+                for stat in c.get("statistics", []):
+                    if stat["name"] == "points":
+                        stat["displayValue"] = str(score)
+        self.body = json.dumps(payload, separators=(",", ":")).encode()
+        fingerprint = slate_fingerprint((g.game_id, g.home, g.away, g.status) for g in self.games)
+        if not self.timeline or self.timeline[-1]["fingerprint"] != fingerprint:
+            self.timeline.append({"tick": self.tick, "published_at": time.time(), "fingerprint": fingerprint})
+
+
+def create_app(args: argparse.Namespace) -> FastAPI:
+    with open(FIXTURES_DIR / "espn_scoreboard.json") as f:
+        slate = SimulatedSlate(json.load(f), args.game_seconds_per_tick, args.tipoff_every, args.seed)
+    standings_body = (FIXTURES_DIR / "standings.json").read_bytes()
+    lineups_body = (FIXTURES_DIR / "lineups.json").read_bytes()
+    fault_rng = random.Random(args.seed + 1)
+
+    async def ticker():
+        while True:
+            await asyncio.sleep(args.tick_seconds)
+            slate.advance()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        task = asyncio.create_task(ticker())
+        try:
+            yield
+        finally:
+            task.cancel()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if request.url.path.startswith("/_stub"):
+            return await call_next(request)
+        delay = max(0.0, fault_rng.gauss(args.latency_ms, args.jitter_ms)) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+        roll = fault_rng.random()
+        if roll < args.error_rate:
+            return JSONResponse({"error": "stub upstream error"}, status_code=500)
+        if roll < args.error_rate + args.not_found_rate:
+            return JSONResponse({"error": "not found"}, status_code=404)
+        return await call_next(request)
+
+    @app.get("/apis/site/v2/sports/basketball/nba/scoreboard")
+    def scoreboard():
+        return Response(slate.body, media_type="application/json")
+
+    @app.get("/stats/leaguestandings")
+    def standings():
+        return Response(standings_body, media_type="application/json")
+
+    @app.get("/js/data/leaders/00_daily_lineups_{game_date}.json")
+    def lineups(game_date: str):
+        return Response(lineups_body, media_type="application/json")
+
+    @app.get("/_stub/timeline")
+    def timeline():
+        return {"tick": slate.tick, "timeline": slate.timeline}
+
+    return app
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local stand-in for ESPN / stats.nba.com.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--tick-seconds", type=float, default=1.0, help="wall seconds between slate updates")
+    parser.add_argument("--game-seconds-per-tick", type=float, default=24.0, help="game clock advance per tick")
+    parser.add_argument("--tipoff-every", type=int, default=60, help="ticks between scheduled tipoffs")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="mean added response latency")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="std dev of added latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--not-found-rate", type=float, default=0.0, help="fraction of requests answered with 404")
+    parser.add_argument("--seed", type=int, default=148)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = parse_args()
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
@@ -1,21 +1,49 @@
+import time
+
+_import_started = time.perf_counter()  # startup breakdown: module imports (see startup.py)
+
 import asyncio
 import json
+import math
+import secrets
 from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import Any
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
 from datetime import date, datetime
+from zoneinfo import ZoneInfo
 
 import requests
 
-from nba_api.stats.endpoints import leaguestandings, scoreboardv2
-
-from util import compute_win_probabilities, parse_game_data, parse_dashboard_game_data, merge_gp
+from tracing import traced
+from util import compute_win_probabilities, parse_scoreboard
+from models.game_state import GameState
 import state as app_state
+import calibration
+import config
+import executors
+import journal
+import metrics
+import odds
+import props
+import startup
+import tracing
+import util
+import swr
+import upstream
+import wire
 
+from live_pbp import LivePlayByPlay
+from simulator import simulate_game
+from scheduler import PollScheduler
+from sse import EventStream
 from standings import normalize_league_standings
+from wp_curve import get_wp_curve
+from team_form import TeamFormStore, get_store, normalize_abbrev, season_for_date
 
 # NBA stats API TeamID -> ESPN-style abbreviation (for matching scoreboard teams)
 _NBA_TEAM_ID_TO_ABBREV = {
@@ -45,13 +73,26 @@ def _parse_l10(l10_str: str) -> tuple[int, int]:
 
 def _current_nba_season() -> str:
     """e.g. Oct 2025 -> '2025-26'; July 2025 -> '2025-26'."""
-    today = date.today()
-    year = today.year
-    if today.month >= 10:
-        return f"{year}-{str(year + 1)[-2:]}"
-    return f"{year - 1}-{str(year)[-2:]}"
+    return season_for_date(date.today())
+
+
+@traced
+def fetch_league_standings(season: str | None = None) -> dict[str, Any]:
+    """Raw LeagueStandings payload, from nba_api or the NBA_STANDINGS_URL override."""
+    if config.NBA_STANDINGS_URL:
+        resp = upstream.get(config.NBA_STANDINGS_URL, timeout=10)
+        resp.raise_for_status()
+        return resp.json()
+    # Imported here: nba_api loads ~150 endpoint modules and is only needed without the override
+    from nba_api.stats.endpoints import leaguestandings
 
+    with upstream.track(upstream.NBA_STATS_HOST):
+        if season:
+            return leaguestandings.LeagueStandings(season_nullable=season).get_dict()
+        return leaguestandings.LeagueStandings().get_dict()
 
+
+@traced
 def fetch_standings_l10() -> dict[str, tuple[int, int]]:
     """
     Fetch league standings from NBA stats API and return mapping
@@ -59,9 +100,7 @@ def fetch_standings_l10() -> dict[str, tuple[int, int]]:
     """
     abbrev_to_l10: dict[str, tuple[int, int]] = {}
     try:
-        season = _current_nba_season()
-        response = leaguestandings.LeagueStandings(season_nullable=season)
-        data = response.get_dict()
+        data = fetch_league_standings(_current_nba_season())
         rs = data.get("resultSets") or []
         if not rs:
             return abbrev_to_l10
@@ -83,110 +122,530 @@ def fetch_standings_l10() -> dict[str, tuple[int, int]]:
     return abbrev_to_l10
 
 
-def fetch_games_from_nba() -> list[dict[str, Any]]:
+def _today_et() -> date:
+    """Current date on the US East Coast (the day ESPN's scoreboard is for)."""
+    return datetime.now(ZoneInfo("America/New_York")).date()
+
+
+def _game_date_et(game: GameState) -> date:
+    """Day a game was played on the US East Coast, from its UTC tipoff (today if unreadable)."""
+    try:
+        tipoff = datetime.fromisoformat(game.start_time.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return _today_et()
+    if tipoff.tzinfo is None:
+        tipoff = tipoff.replace(tzinfo=ZoneInfo("UTC"))
+    return tipoff.astimezone(ZoneInfo("America/New_York")).date()
+
+
+def get_team_form(season: str | None = None) -> TeamFormStore | None:
     """
-    Fetch full game data from ESPN API with all stats.
-    Used by /api/games/stats endpoint for detailed statistics.
+    A season's team-form store (see team_form.get_store; the current season by default),
+    or None while it's first being loaded. Loading (and the game-log backfill it may
+    need) runs on the NBA stats pool, never in the poll.
     """
-    url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
-    resp = requests.get(url, timeout=10)
-    resp.raise_for_status()
-    raw = resp.json()
-    events = raw.get("events", [])
-    result = []
-    l10_by_abbrev = fetch_standings_l10()
-    for event in events:
-        payload = parse_game_data(event)
-        if payload:
-            home_abbrev = payload.get("home_abbreviation", "") or ""
-            away_abbrev = payload.get("away_abbreviation", "") or ""
-            h_w, h_l = l10_by_abbrev.get(home_abbrev, (0, 0))
-            a_w, a_l = l10_by_abbrev.get(away_abbrev, (0, 0))
-            payload["home_l10_wins"] = h_w
-            payload["away_l10_wins"] = a_w
-            result.append(payload)
-    return result
-
-def fetch_dashboard_games() -> list[dict[str, Any]]:
-    """
-    Fetch lightweight game data from ESPN API for dashboard display.
-    Returns only: game_id, status, team names/abbr, records, scores.
-    Used by /api/games endpoint.
-    """
-    url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
-    resp = requests.get(url, timeout=10)
+    season = season or _current_nba_season()
+    entry = team_form_cache.peek(season, lambda: get_store(season))
+    return None if entry is None else entry.value
+
+
+@traced
+def attach_team_form(games: list[GameState]) -> None:
+    """
+    Set each team's l10_wins from its season's team-form store as of the game's date, so
+    a past slate shows the form teams had going into those games.
+    Until the current season's store is loaded, or if it could not be built, its games
+    fall back to the L10 column of the live standings, cached for STANDINGS_TTL_SECONDS
+    and fetched on the NBA stats pool (no L10 until the first fetch lands, and none for
+    past seasons whose store isn't loaded yet).
+    """
+    current = _current_nba_season()
+    for game in games:
+        day = _game_date_et(game)
+        season = season_for_date(day)
+        store = get_team_form(season)
+        fallback = None
+        if store is None or not len(store):
+            entry = standings_l10_cache.peek("current", fetch_standings_l10) if season == current else None
+            fallback = {} if entry is None else entry.value
+        for team in (game.home, game.away):
+            abbrev = team.abbreviation or ""
+            if fallback is None:
+                wins, _ = store.l10(abbrev, day)
+            else:
+                wins, _ = fallback.get(normalize_abbrev(abbrev), (0, 0))
+            team.l10_wins = wins
+
+
+@traced
+def record_final_games(games: list[GameState]) -> None:
+    """
+    Feed newly Final games into the team-form store so L10 stays current without refetching.
+    Each game is keyed by the day it was played, not the poll's, so a game still on the
+    scoreboard after midnight isn't recorded again for the next day.
+    """
+    changed: dict[str, TeamFormStore] = {}
+    for game in games:
+        home, away = game.home, game.away
+        if "Final" not in (game.status or "") or home.score == away.score:
+            continue
+        day = _game_date_et(game)
+        store = get_team_form(season_for_date(day))
+        if store is None:
+            continue  # still loading; the game stays Final on the scoreboard for later polls
+        if store.record_game(day, home.abbreviation, away.abbreviation, home.score > away.score):
+            changed[store.season] = store
+    for store in changed.values():
+        # The JSON dump and write go to the NBA stats pool like the store's loading
+        try:
+            executors.NBA_STATS.submit(_save_team_form, store, detached=True)
+        except executors.Overloaded:
+            pass  # the next recorded game saves everything again
+
+
+def _save_team_form(store: TeamFormStore) -> None:
+    try:
+        store.save()
+    except OSError as e:
+        print(f"Team form save failed: {e}")
+
+
+@traced
+def fetch_scoreboard_events(game_date: str | None = None) -> list[dict[str, Any]]:
+    """Raw ESPN scoreboard events for today's slate, or for game_date (YYYYMMDD)."""
+    params = {"dates": game_date} if game_date else None
+    resp = upstream.get(config.ESPN_SCOREBOARD_URL, params=params, timeout=10)
     resp.raise_for_status()
-    raw = resp.json()
-    events = raw.get("events", [])
-    result = []
-    for event in events:
-        payload = parse_dashboard_game_data(event)
-        if payload:
-            result.append(payload)
-    return result
+    return resp.json().get("events", [])
+
+def parse_events(events: list[dict[str, Any]]) -> list[GameState]:
+    """GameStates for the events, timed as the "scoreboard" parse."""
+    with metrics.PARSE_LATENCY.time("scoreboard"), tracing.span("parse", events=len(events)):
+        return parse_scoreboard(events)
 
+@traced
+def fetch_games_from_nba(game_date: str | None = None) -> list[GameState]:
+    """
+    Fetch full game data from ESPN API with all stats.
+    Used by /api/games/stats for dates other than today's polled slate.
+    """
+    games = parse_events(fetch_scoreboard_events(game_date))
+    attach_team_form(games)
+    return games
+
+@traced
 async def update_games_and_probabilities():
     """
     Update the games and probabilities in the in-memory store and broadcast to WebSocket clients.
-    Uses lightweight dashboard data for efficiency.
+    Dashboard clients get the lightweight view of every game; game subscribers get the
+    full-stats view of their games only.
     """
-    games = fetch_dashboard_games()
+    # On ESPN's pool, so a slow scoreboard doesn't block the event loop
+    games = parse_events(await executors.ESPN.run(fetch_scoreboard_events))
+    record_final_games(games)
+    attach_team_form(games)
     probabilities = compute_win_probabilities(games)
-    app_state.games.clear()
-    app_state.games.extend(games)
-    app_state.probabilities.clear()
-    app_state.probabilities.update(probabilities)
-    
-    result = merge_gp(games, probabilities)
+    live_plays.forget(games)
+    per_play = []
+    for game in games:
+        if live_plays.apply(game):
+            probabilities[game.game_id] = {"home_win_prob": game.home_win_prob, "away_win_prob": game.away_win_prob}
+            per_play.append(game)
+    store_games(games, probabilities)
+    model = util.live_model_version()
+    monitor.observe([game for game in games if game not in per_play], model, "scoreboard")
+    monitor.observe(per_play, model, "live_pbp")
+    monitor.settle(games)
+    journal_snapshot(games)
+    await broadcast_games(games)
+
+async def broadcast_games(games: list[GameState]) -> None:
+    """Send a stored slate to WebSocket and SSE clients (after a poll, or a journal replay step)."""
+    result = [dashboard_view(game) for game in games]
+    tracing.annotate(games=len(result), clients=len(manager.active_connections))
     print(f"Broadcasting {len(result)} games to {len(manager.active_connections)} clients\n")
     await manager.broadcast_json(result)
+    await manager.push_game_details()
+    game_events.publish_games(result)
 
-async def poll_loop():
-    """Poll the NBA API every 5 seconds and update the games and probabilities."""
+def store_games(games: list[GameState], probabilities: dict[str, dict[str, float]]) -> None:
+    """Replace the in-memory slate with a freshly parsed one."""
+    app_state.updated_at = time.time()
+    app_state.refresh_failed = False
+    app_state.games[:] = games
+    app_state.games_by_id.clear()
+    app_state.games_by_id.update((game.game_id, game) for game in games)
+    app_state.probabilities.clear()
+    app_state.probabilities.update(probabilities)
+    app_state.props = props.price(games)
+    app_state.market = odds_book.edges(games)
+
+def dashboard_view(game: GameState) -> dict[str, Any]:
+    """/api/games item, plus the game's "market" block when the odds feed has a quote for it."""
+    view = game.dashboard_dict()
+    if (market := app_state.market.get(game.game_id)) is not None:
+        view["market"] = market
+    return view
+
+def detail_view(game: GameState) -> dict[str, Any]:
+    """Full-stats view, plus "market" like dashboard_view()."""
+    view = game.full_dict()
+    if (market := app_state.market.get(game.game_id)) is not None:
+        view["market"] = market
+    return view
+
+def store_snapshot(updated_at: float, games: list[GameState]) -> None:
+    """Store a journaled slate, with its win probabilities, as if polled at updated_at."""
+    store_games(games, {
+        game.game_id: {"home_win_prob": game.home_win_prob, "away_win_prob": game.away_win_prob}
+        for game in games if game.home_win_prob is not None
+    })
+    app_state.updated_at = updated_at
+
+def journal_snapshot(games: list[GameState]) -> None:
+    """Append the slate just stored to the snapshot journal; a disk error never fails the poll."""
+    if not config.JOURNAL or config.REPLAY_SPEED is not None:
+        return
+    try:
+        snapshots.append(app_state.updated_at, games)
+    except OSError as e:
+        print(f"journal append failed: {e}")
+
+def restore_from_journal() -> None:
+    """Serve the last journaled slate until the first poll, if it's recent enough."""
+    snapshot = snapshots.latest() if config.JOURNAL else None
+    if snapshot is None:
+        return
+    updated_at, games = snapshot
+    age = time.time() - updated_at
+    if age > config.JOURNAL_RESTORE_MAX_AGE_SECONDS:
+        return
+    store_snapshot(updated_at, games)
+    game_events.publish_games([dashboard_view(game) for game in games])
+    print(f"Restored {len(games)} games from the journal ({age:.0f}s old)")
+
+async def live_pbp_loop():
+    """
+    Per-play probability updates between scoreboard polls (see live_pbp.py): new plays
+    are applied to the stored slate and broadcast as soon as they're scored.
+    """
     while True:
+        await asyncio.sleep(config.LIVE_PBP_SECONDS)
         try:
-            await update_games_and_probabilities()
+            if not await live_plays.poll(list(app_state.games)):
+                continue
         except Exception as e:
-            print(f"poll error: {e}")
-        
-        await asyncio.sleep(5)
+            print(f"live pbp error: {e}")
+            continue
+        moved = [game for game in app_state.games if live_plays.apply(game)]
+        for game in moved:
+            app_state.probabilities[game.game_id] = {"home_win_prob": game.home_win_prob, "away_win_prob": game.away_win_prob}
+        if moved:
+            monitor.observe(moved, util.live_model_version(), "live_pbp")
+            app_state.market = odds_book.edges(app_state.games)
+            await broadcast_games(list(app_state.games))
+
+async def replay_loop():
+    """Broadcast journaled snapshots instead of polling (REPLAY_SPEED, see config.py)."""
+    while True:
+        replayed = 0
+        async for _, games in journal.replay(snapshots, config.REPLAY_SINCE, config.REPLAY_UNTIL, config.REPLAY_SPEED):
+            store_snapshot(time.time(), games)
+            await broadcast_games(games)
+            replayed += 1
+        print(f"Replayed {replayed} journal snapshots")
+        if not config.REPLAY_LOOP or not replayed:
+            return
+
+def store_headers() -> dict[str, str]:
+    """Age of the poll store; stale once a poll has failed since the last good one."""
+    age = time.time() - app_state.updated_at if app_state.updated_at else 0.0
+    return swr.staleness_headers(age, app_state.refresh_failed)
+
+def bootstrap_games() -> list[GameState]:
+    """Fetch and store the slate before the poll loop has (for the first /api/games requests)."""
+    games = parse_events(fetch_scoreboard_events())
+    attach_team_form(games)
+    store_games(games, compute_win_probabilities(games))
+    return games
+
+def fetch_games_stats(game_date: str) -> list[dict[str, Any]]:
+    """Full-stats views with win probabilities for one date (YYYYMMDD), straight from ESPN."""
+    games = fetch_games_from_nba(game_date)
+    compute_win_probabilities(games)
+    return [game.full_dict() for game in games]
+
+def build_game_detail(game_id: str) -> dict[str, Any] | None:
+    """
+    Full-stats view (+ L10 + win probability) of one game from the last poll, same
+    shape as /api/games/stats/{game_id}. No upstream request.
+    """
+    game = app_state.games_by_id.get(game_id)
+    return detail_view(game) if game is not None else None
+
+async def poll_loop():
+    """
+    Poll ESPN and update the games and probabilities. The interval adapts to the slate
+    (see scheduler.py): fast in live and crunch time, slower at breaks, asleep until
+    tipoff before games and until the next morning once everything is final.
+    """
+    scheduler = PollScheduler()
+    next_run = time.monotonic()
+    while True:
+        started = time.monotonic()
+        lag = max(0.0, started - next_run)
+        metrics.POLL_LAG.observe(lag)
+        with tracing.span("poll_loop", lag_ms=round(lag * 1000, 1)) as span:
+            try:
+                await update_games_and_probabilities()
+                delay, reason = scheduler.next_delay(app_state.games)
+            except Exception as e:
+                metrics.POLL_ERRORS.inc()
+                app_state.refresh_failed = True
+                print(f"poll error: {e}")
+                delay, reason = config.POLL_LIVE_SECONDS, "error"
+            span.set(next_poll_s=round(delay, 1), reason=reason)
+        metrics.POLL_DURATION.observe(time.monotonic() - started)
+        metrics.POLL_INTERVAL.set(delay)
+        if reason in ("idle", "pregame"):
+            print(f"Next poll in {delay / 60:.0f} min ({reason})")
+
+        next_run = time.monotonic() + delay
+        await asyncio.sleep(delay)
 
 
 class ConnectionManager:
+    """
+    Tracks /ws clients and what each is subscribed to.
+
+    Every client starts on the "dashboard" channel (the full game list as a bare JSON
+    array, as before) and may subscribe to individual games at full-stats detail:
+
+        {"action": "subscribe", "game_id": "401810123"}        (or "game_ids": [...])
+        {"action": "unsubscribe", "channel": "dashboard"}
+        {"action": "subscribe", "channel": "dashboard"}
+
+    Game updates are sent as {"type": "game", "game_id": ..., "data": {...}} and only when
+    that game's view changed. Every control message is answered with
+    {"type": "subscriptions", "dashboard": bool, "game_ids": [...]} or {"type": "error", ...}.
+
+    Clients may negotiate a binary encoding with the WebSocket subprotocol (see wire.py);
+    control messages from the client are JSON text either way. Each update is encoded
+    once per format in use, not per client.
+    """
+
+    MAX_GAME_SUBSCRIPTIONS = 16
+
     def __init__(self):
         self.active_connections: list[WebSocket] = []
+        self.dashboard_optout: set[WebSocket] = set()
+        self.game_subscribers: dict[str, set[WebSocket]] = {}
+        self._client_games: dict[WebSocket, set[str]] = {}
+        self._last_detail: dict[str, str] = {}
+        # Clients on a binary wire format; everyone else gets JSON text
+        self.formats: dict[WebSocket, str] = {}
 
     async def connect(self, websocket: WebSocket):
-        await websocket.accept()
+        subprotocol = wire.negotiate(websocket.scope.get("subprotocols") or [])
+        await websocket.accept(subprotocol=subprotocol)
         self.active_connections.append(websocket)
+        if subprotocol is not None and subprotocol != wire.JSON:
+            self.formats[websocket] = subprotocol
+            await wire.send(websocket, wire.encode(wire.schema_message(), subprotocol))
+
+    async def send_message(self, websocket: WebSocket, message: dict[str, Any]) -> None:
+        """A control message in the client's format."""
+        await wire.send(websocket, wire.encode(message, self.formats.get(websocket, wire.JSON)))
 
     async def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        self.dashboard_optout.discard(websocket)
+        self.formats.pop(websocket, None)
+        for game_id in self._client_games.pop(websocket, ()):
+            self._remove_game_subscriber(game_id, websocket)
 
+    def _remove_game_subscriber(self, game_id: str, websocket: WebSocket) -> None:
+        subs = self.game_subscribers.get(game_id)
+        if subs is not None:
+            subs.discard(websocket)
+            if not subs:
+                del self.game_subscribers[game_id]
+                self._last_detail.pop(game_id, None)
+
+    def subscription_count(self) -> int:
+        return sum(len(s) for s in self.game_subscribers.values())
+
+    async def handle_message(self, websocket: WebSocket, text: str) -> None:
+        """Apply a subscribe/unsubscribe message; anything that isn't one (heartbeats) is ignored."""
+        try:
+            msg = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(msg, dict) or msg.get("action") not in ("subscribe", "unsubscribe"):
+            return
+        subscribe = msg["action"] == "subscribe"
+        game_ids = msg.get("game_ids") or ([msg["game_id"]] if msg.get("game_id") else [])
+        if not isinstance(game_ids, list) or not all(isinstance(g, str) for g in game_ids):
+            await self.send_message(websocket, {"type": "error", "detail": "game_ids must be a list of strings"})
+            return
+
+        if msg.get("channel") == "dashboard":
+            if subscribe:
+                self.dashboard_optout.discard(websocket)
+            else:
+                self.dashboard_optout.add(websocket)
+
+        client_games = self._client_games.setdefault(websocket, set())
+        new_ids = []
+        for game_id in game_ids:
+            if not subscribe:
+                client_games.discard(game_id)
+                self._remove_game_subscriber(game_id, websocket)
+            elif game_id not in client_games:
+                if game_id not in app_state.games_by_id:
+                    await self.send_message(websocket, {"type": "error", "detail": "Invalid game_id", "game_id": game_id})
+                    continue
+                if len(client_games) >= self.MAX_GAME_SUBSCRIPTIONS:
+                    await self.send_message(websocket, {"type": "error", "detail": "Too many game subscriptions"})
+                    break
+                client_games.add(game_id)
+                self.game_subscribers.setdefault(game_id, set()).add(websocket)
+                new_ids.append(game_id)
+
+        await self.send_message(websocket, {
+            "type": "subscriptions",
+            "dashboard": websocket not in self.dashboard_optout,
+            "game_ids": sorted(client_games),
+        })
+        # Current state right away, so game pages don't wait for the next poll
+        for game_id in new_ids:
+            detail = build_game_detail(game_id)
+            if detail is not None:
+                await self.send_message(websocket, {"type": "game", "game_id": game_id, "data": detail})
+
+    @traced
     async def broadcast_json(self, payload: Any):
-        txt = json.dumps(payload)
-        for c in self.active_connections:
-            try:
-                await c.send_text(txt)
-            except Exception:
-                pass
+        """Send the dashboard payload to every client on the dashboard channel, encoded once per format."""
+        with metrics.BROADCAST_LATENCY.time():
+            txt = wire.encode_games(payload, wire.JSON)
+            frames: dict[str, str | bytes] = {wire.JSON: txt}
+            metrics.BROADCAST_BYTES.observe(len(txt), wire.JSON)
+            optout, binary = self.dashboard_optout, self.formats
+            skip = optout.union(binary) if binary else optout
+            for c in self.active_connections:
+                if c in skip:
+                    continue
+                try:
+                    await c.send_text(txt)
+                except Exception:
+                    pass
+            for c, fmt in list(binary.items()):
+                if c in optout:
+                    continue
+                frame = frames.get(fmt)
+                if frame is None:
+                    frame = frames[fmt] = wire.encode_games(payload, fmt)
+                    metrics.BROADCAST_BYTES.observe(len(frame), fmt)
+                try:
+                    await c.send_bytes(frame)
+                except Exception:
+                    pass
+            tracing.annotate(bytes={fmt: len(f) for fmt, f in frames.items()}, clients=len(self.active_connections))
+
+    @traced
+    async def push_game_details(self):
+        """Send each subscribed game's full-stats view to its subscribers, if it changed."""
+        for game_id, subs in list(self.game_subscribers.items()):
+            detail = build_game_detail(game_id)
+            if detail is None:
+                continue
+            message = {"type": "game", "game_id": game_id, "data": detail}
+            txt = json.dumps(message)
+            if txt == self._last_detail.get(game_id):
+                continue
+            self._last_detail[game_id] = txt
+            frames: dict[str, str | bytes] = {wire.JSON: txt}
+            for c in list(subs):
+                fmt = self.formats.get(c, wire.JSON)
+                frame = frames.get(fmt)
+                if frame is None:
+                    frame = frames[fmt] = wire.encode(message, fmt)
+                try:
+                    await wire.send(c, frame)
+                except Exception:
+                    pass
+            for fmt, frame in frames.items():
+                metrics.BROADCAST_BYTES.observe(len(frame), fmt)
 
 
 manager = ConnectionManager()
+metrics.WS_CLIENTS.set_function(lambda: len(manager.active_connections))
+metrics.WS_GAME_SUBSCRIPTIONS.set_function(manager.subscription_count)
+game_events = EventStream(config.SSE_BUFFER)
+# Upstream-backed routes answer from these and revalidate in the background (see swr.py)
+games_bootstrap = swr.SWRCache("games_bootstrap", executors.ESPN, math.inf, config.SWR_WAIT_SECONDS)
+stats_cache = swr.SWRCache("games_stats", executors.ESPN, config.STATS_TTL_SECONDS, config.SWR_WAIT_SECONDS)
+standings_cache = swr.SWRCache("standings", executors.NBA_STATS, config.STANDINGS_TTL_SECONDS, config.SWR_WAIT_SECONDS)
+lineups_cache = swr.SWRCache("lineups", executors.NBA_STATS, config.LINEUPS_TTL_SECONDS, config.SWR_WAIT_SECONDS)
+# Team form for the poll: the season's store, and the standings L10 used until it's built
+team_form_cache = swr.SWRCache("team_form", executors.NBA_STATS, math.inf, config.SWR_WAIT_SECONDS)
+standings_l10_cache = swr.SWRCache("standings_l10", executors.NBA_STATS, config.STANDINGS_TTL_SECONDS, config.SWR_WAIT_SECONDS)
+metrics.SSE_CLIENTS.set_function(lambda: game_events.clients)
+live_plays = LivePlayByPlay()
+odds_book = odds.OddsBook(config.ODDS_MAX_AGE_SECONDS)
+monitor = calibration.CalibrationMonitor(Path(config.CALIBRATION_PATH))
+snapshots = journal.Journal(config.JOURNAL_DIR, config.JOURNAL_SEGMENT_BYTES, config.JOURNAL_MAX_SEGMENTS)
+
+startup.report.record("imports", time.perf_counter() - _import_started)
+
+
+async def warm_up() -> None:
+    """
+    Restore the last journaled slate, then preload the model and the team-form store
+    and fill the slate, standings and today's lineups before serving (see startup.py). Each fetch goes
+    through the same cache and pool its route uses.
+    """
+    started = time.perf_counter()
+    # Replay mode broadcasts the journal: nothing to restore, and no upstream to warm
+    if config.REPLAY_SPEED is None:
+        with startup.report.phase("journal"):
+            restore_from_journal()
+        if config.WARMUP:
+            today = _today_et().strftime("%Y%m%d")
+            season = _current_nba_season()
+            await startup.warm_up({
+                "model": asyncio.to_thread(util.warm_up_model),
+                "team_form": team_form_cache.prefill(season, lambda: get_store(season)),
+                "scoreboard": games_bootstrap.prefill("today", bootstrap_games),
+                "standings": standings_cache.prefill("current", lambda: normalize_league_standings(fetch_league_standings())),
+                "lineups": lineups_cache.prefill(today, lambda: fetch_lineups(today)),
+            }, config.WARMUP_TIMEOUT_SECONDS)
+    startup.report.record("total", startup.report.phases["imports"] + time.perf_counter() - started)
+    print(startup.report.summary())
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Lifespan for the FastAPI app."""
-    poll_task = asyncio.create_task(poll_loop())
+    """Lifespan for the FastAPI app: restore and warm up, then start polling (or replaying)."""
+    tasks = []
+    if config.ODDS_FEED:
+        # Started first so the first poll can already price against it
+        tasks.append(asyncio.create_task(odds.run_feed(config.ODDS_FEED, odds_book)))
+    await warm_up()
+    tasks.append(asyncio.create_task(replay_loop() if config.REPLAY_SPEED is not None else poll_loop()))
+    if config.LIVE_PBP and config.REPLAY_SPEED is None:
+        tasks.append(asyncio.create_task(live_pbp_loop()))
     try:
         yield
     finally:
-        poll_task.cancel()
-        try:
-            await poll_task
-        except asyncio.CancelledError:
-            pass
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        snapshots.close()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -196,7 +655,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Age", "X-Data-Stale"],
 )
+# Per-request deadline (X-Request-Timeout) for upstream work, see executors.py
+app.add_middleware(executors.DeadlineMiddleware)
+
+if tracing.enabled():
+    @app.middleware("http")
+    async def trace_requests(request: Request, call_next):
+        """Wrap every request in a root span named after its route template."""
+        with tracing.span(f"{request.method} {request.url.path}") as root:
+            response = await call_next(request)
+            route = request.scope.get("route")
+            if route is not None:
+                root.name = f"{request.method} {route.path}"
+            root.set(status=response.status_code)
+            return response
+
+
+def require_debug_token(request: Request) -> None:
+    """/debug/* routes 404 unless DEBUG_TOKEN is configured and sent as X-Debug-Token."""
+    token = request.headers.get("x-debug-token", "")
+    if not config.DEBUG_TOKEN or not secrets.compare_digest(token, config.DEBUG_TOKEN):
+        raise HTTPException(status_code=404, detail="Not Found")
+
 
 @app.get("/")
 def read_root():
@@ -213,9 +695,49 @@ def stats():
     return {"Home score": "125"}
 
 
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus text-format metrics for the poll pipeline, upstreams and WebSocket fan-out."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# Debug Routes (need DEBUG_TOKEN)
+@app.get("/debug/traces")
+def debug_traces(request: Request, limit: int = 20):
+    """Most recent finished traces (poll iterations and requests), newest first. Needs TRACING=1."""
+    require_debug_token(request)
+    return {"enabled": tracing.enabled(), "traces": tracing.recent_traces(max(1, min(limit, config.TRACE_BUFFER)))}
+
+
+_profile_lock = asyncio.Lock()
+
+
+@app.get("/debug/profile")
+async def debug_profile(request: Request, seconds: float = 10.0, interval_ms: float = 5.0):
+    """
+    Sample every thread's stack for `seconds` (max 60) while the app keeps running and
+    return collapsed stacks for flamegraph.pl / speedscope. One profile at a time.
+    """
+    require_debug_token(request)
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    seconds = max(0.1, min(seconds, 60.0))
+    interval = max(0.001, interval_ms / 1000)
+    async with _profile_lock:
+        stacks = await asyncio.to_thread(tracing.sample_stacks, seconds, interval)
+    return PlainTextResponse(stacks)
+
+
+@app.get("/debug/journal")
+def debug_journal(request: Request):
+    """Snapshot journal segments with their time ranges, for picking REPLAY_SINCE / REPLAY_UNTIL."""
+    require_debug_token(request)
+    return {"directory": str(snapshots.directory), "segments": snapshots.describe()}
+
+
 # Live Games Route (dashboard view - lightweight)
 @app.get("/api/games")
-def games():
+async def games(response: Response):
     """
     Returns current games with dashboard-viewable data only:
     - game_id, status
@@ -223,44 +745,86 @@ def games():
     - current scores
     - win probabilities
     
-    Data is from in-memory store updated every 5s by background poll.
+    Data is from in-memory store updated by the background poll (every 5s during live play).
+    Age / X-Data-Stale headers say how old it is and whether the last poll failed.
     Gracefully handles no available games by returning empty list.
     """
     g = list(app_state.games)
-    p = dict(app_state.probabilities)
     
-    # If in-memory store is empty (e.g., on first request), fetch fresh data
-    if not g:
+    # Nothing polled yet (e.g., right after startup): concurrent requests share one fetch,
+    # each waiting at most SWR_WAIT_SECONDS for it
+    metrics.CACHE_REQUESTS.inc("games_state", "hit" if app_state.updated_at else "miss")
+    if not app_state.updated_at:
         try:
-            g = fetch_dashboard_games()
-            p = compute_win_probabilities(g)
-            app_state.games.extend(g)
-            app_state.probabilities.update(p)
+            g = (await games_bootstrap.get("today", bootstrap_games)).value
         except Exception as e:
             print(f"Error fetching games: {e}")
             return []
+    response.headers.update(store_headers())
     
     # Gracefully handle no games scenario
     if not g:
         return []
     
-    return merge_gp(g, p)
+    return [dashboard_view(game) for game in g]
+
+
+# Server-Sent Events feed of the same updates the WebSocket gets
+@app.get("/api/games/stream")
+async def games_stream(request: Request, last_event_id: str | None = None):
+    """
+    text/event-stream of per-game updates from the poll loop. New clients get a
+    "snapshot" event with every game, then "game" events (same shape as one
+    /api/games item) for games that changed and "remove" events for games that left
+    the slate. Reconnecting with Last-Event-ID (header, or ?last_event_id=) resumes
+    with just the missed events.
+    """
+    resume_from = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        game_events.stream(resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # Games with full stats (ScoreboardV2)
 @app.get("/api/games/stats")
-def games_stats(game_date: str | None = None):
+async def games_stats(response: Response, game_date: str | None = None):
     """
     Returns games with full stats (pts, reb, ast, tov, fg%, ft%, 3pt%, points per quarter).
-    Optional query param: game_date (YYYY-MM-DD). Defaults to today.
+    Optional query param: game_date (YYYY-MM-DD). Defaults to today, which is served
+    from the last poll; other dates are cached for STATS_TTL_SECONDS and revalidated
+    in the background. Age / X-Data-Stale headers give the data's age.
     """
-    results = fetch_games_with_stats(game_date=game_date)
-    return {"results": results}
+    if game_date is not None:
+        try:
+            day = date.fromisoformat(game_date)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="game_date must be YYYY-MM-DD")
+    else:
+        day = _today_et()
+
+    if day == _today_et() and app_state.games:
+        response.headers.update(store_headers())
+        return {"results": [detail_view(game) for game in list(app_state.games)]}
+
+    key = day.strftime("%Y%m%d")
+    try:
+        entry = await stats_cache.get(key, lambda: fetch_games_stats(key))
+    except (swr.NotReady, executors.Overloaded):
+        raise HTTPException(status_code=503, detail="Games are loading, retry shortly", headers={"Retry-After": "2"})
+    except executors.DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Timed out fetching games")
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching games stats: {e}")
+        raise HTTPException(status_code=502, detail="Failed to fetch games")
+    response.headers.update(stats_cache.headers(entry))
+    return {"results": entry.value}
 
 
 # Standings route
 @app.get("/api/standings")
-def standings():
+async def standings(response: Response):
     """
     Retrieve current NBA league standings grouped by conference.
 
@@ -273,29 +837,30 @@ def standings():
     recent performance, and current streak information, and is intended
     to be consumed by frontend components displaying standings tables.
 
+    Standings are cached for STANDINGS_TTL_SECONDS and served stale while they are
+    refetched in the background; Age / X-Data-Stale headers give their age.
+
     Returns:
         List[Dict]: A list containing a single dictionary with:
             - "east_standings" (List[Dict]): Eastern Conference standings
             - "west_standings" (List[Dict]): Western Conference standings
     """
-    response = leaguestandings.LeagueStandings()
-    data = response.get_dict()
-    normalized_standings = normalize_league_standings(data)
-    return normalized_standings
+    try:
+        entry = await standings_cache.get("current", lambda: normalize_league_standings(fetch_league_standings()))
+    except (swr.NotReady, executors.Overloaded):
+        raise HTTPException(status_code=503, detail="Standings are loading, retry shortly", headers={"Retry-After": "2"})
+    except executors.DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Timed out fetching standings")
+    except Exception as e:
+        print(f"Error fetching standings: {e}")
+        raise HTTPException(status_code=502, detail="Failed to fetch standings")
+    response.headers.update(standings_cache.headers(entry))
+    return entry.value
 
 # Starting Lineups Route
-@app.get("/api/v1/lineups/{game_date}")
-def get_lineups(game_date: str):
-    # Validate date format
-    if not game_date or len(game_date) != 8 or not game_date.isdigit():
-        return {
-            "error": "Invalid date format. Use YYYYMMDD (e.g., '20260212')",
-            "date": game_date,
-            "games": []
-        }
-    
-    # Construct URL for NBA stats endpoint
-    url = f"https://stats.nba.com/js/data/leaders/00_daily_lineups_{game_date}.json"
+def fetch_lineups(game_date: str) -> dict:
+    """Starting lineups for game_date (YYYYMMDD) from the NBA stats daily lineups file."""
+    url = config.NBA_LINEUPS_URL.format(game_date=game_date)
     
     # Required headers to bypass 403 Forbidden
     headers = {
@@ -306,16 +871,32 @@ def get_lineups(game_date: str):
         "Origin": "https://www.nba.com",
         "Connection": "keep-alive",
     }
+    resp = upstream.get(url, headers=headers, timeout=10)
+    resp.raise_for_status()
+    return parse_lineup_data(resp.json(), game_date)
+
+@app.get("/api/v1/lineups/{game_date}")
+async def get_lineups(game_date: str, response: Response):
+    # Validate date format
+    if not game_date or len(game_date) != 8 or not game_date.isdigit():
+        return {
+            "error": "Invalid date format. Use YYYYMMDD (e.g., '20260212')",
+            "date": game_date,
+            "games": []
+        }
     
+    # Cached per date; a stale copy is served while it is refetched in the background
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-        raw_data = resp.json()
-        
-        # Parse and structure the response
-        structured_lineups = parse_lineup_data(raw_data, game_date)
-        return structured_lineups
+        entry = await lineups_cache.get(game_date, lambda: fetch_lineups(game_date))
+        response.headers.update(lineups_cache.headers(entry))
+        return entry.value
         
+    except (swr.NotReady, executors.Overloaded):
+        return {
+            "error": "Lineups are loading, retry shortly.",
+            "date": game_date,
+            "games": []
+        }
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 404:
             # Lineups not available yet for this date
@@ -330,7 +911,7 @@ def get_lineups(game_date: str):
                 "date": game_date,
                 "games": []
             }
-    except requests.exceptions.Timeout:
+    except (requests.exceptions.Timeout, executors.DeadlineExceeded):
         return {
             "error": "Request timeout. NBA stats server may be slow or unavailable.",
             "date": game_date,
@@ -424,40 +1005,89 @@ def parse_lineup_data(raw_data: dict, game_date: str) -> dict:
 
 # Endpoint for specific game using game_id
 @app.get("/api/games/stats/{game_id}")
-def single_game_stats(game_id: str):
+async def single_game_stats(game_id: str, response: Response, spread: float | None = None, total: float | None = None):
     """
     Returns full normalized stats + win probability for ONE specific game.
     Uses full game data (not dashboard lightweight version).
-    First checks in-memory dashboard store, then fetches full stats if needed.
+    Served from the last poll; the dashboard and full-stats views are the same
+    GameState, so a game missing here is not on today's slate.
+    Adds a Monte Carlo "simulation" of the rest of the game (see simulator.py), with
+    cover and over/under chances when a home `spread` and/or `total` line is given.
     """
-    # Check if game exists in dashboard store first
-    g_dashboard = list(app_state.games)
-    game_exists = any(game["game_id"] == game_id for game in g_dashboard)
-    
-    if not game_exists:
+    detail = build_game_detail(game_id)
+    if detail is None:
         return {"error": "Invalid game_id"}, 404
-    
-    # Fetch full stats for this specific game
-    try:
-        g_full = fetch_games_from_nba()
-        p = compute_win_probabilities(g_full)
-        
-        target = next((game for game in g_full if game["game_id"] == game_id), None)
-        
-        if not target:
-            return {"error": "Invalid game_id"}, 404
-        
-        result = merge_gp([target], p)
-        return result[0]
-    except Exception as e:
-        print(f"Error fetching game stats: {e}")
-        return {"error": "Failed to fetch game stats"}, 500
+    game = app_state.games_by_id.get(game_id)
+    sim = await asyncio.to_thread(simulate_game, game, config.SIM_PATHS) if game is not None else None
+    detail["simulation"] = sim.to_json(spread, total) if sim is not None else None
+    response.headers.update(store_headers())
+    return detail
   
+# Live model calibration (see calibration.py)
+@app.get("/api/monitor/calibration")
+async def get_calibration(group_by: str = "", model: str | None = None):
+    """
+    Brier score, log loss, ECE and reliability bins of the live probabilities of games
+    that have gone Final, per model version and source (scoreboard / live_pbp), broken
+    down by `group_by`: a comma-separated subset of "quarter", "margin".
+    """
+    dims = tuple(d for d in group_by.split(",") if d)
+    if any(d not in ("quarter", "margin") for d in dims):
+        raise HTTPException(status_code=422, detail='group_by must be a comma-separated subset of "quarter", "margin"')
+    return {"pending_games": len(monitor.pending), "results": monitor.summary(dims, model)}
+
+# Player props priced from the last poll (see props.py)
+@app.get("/api/props")
+async def get_props(response: Response, game_id: str | None = None, player: str | None = None):
+    """
+    Returns over/under prices for each team's current scoreboard leader in points,
+    rebounds and assists, for games in play, optionally for one game and/or player
+    (case-insensitive). A player is priced only in the stats they currently lead, so
+    entries come and go as leaders change; the scoreboard carries no other player
+    stats. Priced once per poll; no upstream request.
+    """
+    response.headers.update(store_headers())
+    results = [
+        entry for (gid, name), entry in app_state.props.items()
+        if (game_id is None or gid == game_id) and (player is None or name.lower() == player.lower())
+    ]
+    return {"results": results}
+
+# Full-game win probability curve (NBA CDN play-by-play)
+@app.get("/api/games/{game_id}/wp-curve")
+async def wp_curve(game_id: str):
+    """
+    Returns the home win probability after every game second with an action, for an
+    NBA game ID (e.g. 0022500788). All actions are scored in one model call using the
+    teams' records and L10 as of the game date. Cached per game; live games are
+    extended from the last processed action on each request. Runs on the NBA CDN pool.
+    """
+    if len(game_id) != 10 or not game_id.isdigit():
+        raise HTTPException(status_code=404, detail="Invalid game_id")
+    try:
+        return await executors.NBA_CDN.run(get_wp_curve, game_id)
+    except executors.Overloaded:
+        raise HTTPException(status_code=503, detail="Too many play-by-play requests, retry shortly", headers={"Retry-After": "2"})
+    except executors.DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Timed out fetching play-by-play")
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code in (403, 404):
+            raise HTTPException(status_code=404, detail="Invalid game_id")
+        raise HTTPException(status_code=502, detail="Failed to fetch play-by-play")
+    except requests.exceptions.RequestException:
+        raise HTTPException(status_code=502, detail="Failed to fetch play-by-play")
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    """Live updates; see ConnectionManager for the subscription protocol."""
     await manager.connect(websocket)
     try:
         while True:
-            await websocket.receive_text()
+            await manager.handle_message(websocket, await websocket.receive_text())
     except WebSocketDisconnect:
+        pass
+    finally:
         await manager.disconnect(websocket)
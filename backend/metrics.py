@@ -0,0 +1,218 @@
+"""
+Process-wide counters, gauges and histograms, exposed in Prometheus text format on /metrics.
+
+Dependency-free and cheap enough to leave on: an observation is one bisect into
+fixed buckets plus a few additions under a lock, and label values are plain tuples.
+Everything the poll pipeline, upstream fetches and WebSocket fan-out record is
+declared at the bottom of this module.
+"""
+import bisect
+import math
+import threading
+import time
+from typing import Callable
+
+# Seconds; covers sub-millisecond parses up to slow upstream calls
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+BYTES_BUCKETS = tuple(256 * 4 ** i for i in range(9))  # 256 B .. 16 MiB
+
+_registry: list["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """A value that goes up and down; pass `func` to read it at scrape time instead of setting it."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), func: Callable[[], float] | None = None):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._func = func
+
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+    def set_function(self, func: Callable[[], float]) -> None:
+        self._func = func
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        if self._func is not None:
+            lines.append(f"{self.name} {_format_value(self._func())}")
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("_hist", "_labels", "_start")
+
+    def __init__(self, hist: "Histogram", labels: tuple):
+        self._hist = hist
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._hist.observe(time.perf_counter() - self._start, *self._labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last slot is +Inf), sum, count]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels) -> _Timer:
+        """Context manager observing the elapsed wall time of its block."""
+        return _Timer(self, labels)
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        with self._lock:
+            items = [(labels, list(s[0]), s[1], s[2]) for labels, s in self._series.items()]
+        for labels, counts, total, n in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (math.inf,), counts):
+                cumulative += c
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {n}")
+        return lines
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_seconds", "Latency of requests to upstream services.", ("host",)
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total", "Failed upstream requests by host and error kind (HTTP status or exception).",
+    ("host", "kind"),
+)
+UPSTREAM_CIRCUIT = Gauge(
+    "upstream_circuit_state", "Circuit breaker state per upstream host: 0 closed, 1 half-open, 2 open.", ("host",)
+)
+PARSE_LATENCY = Histogram(
+    "parse_seconds", "Time to parse an upstream scoreboard into game dicts.", ("view",)
+)
+INFERENCE_LATENCY = Histogram(
+    "inference_seconds", "Time spent in win-probability model calls.", ("model", "caller")
+)
+BROADCAST_LATENCY = Histogram(
+    "broadcast_seconds", "Time to serialize and fan out one update to every WebSocket client."
+)
+BROADCAST_BYTES = Histogram(
+    "broadcast_payload_bytes", "Size of each serialized WebSocket update, per wire format (see wire.py).",
+    ("format",), buckets=BYTES_BUCKETS,
+)
+WS_CLIENTS = Gauge("websocket_clients", "Currently connected WebSocket clients.")
+SSE_CLIENTS = Gauge("sse_clients", "Open /api/games/stream connections.")
+WS_GAME_SUBSCRIPTIONS = Gauge("websocket_game_subscriptions", "Per-game full-stats subscriptions across all clients.")
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result")
+)
+POLL_LAG = Histogram(
+    "poll_loop_lag_seconds", "How late each poll iteration started relative to its schedule."
+)
+POLL_DURATION = Histogram("poll_duration_seconds", "Duration of one poll iteration.")
+POLL_ERRORS = Counter("poll_errors_total", "Poll iterations that raised.")
+POLL_INTERVAL = Gauge("poll_interval_seconds", "Sleep chosen by the adaptive scheduler before the next poll.")
+STARTUP_SECONDS = Gauge("startup_seconds", "Time spent in each startup phase (imports, warm-up steps, total).", ("phase",))
+EXECUTOR_QUEUE_DEPTH = Gauge("executor_queue_depth", "Calls waiting for a worker, per upstream pool.", ("pool",))
+EXECUTOR_ACTIVE = Gauge("executor_active", "Calls running, per upstream pool.", ("pool",))
+EXECUTOR_WAIT = Histogram("executor_wait_seconds", "Time calls spent queued before a worker took them.", ("pool",))
+EXECUTOR_REJECTED = Counter(
+    "executor_rejected_total", "Calls refused (pool queue full) or dropped (request deadline passed).", ("pool", "reason")
+)
+ODDS_QUOTES = Counter("odds_quotes_total", "Quotes read from the odds feed, accepted or rejected.", ("result",))
+CALIBRATION_PREDICTIONS = Counter("calibration_predictions_total", "Live predictions recorded by the calibration monitor.")
+CALIBRATION_BRIER = Gauge("calibration_brier", "Brier score of settled live predictions.", ("model", "source"))
+CALIBRATION_LOG_LOSS = Gauge("calibration_log_loss", "Log loss of settled live predictions.", ("model", "source"))
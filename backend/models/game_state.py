@@ -0,0 +1,222 @@
+"""
+Slotted records for live game state, built once per poll from the ESPN scoreboard.
+
+A GameState holds two TeamState records with numeric fields (records, scores,
+quarter points, box-score totals as ints) instead of the ~50 prefixed keys the API
+exposes. L10 and win probabilities are set on the records in place, and the only
+conversion back to the public JSON shape is dashboard_dict() / full_dict(), which zip
+precomputed key tuples with the values (box-score totals go back out as strings, as
+the frontend expects).
+"""
+from datetime import datetime
+from typing import Any
+
+from models.schemas import Game
+
+# ESPN stat names for the box-score totals, in TeamState.BOX_FIELDS order
+_BOX_STATS = (
+    "rebounds", "assists", "fieldGoalsAttempted", "fieldGoalsMade",
+    "freeThrowsAttempted", "freeThrowsMade", "points",
+    "threePointFieldGoalsAttempted", "threePointFieldGoalsMade",
+)
+_LEADER_STATS = ("points", "rebounds", "assists")
+
+
+def _parse_record(records: list | None) -> tuple[int, int]:
+    """(wins, losses) from an ESPN competitor's overall record summary like "30-24"."""
+    rec = next((r for r in (records or []) if r.get("name") == "overall" or r.get("type") == "total"), None)
+    summary = (rec or {}).get("summary", "") or ""
+    parts = summary.split("-")
+    if len(parts) != 2:
+        return 0, 0
+    try:
+        return int(parts[0].strip()), int(parts[1].strip())
+    except ValueError:
+        return 0, 0
+
+
+def _to_int(value: Any) -> int | None:
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class TeamState:
+    DASHBOARD_FIELDS = ("team", "city", "abbreviation", "wins", "losses", "score")
+    FULL_FIELDS = DASHBOARD_FIELDS + (
+        "q1", "q2", "q3", "q4",
+        "leader_pts_name", "leader_pts_val", "leader_reb_name", "leader_reb_val",
+        "leader_ast_name", "leader_ast_val",
+        "reb", "ast", "fga", "fgm", "fta", "ftm", "points", "3pa", "3pm",
+    )
+    BOX_FIELDS = ("reb", "ast", "fga", "fgm", "fta", "ftm", "points", "fg3a", "fg3m")
+
+    __slots__ = (
+        "name", "city", "abbreviation", "wins", "losses", "score", "l10_wins",
+        "q1", "q2", "q3", "q4",
+        "leader_pts_name", "leader_pts_val", "leader_reb_name", "leader_reb_val",
+        "leader_ast_name", "leader_ast_val",
+    ) + BOX_FIELDS
+
+    @classmethod
+    def from_competitor(cls, c: dict[str, Any]) -> "TeamState":
+        """Stats, leaders and linescores of an ESPN competitor are each indexed once."""
+        team = cls()
+        t = c.get("team") or {}
+        team.name = t.get("shortDisplayName") or t.get("name", "")
+        team.city = t.get("location", "")
+        team.abbreviation = t.get("abbreviation", "")
+        team.wins, team.losses = _parse_record(c.get("records"))
+        team.score = int(c.get("score", 0) or 0)
+        team.l10_wins = 0
+
+        quarters = {}
+        for i, line in enumerate(c.get("linescores") or [], start=1):
+            period = line.get("period") or i
+            if period <= 4:
+                quarters[period] = line.get("value")
+        team.q1, team.q2, team.q3, team.q4 = (quarters.get(p) for p in (1, 2, 3, 4))
+
+        leaders = {}
+        for entry in c.get("leaders") or []:
+            if entry.get("leaders") and entry.get("name") not in leaders:
+                leaders[entry.get("name")] = entry["leaders"][0]
+        names_vals = []
+        for stat in _LEADER_STATS:
+            leader = leaders.get(stat)
+            if leader is None:
+                names_vals += (None, None)
+            else:
+                names_vals += ((leader.get("athlete") or {}).get("fullName"), leader.get("displayValue"))
+        (team.leader_pts_name, team.leader_pts_val, team.leader_reb_name, team.leader_reb_val,
+         team.leader_ast_name, team.leader_ast_val) = names_vals
+
+        # reversed so the first entry wins if ESPN repeats a stat name
+        stats = {st.get("name"): st.get("displayValue") for st in reversed(c.get("statistics") or c.get("stats") or [])}
+        for field, name in zip(cls.BOX_FIELDS, _BOX_STATS):
+            setattr(team, field, _to_int(stats.get(name)))
+        return team
+
+    def to_record(self) -> list:
+        """Every slot, in __slots__ order (see GameState.to_record)."""
+        return [getattr(self, field) for field in self.__slots__]
+
+    @classmethod
+    def from_record(cls, record: list) -> "TeamState":
+        team = cls()
+        for field, value in zip(cls.__slots__, record):
+            setattr(team, field, value)
+        return team
+
+    def dashboard_values(self) -> tuple:
+        return (self.name, self.city, self.abbreviation, self.wins, self.losses, self.score)
+
+    def full_values(self) -> tuple:
+        box = tuple(None if v is None else str(v) for v in (
+            self.reb, self.ast, self.fga, self.fgm, self.fta, self.ftm, self.points, self.fg3a, self.fg3m,
+        ))
+        return (
+            self.name, self.city, self.abbreviation, self.wins, self.losses, self.score,
+            self.q1, self.q2, self.q3, self.q4,
+            self.leader_pts_name, self.leader_pts_val, self.leader_reb_name, self.leader_reb_val,
+            self.leader_ast_name, self.leader_ast_val,
+        ) + box
+
+
+def _keys(head: tuple[str, ...], fields: tuple[str, ...]) -> tuple[str, ...]:
+    return head + tuple(f"{side}_{f}" for side in ("home", "away") for f in fields) + (
+        "home_l10_wins", "away_l10_wins", "home_win_prob", "away_win_prob",
+    )
+
+
+class GameState:
+    # Public JSON keys, in the order the API has always emitted them
+    DASHBOARD_KEYS = _keys(("game_id", "status", "start_time"), TeamState.DASHBOARD_FIELDS)
+    FULL_KEYS = _keys(("game_id", "status"), TeamState.FULL_FIELDS)
+
+    __slots__ = ("game_id", "status", "start_time", "home", "away", "home_win_prob", "away_win_prob")
+
+    def __init__(self, game_id: str, status: str, start_time: str, home: TeamState, away: TeamState):
+        self.game_id = game_id
+        self.status = status
+        self.start_time = start_time
+        self.home = home
+        self.away = away
+        self.home_win_prob: float | None = None
+        self.away_win_prob: float | None = None
+
+    @classmethod
+    def from_event(cls, event: dict[str, Any]) -> "GameState | None":
+        """One pass over an ESPN scoreboard event; None if it has no home/away competitors."""
+        comps = event.get("competitions") or []
+        if not comps:
+            return None
+        comp = comps[0]
+        home = away = None
+        for c in comp.get("competitors") or []:
+            side = c.get("homeAway")
+            if side == "home" and home is None:
+                home = c
+            elif side == "away" and away is None:
+                away = c
+        if not home or not away:
+            return None
+        status_type = (comp.get("status") or {}).get("type") or {}
+        return cls(
+            event.get("id", ""),
+            status_type.get("shortDetail") or status_type.get("description") or "",
+            event.get("date") or comp.get("date") or "",
+            TeamState.from_competitor(home),
+            TeamState.from_competitor(away),
+        )
+
+    def to_record(self) -> list:
+        """
+        The whole state as a JSON-able list, for the snapshot journal (journal.py). Positional:
+        changing the slots changes the format, so bump journal.RECORD_VERSION with them.
+        """
+        return [
+            self.game_id, self.status, self.start_time, self.home.to_record(), self.away.to_record(),
+            self.home_win_prob, self.away_win_prob,
+        ]
+
+    @classmethod
+    def from_record(cls, record: list) -> "GameState":
+        game_id, status, start_time, home, away, home_win_prob, away_win_prob = record
+        game = cls(game_id, status, start_time, TeamState.from_record(home), TeamState.from_record(away))
+        game.home_win_prob, game.away_win_prob = home_win_prob, away_win_prob
+        return game
+
+    def set_probabilities(self, probs: dict[str, float] | None) -> None:
+        if probs:
+            self.home_win_prob, self.away_win_prob = probs["home_win_prob"], probs["away_win_prob"]
+
+    def _tail(self) -> tuple:
+        return (self.home.l10_wins, self.away.l10_wins, self.home_win_prob, self.away_win_prob)
+
+    def dashboard_dict(self, extras: bool = True) -> dict[str, Any]:
+        """/api/games item: dashboard fields, then L10 and win probabilities unless extras=False."""
+        values = (self.game_id, self.status, self.start_time, *self.home.dashboard_values(), *self.away.dashboard_values())
+        return dict(zip(self.DASHBOARD_KEYS, values + self._tail() if extras else values))
+
+    def full_dict(self, extras: bool = True) -> dict[str, Any]:
+        """/api/games/stats/{game_id} shape: full stats, then L10 and win probabilities unless extras=False."""
+        values = (self.game_id, self.status, *self.home.full_values(), *self.away.full_values())
+        return dict(zip(self.FULL_KEYS, values + self._tail() if extras else values))
+
+    def to_schema(self) -> Game:
+        """The persisted Game model (models/schemas.py)."""
+        return Game(
+            game_id=int(self.game_id),
+            game_date=datetime.fromisoformat(self.start_time.replace("Z", "")),
+            home_team=self.home.name,
+            away_team=self.away.name,
+            home_score=self.home.score,
+            away_score=self.away.score,
+            home_record=f"{self.home.wins}-{self.home.losses}",
+            away_record=f"{self.away.wins}-{self.away.losses}",
+            status=self.status,
+        )
@@ -10,6 +10,7 @@ class Game(BaseModel):
     away_score: int
     home_record: str
     away_record: str
+    status: str = ""
 
 
 # Potential schema for live game stats 
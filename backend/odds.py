@@ -0,0 +1,202 @@
+"""
+Sportsbook odds ingestion and model-vs-market edges.
+
+A feed (ODDS_FEED) keeps an OddsBook of the latest moneyline quote per matchup.
+Feeds are picked by URL scheme and registered in FEEDS, so another source only needs
+an async function that upserts quotes into the book:
+
+    file:///path/odds.json   re-read whenever the file changes; the file is the whole
+                             board (a JSON array, or one JSON object per line)
+    tcp://host:port          newline-delimited JSON quotes, each replacing the last one
+                             for its matchup; reconnects if the connection drops
+
+A quote is {"home": "BOS", "away": "NY", "home_price": -150, "away_price": 130},
+optionally with "book" and "format" ("american" / "decimal"; by default prices with
+|x| >= 100 are American and the rest decimal). Teams are matched to the scoreboard by
+abbreviation (team_form.normalize_abbrev, so "GS" and "GSW" agree).
+
+On every poll, edges() turns the book into per-game market fields for all quoted games
+in one numpy pass: implied probabilities with the vig removed (each side's 1/decimal
+over their sum), the model's edge over them in percentage points, and the expected
+value of a 1-unit bet at the quoted price.
+"""
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable
+from urllib.parse import urlparse
+
+import numpy as np
+
+from metrics import ODDS_QUOTES
+from models.game_state import GameState
+from team_form import normalize_abbrev
+
+# How often a file feed checks for changes, and how long a tcp feed waits to reconnect
+FILE_CHECK_SECONDS = 1.0
+RECONNECT_SECONDS = 5.0
+# Longest quote line a TCP feed may send; a longer one drops the connection
+LINE_LIMIT_BYTES = 1024 * 1024
+
+
+def to_decimal(price: float, fmt: str | None = None) -> float:
+    """Decimal odds for an American or decimal price."""
+    if fmt is None:
+        fmt = "american" if abs(price) >= 100 else "decimal"
+    if fmt == "decimal":
+        if price <= 1:
+            raise ValueError(f"decimal odds must be above 1: {price}")
+        return float(price)
+    if fmt != "american" or abs(price) < 100:
+        raise ValueError(f"invalid {fmt} odds: {price}")
+    return 1 + (price / 100 if price > 0 else 100 / -price)
+
+
+class Quote:
+    __slots__ = ("home", "away", "home_price", "away_price", "home_decimal", "away_decimal", "book", "received_at")
+
+    def __init__(self, raw: dict[str, Any], received_at: float):
+        fmt = raw.get("format")
+        self.home = normalize_abbrev(raw["home"])
+        self.away = normalize_abbrev(raw["away"])
+        self.home_price = raw["home_price"]
+        self.away_price = raw["away_price"]
+        self.home_decimal = to_decimal(float(self.home_price), fmt)
+        self.away_decimal = to_decimal(float(self.away_price), fmt)
+        if 1 / self.home_decimal + 1 / self.away_decimal < 1:
+            raise ValueError("prices imply under 100% between the two sides")
+        self.book = raw.get("book")
+        self.received_at = received_at
+
+
+class OddsBook:
+    """Latest quote per (home, away) abbreviation pair."""
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self.quotes: dict[tuple[str, str], Quote] = {}
+
+    def _parse(self, raws: Iterable[Any]) -> list[Quote]:
+        now = time.time()
+        quotes = []
+        for raw in raws:
+            try:
+                quotes.append(Quote(raw, now))
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                ODDS_QUOTES.inc("rejected")
+                print(f"odds: skipping quote {raw!r}: {e}")
+            else:
+                ODDS_QUOTES.inc("accepted")
+        return quotes
+
+    def upsert(self, raws: Iterable[Any]) -> None:
+        for quote in self._parse(raws):
+            self.quotes[(quote.home, quote.away)] = quote
+
+    def replace(self, raws: Iterable[Any]) -> None:
+        self.quotes = {(q.home, q.away): q for q in self._parse(raws)}
+
+    def get(self, home: str, away: str) -> Quote | None:
+        quote = self.quotes.get((normalize_abbrev(home), normalize_abbrev(away)))
+        if quote is None or time.time() - quote.received_at > self.max_age:
+            return None
+        return quote
+
+    def edges(self, games: list[GameState]) -> dict[str, dict[str, Any]]:
+        """Market fields by game_id for every game with a live quote and model probabilities."""
+        matched = []
+        for game in games:
+            if game.home_win_prob is None or game.away_win_prob is None:
+                continue
+            quote = self.get(game.home.abbreviation, game.away.abbreviation)
+            if quote is not None:
+                matched.append((game, quote))
+        if not matched:
+            return {}
+
+        model = np.array([(g.home_win_prob, g.away_win_prob) for g, _ in matched]) / 100
+        decimal = np.array([(q.home_decimal, q.away_decimal) for _, q in matched])
+        implied = 1 / decimal
+        overround = implied.sum(axis=1, keepdims=True)
+        fair = implied / overround
+        edge = 100 * (model - fair)
+        ev = model * decimal - 1
+
+        out = {}
+        for i, (game, quote) in enumerate(matched):
+            out[game.game_id] = {
+                "book": quote.book,
+                "home_price": quote.home_price,
+                "away_price": quote.away_price,
+                "home_implied_prob": round(100 * fair[i, 0].item(), 2),
+                "away_implied_prob": round(100 * fair[i, 1].item(), 2),
+                "vig": round(100 * (overround[i, 0].item() - 1), 2),
+                "home_edge": round(edge[i, 0].item(), 2),
+                "away_edge": round(edge[i, 1].item(), 2),
+                "home_ev": round(ev[i, 0].item(), 4),
+                "away_ev": round(ev[i, 1].item(), 4),
+                "quoted_at": quote.received_at,
+            }
+        return out
+
+
+def _load_board(path: Path) -> list[Any]:
+    text = path.read_text()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        return json.loads(stripped)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+async def file_feed(url: str, book: OddsBook) -> None:
+    """Reload the whole board from a local file whenever its mtime changes."""
+    path = Path(urlparse(url).path)
+    seen = None
+    while True:
+        try:
+            mtime = path.stat().st_mtime_ns
+            if mtime != seen:
+                book.replace(await asyncio.to_thread(_load_board, path))
+                seen = mtime
+        except (OSError, ValueError) as e:
+            print(f"odds: failed to read {path}: {e}")
+        await asyncio.sleep(FILE_CHECK_SECONDS)
+
+
+async def tcp_feed(url: str, book: OddsBook) -> None:
+    """Apply newline-delimited JSON quotes from a socket as they arrive."""
+    parsed = urlparse(url)
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(parsed.hostname, parsed.port, limit=LINE_LIMIT_BYTES)
+            try:
+                while line := await reader.readline():
+                    try:
+                        book.upsert([json.loads(line)])
+                    except ValueError as e:
+                        print(f"odds: bad line from {url}: {e}")
+            finally:
+                writer.close()
+            print(f"odds: {url} closed the connection")
+        except OSError as e:
+            print(f"odds: {url} unavailable: {e}")
+        except ValueError as e:
+            # readline() past LINE_LIMIT_BYTES; the rest of that line is still on the
+            # socket, so start over on a fresh connection rather than resync mid-line
+            print(f"odds: line from {url} over {LINE_LIMIT_BYTES} bytes, reconnecting: {e}")
+        await asyncio.sleep(RECONNECT_SECONDS)
+
+
+FEEDS: dict[str, Callable[[str, OddsBook], Awaitable[None]]] = {
+    "file": file_feed,
+    "tcp": tcp_feed,
+}
+
+
+def run_feed(url: str, book: OddsBook) -> Awaitable[None]:
+    """The feed coroutine for an ODDS_FEED URL."""
+    scheme = urlparse(url).scheme
+    if scheme not in FEEDS:
+        raise ValueError(f"unsupported odds feed {url!r} (expected one of: {', '.join(FEEDS)})")
+    return FEEDS[scheme](url, book)
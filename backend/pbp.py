@@ -0,0 +1,88 @@
+"""
+NBA CDN play-by-play: fetching, on top of the vectorized parsing in pbp_parse.py.
+
+The liveData feeds (cdn.nba.com) expose every action of a game with its period,
+ISO-8601 clock ("PT11M32.00S") and running score. The parsing works on whole columns
+at once; nothing loops over actions in Python. ml/preprocessing/scrape_v1.py uses
+pbp_parse too, so training rows and live features are derived from the clock the same way.
+"""
+import gzip
+import json
+from pathlib import Path
+from typing import Any
+
+import upstream
+from metrics import CACHE_REQUESTS
+# Parsing and CDN constants live in pbp_parse (shared with the training scraper); re-exported here
+from pbp_parse import (  # noqa: F401
+    BOXSCORE_URL, CDN_HEADERS, CLOCK_PATTERN, PBP_URL, SCOREBOARD_URL,
+    actions_frame, dedupe_by_elapsed, elapsed_seconds, parse_clock_series, seconds_remaining_in_game,
+)
+
+# Raw play-by-play cached by the training scraper (ml/preprocessing/scrape_v1.py)
+_SCRAPER_CACHE_DIR = Path(__file__).resolve().parent.parent / "ml" / "datasets" / "pbp_cache"
+
+
+def _load_scraper_cache(game_id: str) -> dict | None:
+    path = _SCRAPER_CACHE_DIR / f"{game_id}.json.gz"
+    if not path.is_file():
+        return None
+    with gzip.open(path, "rb") as f:
+        return json.loads(f.read())
+
+
+def fetch_playbyplay(game_id: str, use_cache: bool = True) -> list[dict[str, Any]]:
+    """
+    Actions for a game. Archived games are loaded from the scraper's local cache
+    when present; otherwise (and always for live games, use_cache=False) the CDN is hit.
+    """
+    if use_cache:
+        cached = _load_scraper_cache(game_id)
+        CACHE_REQUESTS.inc("pbp_disk", "miss" if cached is None else "hit")
+        if cached is not None:
+            return cached["game"]["actions"]
+    resp = upstream.get(PBP_URL.format(game_id=game_id), headers=CDN_HEADERS, timeout=10)
+    resp.raise_for_status()
+    return resp.json()["game"]["actions"]
+
+
+def fetch_playbyplay_if_changed(game_id: str, etag: str | None) -> tuple[list[dict[str, Any]] | None, str | None]:
+    """
+    (actions, etag) for a live game, or (None, etag) if the feed hasn't changed since the
+    response that carried `etag` (a 304 with no body to download or parse).
+    """
+    headers = {**CDN_HEADERS, "If-None-Match": etag} if etag else CDN_HEADERS
+    resp = upstream.get(PBP_URL.format(game_id=game_id), headers=headers, timeout=10)
+    if resp.status_code == 304:
+        return None, etag
+    resp.raise_for_status()
+    return resp.json()["game"]["actions"], resp.headers.get("ETag")
+
+
+def fetch_todays_games() -> list[dict[str, Any]]:
+    """NBA game ID, home/away tricodes and tipoff time (UTC ISO) of every game on today's CDN scoreboard."""
+    resp = upstream.get(SCOREBOARD_URL, headers=CDN_HEADERS, timeout=10)
+    resp.raise_for_status()
+    return [
+        {
+            "game_id": game.get("gameId", ""),
+            "home_abbreviation": (game.get("homeTeam") or {}).get("teamTricode", ""),
+            "away_abbreviation": (game.get("awayTeam") or {}).get("teamTricode", ""),
+            "game_time_utc": game.get("gameTimeUTC", ""),
+        }
+        for game in (resp.json().get("scoreboard") or {}).get("games") or []
+    ]
+
+
+def fetch_boxscore_summary(game_id: str) -> dict[str, Any]:
+    """Home/away tricodes, tipoff time (UTC ISO) and status (1 pre, 2 live, 3 final) for a game."""
+    resp = upstream.get(BOXSCORE_URL.format(game_id=game_id), headers=CDN_HEADERS, timeout=10)
+    resp.raise_for_status()
+    game = resp.json()["game"]
+    return {
+        "game_id": game_id,
+        "home_abbreviation": (game.get("homeTeam") or {}).get("teamTricode", ""),
+        "away_abbreviation": (game.get("awayTeam") or {}).get("teamTricode", ""),
+        "game_time_utc": game.get("gameTimeUTC", ""),
+        "game_status": int(game.get("gameStatus") or 0),
+    }
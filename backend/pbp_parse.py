@@ -0,0 +1,84 @@
+"""
+The import-light half of pbp.py: NBA CDN URLs and headers, and the vectorized clock /
+action parsing. Needs only numpy and pandas, so ml/preprocessing/scrape_v1.py can share
+it without pulling in the backend's HTTP, metrics and config modules.
+"""
+import re
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+PBP_URL = "https://cdn.nba.com/static/json/liveData/playbyplay/playbyplay_{game_id}.json"
+BOXSCORE_URL = "https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{game_id}.json"
+SCOREBOARD_URL = "https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json"
+
+_SEC_PER_QUARTER = 720
+_SEC_REGULATION = 4 * _SEC_PER_QUARTER
+_SEC_OT = 300
+
+# "PT11M32.00S" (CDN liveData) or "11:32" (stats.nba.com)
+_CLOCK_RE = r"^(?:PT(?:(?P<iso_min>\d+)M)?(?P<iso_sec>\d+(?:\.\d+)?)S|(?P<min>\d+):(?P<sec>\d+(?:\.\d+)?))$"
+CLOCK_PATTERN = re.compile(_CLOCK_RE)
+
+CDN_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "application/json, text/plain, */*",
+    "Origin": "https://www.nba.com",
+    "Referer": "https://www.nba.com/",
+}
+
+
+def parse_clock_series(clock: pd.Series) -> pd.Series:
+    """Seconds left in the current period for a whole column of clocks. Unparseable -> NaN."""
+    parts = clock.astype("string").str.strip().str.extract(_CLOCK_RE)
+    minutes = pd.to_numeric(parts["iso_min"].fillna(parts["min"]), errors="coerce")
+    seconds = pd.to_numeric(parts["iso_sec"].fillna(parts["sec"]), errors="coerce")
+    # "PT32.00S" has no minutes component
+    minutes = minutes.where(minutes.notna() | seconds.isna(), 0)
+    return minutes * 60 + np.floor(seconds)
+
+
+def seconds_remaining_in_game(period: pd.Series, clock_sec: pd.Series) -> pd.Series:
+    """Total seconds left in the game (regulation) or in the current OT period."""
+    regulation = (4 - period) * _SEC_PER_QUARTER + clock_sec
+    return regulation.where(period <= 4, clock_sec)
+
+
+def elapsed_seconds(period: pd.Series, clock_sec: pd.Series) -> pd.Series:
+    """Seconds since tipoff, continuing to count through overtime."""
+    regulation = period.clip(upper=4) * _SEC_PER_QUARTER - clock_sec
+    overtime = _SEC_REGULATION + (period - 4) * _SEC_OT - clock_sec
+    return regulation.where(period <= 4, overtime)
+
+
+def actions_frame(actions: list[dict[str, Any]]) -> pd.DataFrame:
+    """
+    One row per action with ACTION_NUMBER, PERIOD, SECONDS_REMAINING, ELAPSED,
+    HOME_SCORE and AWAY_SCORE (scores forward-filled). Rows without a usable
+    clock are dropped.
+    """
+    df = pd.DataFrame(actions, columns=["actionNumber", "period", "clock", "scoreHome", "scoreAway"])
+    out = pd.DataFrame({
+        "ACTION_NUMBER": pd.to_numeric(df["actionNumber"], errors="coerce"),
+        "PERIOD": pd.to_numeric(df["period"], errors="coerce"),
+    })
+    clock_sec = parse_clock_series(df["clock"])
+    out["SECONDS_REMAINING"] = seconds_remaining_in_game(out["PERIOD"], clock_sec)
+    out["ELAPSED"] = elapsed_seconds(out["PERIOD"], clock_sec)
+    out["HOME_SCORE"] = pd.to_numeric(df["scoreHome"], errors="coerce").ffill().fillna(0)
+    out["AWAY_SCORE"] = pd.to_numeric(df["scoreAway"], errors="coerce").ffill().fillna(0)
+    out = out.dropna(subset=["ACTION_NUMBER", "PERIOD", "SECONDS_REMAINING"])
+    return out.astype({
+        "ACTION_NUMBER": "int64", "PERIOD": "int64", "SECONDS_REMAINING": "int64",
+        "ELAPSED": "int64", "HOME_SCORE": "int64", "AWAY_SCORE": "int64",
+    })
+
+
+def dedupe_by_elapsed(frame: pd.DataFrame) -> pd.DataFrame:
+    """Keep one row per game second: the last action at that time (score after free throws etc.)."""
+    return frame.drop_duplicates(subset="ELAPSED", keep="last")
@@ -0,0 +1,149 @@
+"""
+Player-prop pricing for /api/props, recomputed from each stored slate.
+
+Scope: the ESPN scoreboard is the only player data the poll has, and it carries just
+each team's current points / rebounds / assists leader (GameState leader fields). So a
+prop exists for a (player, stat) only while that player leads their team in that stat,
+in a game in play: props follow the leaders as they change, and a points leader who
+doesn't also lead rebounds gets no rebounds line. Pricing a fixed roster would need a
+box score per game per poll.
+
+For every leader with a current value, the rest of the game is projected from the
+player's pace so far, shrunk toward a typical team leader's pace by PRIOR_SECONDS of
+game time:
+
+    rate      = (current + PRIOR_PER_48[stat] / 2880 * PRIOR_SECONDS) / (elapsed + PRIOR_SECONDS)
+    remaining ~ unit * Poisson(rate * seconds_left / unit)
+
+where unit is 2 for points (baskets, so the spread is closer to real scoring) and 1
+otherwise. Each prop is priced at a ladder of half-point lines around its projection.
+
+All props on the slate are priced in one vectorized pass (one Poisson CDF table for
+every row), and the results are stored in state.props keyed by (game_id, player), so
+the route only filters precomputed entries.
+"""
+import math
+from typing import Any
+
+import numpy as np
+
+from metrics import INFERENCE_LATENCY
+from models.game_state import GameState
+from util import parse_status
+
+STATS = ("pts", "reb", "ast")
+# A team leader's typical output per 48 minutes, and the scoring unit per stat
+PRIOR_PER_48 = {"pts": 24.0, "reb": 10.0, "ast": 7.0}
+UNIT = {"pts": 2, "reb": 1, "ast": 1}
+PRIOR_SECONDS = 1440.0
+# Lines priced per prop: the half-point line nearest the projection, then +/- 1 and 2 units
+LADDER = np.array([-2, -1, 0, 1, 2])
+
+_REGULATION_SECONDS = 2880
+_OT_SECONDS = 300
+_MAX_COUNT = 96  # Poisson CDF columns; far beyond any remaining count
+_LOG_FACTORIAL = np.array([math.lgamma(k + 1) for k in range(_MAX_COUNT)])
+
+
+def _clock(status: str) -> tuple[float, float] | None:
+    """(seconds played, seconds left in regulation or the current overtime), or None if unreadable."""
+    period, remaining = parse_status(status)
+    if period is None or remaining is None:
+        return None
+    if period >= 5:
+        return _REGULATION_SECONDS + _OT_SECONDS * (period - 4) - remaining, remaining
+    return _REGULATION_SECONDS - remaining, remaining
+
+
+def _rows(games: list[GameState]) -> list[tuple[GameState, bool, str, str, float, float, float]]:
+    """(game, is_home, player, stat, current, elapsed, left) for each team's current leader in each stat, in play."""
+    rows = []
+    for game in games:
+        if game.status.startswith("Final") or game.status in ("Postponed", "Canceled", "Cancelled"):
+            continue
+        clock = _clock(game.status)
+        if clock is None or clock[0] <= 0:
+            continue
+        for is_home, team in ((True, game.home), (False, game.away)):
+            for stat in STATS:
+                name = getattr(team, f"leader_{stat}_name")
+                try:
+                    current = float(getattr(team, f"leader_{stat}_val"))
+                except (TypeError, ValueError):
+                    continue
+                if name:
+                    rows.append((game, is_home, name, stat, current, *clock))
+    return rows
+
+
+def _american(p: np.ndarray) -> list[int | None]:
+    """Fair American odds for each probability; None when the outcome is (all but) settled."""
+    out = []
+    for q in p.tolist():
+        if q <= 0.001 or q >= 0.999:
+            out.append(None)
+        elif q >= 0.5:
+            out.append(-round(100 * q / (1 - q)))
+        else:
+            out.append(round(100 * (1 - q) / q))
+    return out
+
+
+def price(games: list[GameState]) -> dict[tuple[str, str], dict[str, Any]]:
+    """Projected totals and over/under prices for the current stat leaders, by (game_id, player)."""
+    rows = _rows(games)
+    if not rows:
+        return {}
+    with INFERENCE_LATENCY.time("props", "poll"):
+        stats = [r[3] for r in rows]
+        current = np.array([r[4] for r in rows])
+        elapsed = np.array([r[5] for r in rows])
+        left = np.array([r[6] for r in rows])
+        prior = np.array([PRIOR_PER_48[s] / _REGULATION_SECONDS for s in stats])
+        unit = np.array([UNIT[s] for s in stats])
+
+        rate = (current + prior * PRIOR_SECONDS) / (elapsed + PRIOR_SECONDS)
+        lam = np.maximum(rate * left / unit, 1e-12)
+        projected = current + rate * left
+
+        lines = np.floor(projected)[:, None] + 0.5 + unit[:, None] * LADDER
+        # Over needs more than (line - current) / unit scoring events
+        needed = np.floor((lines - current[:, None]) / unit[:, None]).astype(np.int64)
+        k = np.arange(_MAX_COUNT)
+        cdf = np.cumsum(np.exp(k * np.log(lam)[:, None] - lam[:, None] - _LOG_FACTORIAL), axis=1)
+        cdf = np.minimum(cdf, 1.0)
+        at_most = np.take_along_axis(cdf, np.clip(needed, 0, _MAX_COUNT - 1), axis=1)
+        over = np.where(needed < 0, 1.0, 1.0 - at_most)
+
+    out: dict[tuple[str, str], dict[str, Any]] = {}
+    for i, (game, is_home, name, stat, *_) in enumerate(rows):
+        team, opponent = (game.home, game.away) if is_home else (game.away, game.home)
+        entry = out.setdefault((game.game_id, name), {
+            "game_id": game.game_id,
+            "player": name,
+            "team": team.abbreviation,
+            "opponent": opponent.abbreviation,
+            "status": game.status,
+            "team_score": team.score,
+            "opp_score": opponent.score,
+            "projected": {},
+            "props": {},
+        })
+        keep = lines[i] > current[i]  # lines already passed are settled, not priced
+        over_odds, under_odds = _american(over[i]), _american(1.0 - over[i])
+        entry["projected"][stat] = round(float(projected[i]), 1)
+        entry["props"][stat] = {
+            "current": current[i].item(),
+            "projected": round(float(projected[i]), 1),
+            "lines": [
+                {
+                    "line": lines[i, j].item(),
+                    "over_prob": round(100 * over[i, j].item(), 2),
+                    "under_prob": round(100 * (1 - over[i, j].item()), 2),
+                    "over_odds": over_odds[j],
+                    "under_odds": under_odds[j],
+                }
+                for j in np.flatnonzero(keep)
+            ],
+        }
+    return out
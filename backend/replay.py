@@ -0,0 +1,138 @@
+"""
+Headless season replay / backtest for the win probability models.
+
+Streams the archived play-by-play dataset built by ml/preprocessing/scrape_v1.py
+(ml/datasets/wp, read lazily in large batches) through the same model path the live
+backend uses (util.predict_home_win_proba on FEATURE_COLS), and reports per model:
+
+- throughput (plays scored per second of inference)
+- Brier score and log loss
+- calibration curve (mean predicted vs. observed home win rate per probability bin)
+
+Metrics are accumulated batch by batch, so memory stays flat no matter how many
+seasons are replayed.
+
+Usage (from backend/):
+    python replay.py                              # every model in ml/, every season
+    python replay.py lr xgboost --seasons 2024-25 --json backtest.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from util import FEATURE_COLS, list_model_names, load_model, predict_home_win_proba
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "ml" / "preprocessing"))
+from dataset import TARGET_COL, WP_DATASET_DIR, iter_batches  # noqa: E402
+
+_EPS = 1e-15
+
+
+class BacktestMetrics:
+    """Streaming Brier / log loss / calibration accumulator for one model."""
+
+    def __init__(self, n_bins: int = 10):
+        self.n_bins = n_bins
+        self.count = 0
+        self.brier_sum = 0.0
+        self.log_loss_sum = 0.0
+        self.bin_count = np.zeros(n_bins, dtype=np.int64)
+        self.bin_pred_sum = np.zeros(n_bins)
+        self.bin_true_sum = np.zeros(n_bins)
+        self.predict_seconds = 0.0
+
+    def update(self, p: np.ndarray, y: np.ndarray) -> None:
+        p = np.clip(p, _EPS, 1 - _EPS)
+        self.count += len(p)
+        self.brier_sum += float(np.sum((p - y) ** 2))
+        self.log_loss_sum += float(-np.sum(y * np.log(p) + (1 - y) * np.log(1 - p)))
+        bins = np.minimum((p * self.n_bins).astype(np.int64), self.n_bins - 1)
+        self.bin_count += np.bincount(bins, minlength=self.n_bins)
+        self.bin_pred_sum += np.bincount(bins, weights=p, minlength=self.n_bins)
+        self.bin_true_sum += np.bincount(bins, weights=y, minlength=self.n_bins)
+
+    def summary(self) -> dict:
+        n = max(self.count, 1)
+        nonempty = self.bin_count > 0
+        return {
+            "plays": self.count,
+            "plays_per_sec": self.count / self.predict_seconds if self.predict_seconds else None,
+            "brier": self.brier_sum / n,
+            "log_loss": self.log_loss_sum / n,
+            "calibration": [
+                {
+                    "bin": f"{i / self.n_bins:.1f}-{(i + 1) / self.n_bins:.1f}",
+                    "count": int(self.bin_count[i]),
+                    "mean_pred": float(self.bin_pred_sum[i] / self.bin_count[i]),
+                    "observed": float(self.bin_true_sum[i] / self.bin_count[i]),
+                }
+                for i in range(self.n_bins) if nonempty[i]
+            ],
+        }
+
+
+def run_backtest(
+    model_names: list[str],
+    seasons: list[str] | None = None,
+    batch_size: int = 500_000,
+    n_bins: int = 10,
+    root: Path = WP_DATASET_DIR,
+) -> dict[str, dict]:
+    """
+    Replay every play of `seasons` (None = all) through each model. The dataset is
+    read once; each batch is scored by every model before moving on.
+    """
+    models = {}
+    for name in model_names:
+        try:
+            models[name] = load_model(name)
+        except Exception as e:
+            print(f"Skipping {name}: {e}")
+    metrics = {name: BacktestMetrics(n_bins) for name in models}
+
+    wall_start = time.perf_counter()
+    for batch in iter_batches(FEATURE_COLS + [TARGET_COL], seasons, batch_size, root):
+        X = batch[FEATURE_COLS]
+        y = batch[TARGET_COL].to_numpy(dtype=float)
+        for name, model in models.items():
+            start = time.perf_counter()
+            p = predict_home_win_proba(model, X)
+            metrics[name].predict_seconds += time.perf_counter() - start
+            metrics[name].update(p, y)
+    wall = time.perf_counter() - wall_start
+
+    results = {name: m.summary() for name, m in metrics.items()}
+    for summary in results.values():
+        summary["wall_seconds"] = wall
+    return results
+
+
+def print_report(results: dict[str, dict]) -> None:
+    print(f"{'model':<22}{'plays':>12}{'plays/sec':>14}{'brier':>10}{'log loss':>10}")
+    for name, r in results.items():
+        pps = f"{r['plays_per_sec']:,.0f}" if r["plays_per_sec"] else "-"
+        print(f"{name:<22}{r['plays']:>12,}{pps:>14}{r['brier']:>10.4f}{r['log_loss']:>10.4f}")
+    for name, r in results.items():
+        print(f"\nCalibration: {name}")
+        for b in r["calibration"]:
+            print(f"  {b['bin']}  n={b['count']:<10,} pred={b['mean_pred']:.3f}  obs={b['observed']:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest win probability models on archived play-by-play.")
+    parser.add_argument("models", nargs="*", help="model names in ml/ (default: all)")
+    parser.add_argument("--seasons", nargs="+", help="seasons to replay, e.g. 2023-24 (default: all)")
+    parser.add_argument("--batch-size", type=int, default=500_000)
+    parser.add_argument("--bins", type=int, default=10)
+    parser.add_argument("--json", help="also write the full results to this file")
+    args = parser.parse_args()
+
+    results = run_backtest(args.models or list_model_names(), args.seasons, args.batch_size, args.bins)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,111 @@
+"""
+Chooses how long the poll loop sleeps before the next ESPN fetch, from the slate it just saw.
+
+- Any game in crunch time (4th quarter or OT, under 5 minutes, within 10 points): POLL_CRUNCH_SECONDS.
+- Any game in live play: POLL_LIVE_SECONDS.
+- Other live games whose clock hasn't moved for two polls (timeouts, reviews):
+  POLL_STOPPAGE_SECONDS.
+- Only breaks in progress: POLL_BREAK_SECONDS after a quarter, POLL_HALFTIME_SECONDS at half.
+- Only pregame games: sleep until POLL_TIPOFF_LEAD_SECONDS before the earliest tipoff
+  (at most POLL_PREGAME_MAX_SECONDS at a time so schedule changes are still picked up).
+- Everything Final, or no games: sleep until POLL_DAILY_HOUR_ET the next morning.
+
+The tightest requirement across all games wins.
+"""
+from datetime import datetime, time as dtime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import config
+from models.game_state import GameState
+from util import parse_status
+
+_ET = ZoneInfo("America/New_York")
+
+
+def game_phase(status: str) -> str:
+    """One of "pre", "live", "break", "halftime", "final" for an ESPN shortDetail status."""
+    if not status or status.startswith("Final") or status in ("Postponed", "Canceled", "Cancelled"):
+        return "final"
+    if "EST" in status or "EDT" in status or " ET" in status or status in ("Pregame", "Scheduled"):
+        return "pre"
+    if status == "Halftime":
+        return "halftime"
+    if status.startswith("End of"):
+        return "break"
+    return "live"
+
+
+def is_crunch_time(game: GameState) -> bool:
+    period, seconds_remaining = parse_status(game.status)
+    if period is None or period < 4:
+        return False
+    margin = abs(game.home.score - game.away.score)
+    return seconds_remaining <= 300 and margin <= 10
+
+
+def _parse_start(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+class PollScheduler:
+    """Stateful only to notice stopped clocks between consecutive polls."""
+
+    def __init__(self):
+        self._last_status: dict[str, str] = {}
+        self._unchanged: dict[str, int] = {}
+
+    def next_delay(self, games: list[GameState], now: datetime | None = None) -> tuple[float, str]:
+        """(seconds until the next poll, reason) for the slate just fetched."""
+        now = now or datetime.now(timezone.utc)
+        candidates: list[tuple[float, str]] = []
+        next_tipoff: datetime | None = None
+
+        for game in games:
+            game_id, status = game.game_id, game.status
+            unchanged = self._unchanged.get(game_id, 0) + 1 if self._last_status.get(game_id) == status else 0
+            self._last_status[game_id], self._unchanged[game_id] = status, unchanged
+
+            phase = game_phase(status)
+            if phase == "live":
+                if is_crunch_time(game):
+                    candidates.append((config.POLL_CRUNCH_SECONDS, "crunch"))
+                elif unchanged >= 2:
+                    candidates.append((config.POLL_STOPPAGE_SECONDS, "stoppage"))
+                else:
+                    candidates.append((config.POLL_LIVE_SECONDS, "live"))
+            elif phase == "break":
+                candidates.append((config.POLL_BREAK_SECONDS, "break"))
+            elif phase == "halftime":
+                candidates.append((config.POLL_HALFTIME_SECONDS, "halftime"))
+            elif phase == "pre":
+                start = _parse_start(game.start_time)
+                if start is None or start <= now:
+                    # Tipoff is due (or unknown) but ESPN hasn't flipped the game live yet
+                    candidates.append((config.POLL_LIVE_SECONDS, "tipoff"))
+                elif next_tipoff is None or start < next_tipoff:
+                    next_tipoff = start
+
+        seen = {g.game_id for g in games}
+        for game_id in [g for g in self._last_status if g not in seen]:
+            del self._last_status[game_id], self._unchanged[game_id]
+
+        if next_tipoff is not None:
+            wait = (next_tipoff - now).total_seconds() - config.POLL_TIPOFF_LEAD_SECONDS
+            candidates.append((min(max(wait, config.POLL_LIVE_SECONDS), config.POLL_PREGAME_MAX_SECONDS), "pregame"))
+
+        if candidates:
+            return min(candidates)
+        return self._until_next_slate(now), "idle"
+
+    @staticmethod
+    def _until_next_slate(now: datetime) -> float:
+        local = now.astimezone(_ET)
+        wake = datetime.combine(local.date(), dtime(config.POLL_DAILY_HOUR_ET), tzinfo=_ET)
+        if wake <= local:
+            wake = datetime.combine(local.date() + timedelta(days=1), dtime(config.POLL_DAILY_HOUR_ET), tzinfo=_ET)
+        return max((wake - local).total_seconds(), config.POLL_LIVE_SECONDS)
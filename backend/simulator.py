@@ -0,0 +1,233 @@
+"""
+Possession-level Monte Carlo of the rest of a game, for spread cover, over/under and
+final-score bands (the "simulation" block of /api/games/stats/{game_id}).
+
+Seeded from the current state: score, seconds remaining (util.parse_status) and each
+team's form (season record, shrunk toward .500, blended with L10). Form sets each
+team's expected points per possession around the league average, plus a home-court
+edge; the points on one possession are 0/1/2/3 with league-average shape.
+
+Every path draws the possessions left in the game (Poisson at league pace, split
+between the teams), then each team's points over its possessions. Rather than
+drawing possession by possession, the exact distribution of points over n
+possessions is computed once per team strength by convolution and stored as a
+quantile table, so each team's score on a path is one table lookup: 100k paths
+take a few milliseconds. Paths tied at the end get overtime periods until none are.
+
+Results are cached per state (score, time left, strengths, path count) and seeded
+from it, so repeated requests for an unchanged game return the same numbers.
+"""
+import math
+import threading
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from metrics import CACHE_REQUESTS, INFERENCE_LATENCY
+from models.game_state import GameState
+from util import parse_status
+
+# Points scored on one possession: P(0), P(1), P(2), P(3); about 1.145 points per possession
+POSSESSION_PMF = np.array([0.485, 0.035, 0.330, 0.150])
+POSSESSIONS_PER_SECOND = 99.0 / 2880  # per team, league pace
+HOME_EDGE = 0.0125  # points per possession each way, ~2.5 points a game
+# Points per possession gained per unit of form difference (a .750 team vs .500: +0.08)
+FORM_SCALE = 0.32
+OT_SECONDS = 300
+MAX_OVERTIMES = 6
+
+_QUANTILES = 4096
+_MAX_POSSESSIONS = 160
+_MAX_CACHED = 256
+_BAND_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def team_form(wins: int, losses: int, l10_wins: int) -> float:
+    """Season win rate shrunk toward .500 by 10 games, blended 3:1 with the last 10."""
+    season = (wins + 5) / (wins + losses + 10)
+    return 0.75 * season + 0.25 * (l10_wins / 10)
+
+
+@lru_cache(maxsize=64)
+def _points_table(ppp_milli: int) -> np.ndarray:
+    """
+    Points scored over n possessions (rows, 0.._MAX_POSSESSIONS) at each of _QUANTILES
+    evenly spaced quantiles (columns), at ppp_milli / 1000 expected points per possession.
+    """
+    scale = ppp_milli / 1000 / float(POSSESSION_PMF @ np.arange(4))
+    pmf = POSSESSION_PMF * scale
+    pmf[0] = 1.0 - pmf[1:].sum()
+    size = 3 * _MAX_POSSESSIONS + 1
+    dist = np.zeros(size)
+    dist[0] = 1.0
+    table = np.empty((_MAX_POSSESSIONS + 1, _QUANTILES), dtype=np.int16)
+    table[0] = 0
+    for n in range(1, _MAX_POSSESSIONS + 1):
+        nxt = dist * pmf[0]
+        for points in (1, 2, 3):
+            nxt[points:] += dist[:-points] * pmf[points]
+        dist = nxt
+        table[n] = _quantiles(dist)
+    return table
+
+
+def _points(rng: np.random.Generator, table: np.ndarray, possessions: np.ndarray) -> np.ndarray:
+    rows = np.minimum(possessions, _MAX_POSSESSIONS)
+    return table[rows, rng.integers(0, _QUANTILES, size=possessions.size)]
+
+
+def _quantiles(pmf: np.ndarray) -> np.ndarray:
+    """Values at _QUANTILES evenly spaced quantiles of a distribution over 0..len(pmf)-1."""
+    grid = (np.arange(_QUANTILES) + 0.5) / _QUANTILES
+    return np.searchsorted(np.cumsum(pmf), grid)
+
+
+@lru_cache(maxsize=256)
+def _possession_quantiles(seconds: float) -> np.ndarray:
+    """Quantile table of the Poisson number of possessions (both teams) in `seconds`."""
+    mean = 2 * POSSESSIONS_PER_SECOND * seconds
+    k = np.arange(int(mean + 10 * math.sqrt(mean) + 10))
+    log_pmf = k * math.log(mean) - mean - np.array([math.lgamma(i + 1) for i in k]) if mean > 0 else np.where(k == 0, 0.0, -np.inf)
+    return _quantiles(np.exp(log_pmf))
+
+
+def _possessions(rng: np.random.Generator, seconds: float, paths: int) -> tuple[np.ndarray, np.ndarray]:
+    """Home and away possessions left: one Poisson total per path, split as evenly as possible."""
+    total = _possession_quantiles(seconds)[rng.integers(0, _QUANTILES, size=paths)]
+    home = (total + rng.integers(0, 2, size=paths)) // 2
+    return home, total - home
+
+
+def _cumulative(values: np.ndarray) -> tuple[int, np.ndarray]:
+    """Smallest value and cumulative counts from it: counts[i] paths have value <= lo + i."""
+    lo = int(values.min())
+    return lo, np.cumsum(np.bincount(values - lo))
+
+
+def _band(lo: int, cumulative: np.ndarray) -> dict[str, int]:
+    ranks = np.array(_BAND_PERCENTILES) / 100 * cumulative[-1]
+    return {f"p{p}": lo + int(i) for p, i in zip(_BAND_PERCENTILES, np.searchsorted(cumulative, ranks))}
+
+
+class Simulation:
+    """Final-margin and total histograms of one simulated state, and score bands from them."""
+
+    __slots__ = ("paths", "home_win_prob", "bands", "_margins", "_margin_lo", "_totals", "_total_lo")
+
+    def __init__(self, home_final: np.ndarray, away_final: np.ndarray):
+        margin = home_final - away_final
+        total = home_final + away_final
+        self.paths = int(margin.size)
+        # Cumulative counts, so a band or any line is a lookup
+        self._margin_lo, self._margins = _cumulative(margin)
+        self._total_lo, self._totals = _cumulative(total)
+        self.home_win_prob = round(100 * (self.paths - self._at_most(self._margins, self._margin_lo, 0)) / self.paths, 2)
+        self.bands = {
+            "margin": _band(self._margin_lo, self._margins),
+            "total": _band(self._total_lo, self._totals),
+            "home_score": _band(*_cumulative(home_final)),
+            "away_score": _band(*_cumulative(away_final)),
+        }
+
+    @staticmethod
+    def _at_most(cumulative: np.ndarray, lo: int, value: float) -> int:
+        """Paths with an outcome <= value."""
+        i = int(np.floor(value)) - lo
+        if i < 0:
+            return 0
+        return int(cumulative[min(i, cumulative.size - 1)])
+
+    def _split(self, cumulative: np.ndarray, lo: int, line: float) -> tuple[float, float, float]:
+        """Percent of paths above, below and exactly on `line`."""
+        at_most = self._at_most(cumulative, lo, line)
+        below = self._at_most(cumulative, lo, np.ceil(line) - 1)
+        n = self.paths
+        return (
+            round(100 * (n - at_most) / n, 2),
+            round(100 * below / n, 2),
+            round(100 * (at_most - below) / n, 2),
+        )
+
+    def cover(self, spread: float) -> dict[str, float]:
+        """Home line `spread` (e.g. -5.5, home favored): the home team covers if margin + spread > 0."""
+        home, away, push = self._split(self._margins, self._margin_lo, -spread)
+        return {"line": spread, "home_cover": home, "away_cover": away, "push": push}
+
+    def over_under(self, line: float) -> dict[str, float]:
+        over, under, push = self._split(self._totals, self._total_lo, line)
+        return {"line": line, "over": over, "under": under, "push": push}
+
+    def to_json(self, spread: float | None = None, total: float | None = None) -> dict[str, Any]:
+        out = {
+            "paths": self.paths,
+            "home_win_prob": self.home_win_prob,
+            "away_win_prob": round(100 - self.home_win_prob, 2),
+            "bands": self.bands,
+        }
+        if spread is not None:
+            out["spread"] = self.cover(spread)
+        if total is not None:
+            out["total"] = self.over_under(total)
+        return out
+
+
+_cache: "OrderedDict[tuple, Simulation]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def simulate(
+    home_score: int, away_score: int, seconds_remaining: float,
+    home_ppp: float, away_ppp: float, paths: int, seed: int = 0,
+) -> Simulation:
+    """Simulate `paths` finishes from this state (points per possession as given)."""
+    rng = np.random.default_rng(seed)
+    home_table = _points_table(round(home_ppp * 1000))
+    away_table = _points_table(round(away_ppp * 1000))
+
+    home_poss, away_poss = _possessions(rng, seconds_remaining, paths)
+    home_final = home_score + _points(rng, home_table, home_poss).astype(np.int64)
+    away_final = away_score + _points(rng, away_table, away_poss).astype(np.int64)
+
+    for _ in range(MAX_OVERTIMES):
+        tied = np.flatnonzero(home_final == away_final)
+        if not tied.size:
+            break
+        home_ot, away_ot = _possessions(rng, OT_SECONDS, tied.size)
+        home_final[tied] += _points(rng, home_table, home_ot)
+        away_final[tied] += _points(rng, away_table, away_ot)
+    return Simulation(home_final, away_final)
+
+
+def simulate_game(game: GameState, paths: int) -> Simulation | None:
+    """Simulation from a game's current state (cached per state); None if it won't be played or the status can't be read."""
+    home, away = game.home, game.away
+    if game.status in ("Postponed", "Canceled", "Cancelled"):
+        return None
+    _, seconds_remaining = parse_status(game.status)  # 0 once final
+    if seconds_remaining is None:
+        return None
+
+    edge = FORM_SCALE * (team_form(home.wins, home.losses, home.l10_wins) - team_form(away.wins, away.losses, away.l10_wins)) / 2
+    league_ppp = float(POSSESSION_PMF @ np.arange(4))
+    home_ppp = round(league_ppp + edge + HOME_EDGE, 3)
+    away_ppp = round(league_ppp - edge - HOME_EDGE, 3)
+
+    key = (home.score, away.score, seconds_remaining, home_ppp, away_ppp, paths)
+    with _cache_lock:
+        sim = _cache.get(key)
+        if sim is not None:
+            _cache.move_to_end(key)
+    CACHE_REQUESTS.inc("simulation", "miss" if sim is None else "hit")
+    if sim is not None:
+        return sim
+
+    with INFERENCE_LATENCY.time("simulator", "game_stats"):
+        sim = simulate(home.score, away.score, seconds_remaining, home_ppp, away_ppp, paths, seed=zlib.crc32(repr(key).encode()))
+    with _cache_lock:
+        _cache[key] = sim
+        while len(_cache) > _MAX_CACHED:
+            _cache.popitem(last=False)
+    return sim
@@ -0,0 +1,122 @@
+"""
+Server-Sent Events feed of game updates, for read-only consumers (/api/games/stream).
+
+Each poll publishes one "game" event per game whose dashboard payload changed (and a
+"remove" event for games that left the slate) into a ring buffer. Event IDs are
+"<epoch>-<seq>"; a client reconnecting with Last-Event-ID gets just the events after
+it. If that ID is older than the buffer or from a previous process, it gets a
+"snapshot" event with the whole slate instead, as does a client with no ID.
+
+Frames are encoded once at publish time and shared by every stream, and idle streams
+all wait on one future that the next publish resolves, so holding thousands of them
+open costs a suspended generator each plus a keepalive comment every KEEPALIVE_SECONDS.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, AsyncIterator
+
+KEEPALIVE_SECONDS = 15.0
+
+
+def _frame(event_id: str, event: str, data: Any) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class EventStream:
+    def __init__(self, buffer_size: int = 1024):
+        self.epoch = str(int(time.time()))
+        self.seq = 0
+        self.clients = 0
+        # (seq, encoded frame), contiguous seqs
+        self._buffer: deque[tuple[int, str]] = deque(maxlen=buffer_size)
+        self._games: dict[str, dict[str, Any]] = {}
+        self._encoded: dict[str, str] = {}
+        self._snapshot: tuple[int, str] | None = None
+        self._next: asyncio.Future | None = None
+
+    def _event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def _append(self, event: str, data: Any) -> None:
+        self.seq += 1
+        self._buffer.append((self.seq, _frame(self._event_id(self.seq), event, data)))
+
+    def publish_games(self, games: list[dict[str, Any]]) -> int:
+        """Publish events for games that changed since the last call; returns how many."""
+        before = self.seq
+        current = {}
+        for game in games:
+            game_id = game["game_id"]
+            current[game_id] = game
+            encoded = json.dumps(game, sort_keys=True)
+            if self._encoded.get(game_id) != encoded:
+                self._encoded[game_id] = encoded
+                self._append("game", game)
+        for game_id in [g for g in self._games if g not in current]:
+            del self._encoded[game_id]
+            self._append("remove", {"game_id": game_id})
+        self._games = current
+
+        if self.seq != before and self._next is not None:
+            self._next.set_result(None)
+            self._next = None
+        return self.seq - before
+
+    def snapshot_frame(self) -> str:
+        """The whole current slate as one "snapshot" event, encoded once per seq."""
+        if self._snapshot is None or self._snapshot[0] != self.seq:
+            self._snapshot = (self.seq, _frame(self._event_id(self.seq), "snapshot", list(self._games.values())))
+        return self._snapshot[1]
+
+    def frames_after(self, seq: int) -> list[str] | None:
+        """Buffered frames after `seq`, or None if some of them were already evicted."""
+        if seq >= self.seq:
+            return []
+        if not self._buffer or seq < self._buffer[0][0] - 1:
+            return None
+        start = seq - self._buffer[0][0] + 1
+        return [frame for _, frame in list(self._buffer)[start:]]
+
+    def parse_event_id(self, last_event_id: str | None) -> int | None:
+        """Seq of a Last-Event-ID issued by this process, else None."""
+        if not last_event_id:
+            return None
+        epoch, _, seq = last_event_id.strip().partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self.seq:
+            return None
+        return int(seq)
+
+    async def wait(self, seq: int) -> None:
+        """Return once something after `seq` has been published."""
+        if self.seq > seq:
+            return
+        if self._next is None:
+            self._next = asyncio.get_running_loop().create_future()
+        await asyncio.shield(self._next)
+
+    async def stream(self, last_event_id: str | None = None) -> AsyncIterator[str]:
+        """SSE frames for one client, starting after last_event_id (or with a snapshot)."""
+        self.clients += 1
+        try:
+            yield "retry: 5000\n\n"
+            seq = self.parse_event_id(last_event_id)
+            while True:
+                # Read the frames and the seq they end at together: publishes can land while we yield
+                frames = self.frames_after(seq) if seq is not None else None
+                if frames is None:
+                    # No usable ID, or fell further behind than the buffer: send the current slate
+                    chunk = self.snapshot_frame()
+                else:
+                    chunk = "".join(frames)
+                seq = self.seq
+                if chunk:
+                    yield chunk
+
+                try:
+                    await asyncio.wait_for(self.wait(seq), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            self.clients -= 1
@@ -0,0 +1,73 @@
+"""
+Startup warm-up and time-to-ready breakdown.
+
+Before the app accepts traffic, the lifespan runs each warm-up step (model preload,
+scoreboard / standings / lineups prefill) concurrently under one time budget
+(WARMUP_TIMEOUT_SECONDS). A step that fails or is still running at the deadline is
+logged and skipped: the poll loop and the stale-while-revalidate caches fill in
+later, exactly as they would without warm-up.
+
+Each phase's duration (plus "imports", measured by main.py, and "total") is printed
+once ready and exported as the startup_seconds{phase} gauge.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable
+
+from metrics import STARTUP_SECONDS
+
+
+class StartupReport:
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.problems: dict[str, str] = {}  # phase -> "failed" / "timed out"
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = seconds
+        STARTUP_SECONDS.set(seconds, phase)
+
+    @contextmanager
+    def phase(self, phase: str):
+        """Time a synchronous startup step."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def summary(self) -> str:
+        parts = [
+            f"{phase} {seconds:.2f}s" + (f" ({self.problems[phase]})" if phase in self.problems else "")
+            for phase, seconds in self.phases.items() if phase != "total"
+        ]
+        return f"Ready in {self.phases.get('total', 0.0):.2f}s: " + ", ".join(parts)
+
+
+report = StartupReport()
+# Steps still running after the budget; held so they aren't garbage-collected mid-flight
+_background: set[asyncio.Task] = set()
+
+
+async def _step(phase: str, work: Awaitable[Any]) -> None:
+    started = time.perf_counter()
+    try:
+        await work
+    except Exception as e:
+        report.problems[phase] = "failed"
+        print(f"warm-up {phase} failed: {e}")
+    if phase not in report.phases:
+        report.record(phase, time.perf_counter() - started)
+
+
+async def warm_up(steps: dict[str, Awaitable[Any]], timeout: float) -> None:
+    """Run the steps concurrently; give up waiting on whatever is left after `timeout`."""
+    tasks = [asyncio.create_task(_step(phase, work)) for phase, work in steps.items()]
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for phase, task in zip(steps, tasks):
+        if task in pending:
+            report.problems[phase] = "timed out"
+            report.record(phase, timeout)
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+            print(f"warm-up {phase} still running after {timeout:g}s; continuing without it")
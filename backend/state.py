@@ -1,14 +1,29 @@
 """
 In-memory store for live game state and win probabilities.
 
-- Updated every 5s by the background poll task.
+- Updated by the background poll task (every 5s during live play; see scheduler.py).
 - Read by GET /games (and any other routes that need current state).
 """
 
 from typing import Any
 
-# Latest games list: same shape as your existing /games response.
-games: list[dict[str, Any]] = []
+from models.game_state import GameState
+
+# Latest slate, in scoreboard order; serialized per view with GameState.dashboard_dict() / full_dict()
+games: list[GameState] = []
+
+# The same GameStates by game_id
+games_by_id: dict[str, GameState] = {}
 
 # Win probabilities by game_id: { "game_id": { "home_win_prob": 0.6, "away_win_prob": 0.4 } }
-probabilities: dict[str, dict[str, float]] = {}
\ No newline at end of file
+probabilities: dict[str, dict[str, float]] = {}
+
+# Priced player props for the same slate by (game_id, player); see props.py
+props: dict[tuple[str, str], dict[str, Any]] = {}
+
+# Sportsbook prices and model edges by game_id, for games with a current quote; see odds.py
+market: dict[str, dict[str, Any]] = {}
+
+# time.time() of the last successful poll (0 before the first), and whether a poll has failed since
+updated_at: float = 0.0
+refresh_failed: bool = False
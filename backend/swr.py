@@ -0,0 +1,135 @@
+"""
+Stale-while-revalidate caches for routes backed by an upstream call (standings, lineups,
+games stats for past dates).
+
+A request is answered from the cache whenever there is an entry, however old; if the
+entry is past its TTL a background refresh is started on the upstream's pool
+(executors.py), at most one per key at a time. Only a key with nothing cached makes the
+request wait, and then for at most `wait` seconds or until its deadline: the fetch
+carries on in the background, outside the request's deadline, and fills the cache for
+later requests. A failed refresh keeps the old value and marks it stale. Routes report
+the entry's age and staleness with staleness_headers().
+"""
+import asyncio
+import time
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+from executors import BoundedExecutor, DeadlineExceeded, Overloaded, remaining
+from metrics import CACHE_REQUESTS
+
+
+class NotReady(Exception):
+    """Nothing cached yet and the first fetch didn't finish within the wait."""
+
+
+class Entry:
+    __slots__ = ("value", "fetched_at", "failed")
+
+    def __init__(self, value: Any, fetched_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.failed = False  # last revalidation failed
+
+    def age(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+
+def staleness_headers(age: float, stale: bool) -> dict[str, str]:
+    """Age (seconds since the data was fetched upstream) and whether it's past due."""
+    return {"Age": str(int(age)), "X-Data-Stale": "true" if stale else "false"}
+
+
+class SWRCache:
+    def __init__(self, name: str, executor: BoundedExecutor, ttl: float, wait: float, max_entries: int = 64):
+        self.name = name
+        self.executor = executor
+        self.ttl = ttl
+        self.wait = wait
+        self.max_entries = max_entries
+        self._entries: dict[Hashable, Entry] = {}
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = Lock()
+
+    async def get(self, key: Hashable, fetch: Callable[[], Any]) -> Entry:
+        """
+        The cached entry for `key`, revalidating it in the background if it's past the TTL.
+        With nothing cached, waits up to `wait` for `fetch` and raises its exception,
+        NotReady, DeadlineExceeded if the request's deadline came first, or Overloaded
+        if the upstream's pool is full.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            fresh = entry.age() < self.ttl
+            if not fresh:
+                try:
+                    self._revalidate(key, fetch)
+                except Overloaded:
+                    pass  # serve stale; a later request will try again
+            CACHE_REQUESTS.inc(self.name, "hit" if fresh else "stale")
+            return entry
+
+        CACHE_REQUESTS.inc(self.name, "miss")
+        future = self._revalidate(key, fetch)
+        left = remaining()
+        wait = self.wait if left is None else max(0.0, min(self.wait, left))
+        try:
+            # shield: giving up on the wait must not cancel the shared fetch
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), wait)
+        except asyncio.TimeoutError:
+            if wait < self.wait:
+                raise DeadlineExceeded(f"{self.name}: deadline passed waiting for {key!r}")
+            raise NotReady(f"{self.name}: first fetch of {key!r} still running")
+
+    def peek(self, key: Hashable, fetch: Callable[[], Any]) -> Entry | None:
+        """
+        get() for callers that can't wait (the poll loop, worker threads): the cached
+        entry, revalidated in the background if it's past the TTL, or None while the
+        first fetch runs in the background.
+        """
+        entry = self._entries.get(key)
+        fresh = entry is not None and entry.age() < self.ttl
+        if not fresh:
+            try:
+                self._revalidate(key, fetch)
+            except Overloaded:
+                pass  # a later call will try again
+        CACHE_REQUESTS.inc(self.name, "miss" if entry is None else "hit" if fresh else "stale")
+        return entry
+
+    async def prefill(self, key: Hashable, fetch: Callable[[], Any]) -> Entry:
+        """Fetch `key` now (joining a fetch already running) and wait for it, however long it takes."""
+        return await asyncio.wrap_future(self._revalidate(key, fetch))
+
+    def is_stale(self, entry: Entry) -> bool:
+        return entry.failed or entry.age() >= self.ttl
+
+    def headers(self, entry: Entry) -> dict[str, str]:
+        return staleness_headers(entry.age(), self.is_stale(entry))
+
+    def _revalidate(self, key: Hashable, fetch: Callable[[], Any]) -> Future:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = self.executor.submit(self._refresh, key, fetch, detached=True)
+        return future
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Any]) -> Entry:
+        try:
+            value = fetch()
+        except Exception as e:
+            print(f"{self.name}: refresh of {key!r} failed: {e}")
+            with self._lock:
+                if key in self._entries:
+                    self._entries[key].failed = True
+                self._inflight.pop(key, None)
+            raise
+        entry = Entry(value, time.time())
+        with self._lock:
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k].fetched_at)
+                del self._entries[oldest]
+            self._inflight.pop(key, None)
+        return entry
@@ -0,0 +1,255 @@
+"""
+Incremental team-form feature store: cumulative W/L and last-10 record per team per date.
+
+Shared by the live backend (L10 inputs for the win probability model) and the training
+scraper in ml/preprocessing, so both compute team form the same way.
+
+- Built incrementally from game results via record_game(); recording is idempotent,
+  so replaying a season log or re-seeing a Final game is harmless.
+- Last-10 form uses a fixed-size circular buffer per team (no list rebuilding).
+- as_of(team, day) returns the form a team had *before* its games on `day` in O(1):
+  snapshots are forward-filled per calendar day as results come in.
+- Persisted as JSON under backend/data/team_form/, one file per season, so the live
+  backend only has to fetch the season's game log the very first time.
+- Thread-safe: the poll loop records results while executor threads read form (wp_curve,
+  bootstrap), so every read, write and save holds the store's lock.
+
+Teams are keyed by NBA tricode (GSW, NYK, ...); ESPN's short codes (GS, NY, ...) are
+normalized on the way in.
+"""
+import json
+import os
+import threading
+from datetime import date
+from pathlib import Path
+
+_DATA_DIR = Path(__file__).resolve().parent / "data" / "team_form"
+_L10_SIZE = 10
+
+# ESPN abbreviation -> NBA tricode where the two differ
+_ESPN_TO_NBA_ABBREV = {
+    "GS": "GSW", "NY": "NYK", "NO": "NOP", "SA": "SAS", "UTAH": "UTA", "WSH": "WAS",
+}
+
+Form = tuple[int, int, int, int]  # (wins, losses, l10_wins, l10_losses)
+_NO_FORM: Form = (0, 0, 0, 0)
+
+
+def normalize_abbrev(abbrev: str) -> str:
+    abbrev = (abbrev or "").strip().upper()
+    return _ESPN_TO_NBA_ABBREV.get(abbrev, abbrev)
+
+
+class _TeamForm:
+    """Running record for one team with a circular buffer of its last 10 results."""
+
+    __slots__ = ("wins", "losses", "ring", "pos", "count", "l10_wins")
+
+    def __init__(self):
+        self.wins = 0
+        self.losses = 0
+        self.ring = bytearray(_L10_SIZE)
+        self.pos = 0
+        self.count = 0
+        self.l10_wins = 0
+
+    def record(self, won: bool) -> None:
+        if self.count == _L10_SIZE:
+            self.l10_wins -= self.ring[self.pos]
+        else:
+            self.count += 1
+        self.ring[self.pos] = 1 if won else 0
+        self.l10_wins += self.ring[self.pos]
+        self.pos = (self.pos + 1) % _L10_SIZE
+        if won:
+            self.wins += 1
+        else:
+            self.losses += 1
+
+    def snapshot(self) -> Form:
+        return self.wins, self.losses, self.l10_wins, self.count - self.l10_wins
+
+
+class TeamFormStore:
+    """Team form for one season. Use load() to pick up the persisted copy."""
+
+    def __init__(self, season: str, path: Path | None = None):
+        self.season = season
+        self.path = path or _DATA_DIR / f"{season}.json"
+        self._teams: dict[str, _TeamForm] = {}
+        # team -> {day ordinal: form before that day's game}, filled from first game to last_day
+        self._daily: dict[str, dict[int, Form]] = {}
+        self._last_day: dict[str, int] = {}
+        # game log, kept so out-of-order results can be replayed in date order
+        self._games: dict[str, tuple[int, str, str, bool]] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, season: str, path: Path | None = None) -> "TeamFormStore":
+        store = cls(season, path)
+        if not store.path.is_file():
+            return store
+        with open(store.path) as f:
+            data = json.load(f)
+        for key, (day, home, away, home_win) in data.get("games", {}).items():
+            store._games[key] = (day, home, away, bool(home_win))
+        for team, (wins, losses, ring, pos, count) in data.get("teams", {}).items():
+            form = _TeamForm()
+            form.wins, form.losses, form.pos, form.count = wins, losses, pos, count
+            form.ring = bytearray(ring)
+            form.l10_wins = sum(form.ring)
+            store._teams[team] = form
+        for team, days in data.get("daily", {}).items():
+            store._daily[team] = {int(d): tuple(f) for d, f in days.items()}
+        store._last_day = {team: int(d) for team, d in data.get("last_day", {}).items()}
+        return store
+
+    def save(self) -> None:
+        # Serialized under the lock (so no result lands mid-dump), written outside it;
+        # saves are serialized among themselves so an older dump never replaces a newer one
+        with self._save_lock:
+            with self._lock:
+                text = json.dumps({
+                    "season": self.season,
+                    "games": self._games,
+                    "teams": {
+                        team: [f.wins, f.losses, list(f.ring), f.pos, f.count]
+                        for team, f in self._teams.items()
+                    },
+                    "daily": self._daily,
+                    "last_day": self._last_day,
+                }, separators=(",", ":"))
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".tmp{threading.get_ident()}")
+            with open(tmp, "w") as f:
+                f.write(text)
+            os.replace(tmp, self.path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._games)
+
+    def record_game(self, game_date: date, home: str, away: str, home_win: bool) -> bool:
+        """
+        Add one final result. Returns False if this game was already recorded.
+        Games are keyed by date + matchup, so ESPN and NBA game IDs never double count.
+        """
+        home, away = normalize_abbrev(home), normalize_abbrev(away)
+        day = game_date.toordinal()
+        key = f"{game_date.isoformat()}:{away}@{home}"
+        with self._lock:
+            if key in self._games:
+                return False
+            self._games[key] = (day, home, away, bool(home_win))
+
+            if day < self._last_day.get(home, day) or day < self._last_day.get(away, day):
+                # Result arrived out of date order: replay the log (rare, only on backfills)
+                self._rebuild()
+            else:
+                self._apply(day, home, away, bool(home_win))
+        return True
+
+    def as_of(self, team: str, game_date: date) -> Form:
+        """(wins, losses, l10_wins, l10_losses) for `team` before its games on `game_date`."""
+        team = normalize_abbrev(team)
+        day = game_date.toordinal()
+        with self._lock:
+            last = self._last_day.get(team)
+            if last is None:
+                return _NO_FORM
+            if day > last:
+                return self._teams[team].snapshot()
+            return self._daily[team].get(day, _NO_FORM)
+
+    def l10(self, team: str, game_date: date) -> tuple[int, int]:
+        _, _, l10_wins, l10_losses = self.as_of(team, game_date)
+        return l10_wins, l10_losses
+
+    def _apply(self, day: int, home: str, away: str, home_win: bool) -> None:
+        for team, won in ((home, home_win), (away, not home_win)):
+            form = self._teams.get(team)
+            if form is None:
+                form = self._teams[team] = _TeamForm()
+                self._daily[team] = {}
+            daily = self._daily[team]
+            before = form.snapshot()
+            for d in range(self._last_day.get(team, day - 1) + 1, day + 1):
+                daily[d] = before
+            self._last_day[team] = day
+            form.record(won)
+
+    def _rebuild(self) -> None:
+        self._teams.clear()
+        self._daily.clear()
+        self._last_day.clear()
+        for day, home, away, home_win in sorted(self._games.values()):
+            self._apply(day, home, away, home_win)
+
+
+_stores: dict[str, TeamFormStore] = {}
+_stores_lock = threading.Lock()
+
+
+def season_for_date(day: date) -> str:
+    """e.g. Oct 2025 -> '2025-26'; Feb 2026 -> '2025-26'."""
+    if day.month >= 10:
+        return f"{day.year}-{str(day.year + 1)[-2:]}"
+    return f"{day.year - 1}-{str(day.year)[-2:]}"
+
+
+def get_store(season: str) -> TeamFormStore:
+    """
+    The team-form store for `season`, cached per process. Loaded from disk on first
+    use; only if it has never been built do we backfill it from the season game log.
+    Concurrent first calls wait for the one load (and backfill) instead of repeating it.
+    """
+    import config  # backend-only; imported here so ml/preprocessing can use this module without it
+
+    store = _stores.get(season)
+    if store is not None:
+        return store
+    with _stores_lock:
+        store = _stores.get(season)
+        if store is None:
+            store = TeamFormStore.load(season)
+            if not len(store) and config.TEAM_FORM_BOOTSTRAP:
+                try:
+                    added = bootstrap_from_game_log(store)
+                    print(f"Team form: backfilled {added} games for {season}")
+                except Exception as e:
+                    print(f"Team form backfill failed: {e}")
+            _stores[season] = store
+    return store
+
+
+def bootstrap_from_game_log(store: TeamFormStore) -> int:
+    """
+    Record every completed regular-season game of `store.season` from the NBA stats
+    game log. Only needed when the store has never been built for this season.
+    Returns the number of newly recorded games.
+    """
+    import pandas as pd
+    from nba_api.stats.endpoints import leaguegamefinder
+
+    games_df = leaguegamefinder.LeagueGameFinder(
+        season_nullable=store.season,
+        season_type_nullable="Regular Season",
+        league_id_nullable="00",
+    ).get_data_frames()[0]
+    games_df = games_df[games_df["WL"].isin(["W", "L"])]
+    is_home = games_df["MATCHUP"].str.contains("vs", case=False, na=False)
+    home = games_df[is_home][["GAME_ID", "GAME_DATE", "TEAM_ABBREVIATION", "WL"]]
+    away = games_df[~is_home][["GAME_ID", "TEAM_ABBREVIATION"]]
+    merged = home.merge(away, on="GAME_ID", suffixes=("_HOME", "_AWAY"))
+    merged["GAME_DATE"] = pd.to_datetime(merged["GAME_DATE"]).dt.date
+    merged = merged.sort_values("GAME_DATE", kind="stable")
+
+    added = 0
+    for row in merged.itertuples(index=False):
+        added += store.record_game(
+            row.GAME_DATE, row.TEAM_ABBREVIATION_HOME, row.TEAM_ABBREVIATION_AWAY, row.WL == "W"
+        )
+    if added:
+        store.save()
+    return added
@@ -0,0 +1,170 @@
+"""
+Opt-in span tracing and an on-demand sampling profiler.
+
+Tracing (TRACING=1): `span()` blocks and `@traced` functions record nested spans with
+their durations and attributes, following the current span through awaits and the
+route threadpool via contextvars. Finished root spans (one per poll iteration or
+request) are kept in a ring buffer for /debug/traces, and roots slower than
+TRACE_SLOW_MS are printed with a per-stage breakdown. When tracing is off, `span()`
+returns a shared no-op and `@traced` calls straight through.
+
+Profiling: `sample_stacks(seconds)` samples every thread's Python stack and returns
+collapsed stacks ("frame;frame;frame count" per line), the input format of
+flamegraph.pl, speedscope and inferno.
+"""
+import contextvars
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Callable
+
+import config
+
+_current: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("current_span", default=None)
+_recent: deque["Span"] = deque(maxlen=config.TRACE_BUFFER)
+
+
+def enabled() -> bool:
+    return config.TRACING
+
+
+class Span:
+    __slots__ = ("name", "start", "wall_start", "duration", "attrs", "children", "_token")
+
+    def __init__(self, name: str, attrs: dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.children: list[Span] = []
+        self.duration = 0.0
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        parent = _current.get()
+        if parent is not None:
+            parent.children.append(self)
+        self._token = _current.set(self)
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _current.reset(self._token)
+        if _current.get() is None:
+            _finish_root(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "start": self.wall_start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attrs": self.attrs,
+            "children": [c.to_dict() for c in self.children],
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **attrs) -> Span | _NoopSpan:
+    """Context manager timing a block as a child of the current span (no-op unless TRACING=1)."""
+    if not config.TRACING:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def annotate(**attrs) -> None:
+    """Attach attributes (game counts, bytes, ...) to the current span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+def traced(fn: Callable | None = None, *, name: str | None = None):
+    """Decorator recording each call of a sync or async function as a span."""
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or fn.__name__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not config.TRACING:
+                    return await fn(*args, **kwargs)
+                with Span(span_name, {}):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not config.TRACING:
+                return fn(*args, **kwargs)
+            with Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate(fn) if fn is not None else decorate
+
+
+def _finish_root(root: Span) -> None:
+    _recent.append(root)
+    if root.duration * 1000 >= config.TRACE_SLOW_MS:
+        print(f"slow {format_breakdown(root)}")
+
+
+def format_breakdown(root: Span) -> str:
+    """One line: total duration, then each direct child's duration."""
+    stages = " ".join(f"{c.name}={c.duration * 1000:.0f}ms" for c in root.children)
+    return f"trace {root.name} {root.duration * 1000:.0f}ms: {stages}".rstrip(": ")
+
+
+def recent_traces(limit: int = 20) -> list[dict[str, Any]]:
+    """The most recent finished root spans, newest first."""
+    return [s.to_dict() for s in list(_recent)[-limit:][::-1]]
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{Path(code.co_filename).stem}:{code.co_qualname}".replace(";", ":").replace(" ", "_")
+
+
+def sample_stacks(seconds: float, interval: float = 0.005) -> str:
+    """
+    Sample all threads' Python stacks every `interval` seconds for `seconds` and return
+    collapsed stacks (root first, prefixed with the thread name), most frequent first.
+    """
+    me = threading.get_ident()
+    counts: Counter[str] = Counter()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)).replace(" ", "_"))
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
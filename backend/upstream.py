@@ -0,0 +1,177 @@
+"""
+Calls to upstream services (ESPN, stats.nba.com, the NBA CDN), recording per-host
+latency and error counts in metrics.
+
+Each host has a circuit breaker: after CIRCUIT_FAILURES consecutive failures (exceptions,
+5xx or 429) calls fail fast with CircuitOpenError for CIRCUIT_RESET_SECONDS, then one
+half-open probe is let through. A successful probe closes the circuit; a failed one
+reopens it for twice as long, up to CIRCUIT_MAX_RESET_SECONDS.
+
+Calls respect the current request deadline (executors.deadline): none is made once it
+has passed, and get() shortens its timeout to the time left. Running out of a
+request's budget raises DeadlineExceeded and doesn't count against the host.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+
+import config
+import tracing
+from executors import DeadlineExceeded, check_deadline, remaining
+from metrics import UPSTREAM_CIRCUIT, UPSTREAM_ERRORS, UPSTREAM_LATENCY
+
+NBA_STATS_HOST = "stats.nba.com"
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).hostname or url
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a host whose circuit is open."""
+
+
+class CircuitBreaker:
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2  # also the upstream_circuit_state gauge values
+
+    def __init__(self, host: str, failure_threshold: int, reset_seconds: float, max_reset_seconds: float):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_reset_seconds = max_reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self._open_for = reset_seconds
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        UPSTREAM_CIRCUIT.set(self.CLOSED, host)
+
+    def _set_state(self, state: int) -> None:
+        if state != self.state:
+            print(f"upstream {self.host}: circuit {('closed', 'half-open', 'open')[state]}")
+        self.state = state
+        UPSTREAM_CIRCUIT.set(state, self.host)
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go out now (closed, or the one half-open probe)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self._open_for:
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+        UPSTREAM_ERRORS.inc(self.host, "circuit_open")
+        raise CircuitOpenError(f"circuit open for {self.host}")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._open_for = self.reset_seconds
+            self._set_state(self.CLOSED)
+
+    def record_abandoned(self) -> None:
+        """The call gave up for its own reasons (deadline); frees the half-open probe slot."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self._open_for = min(self._open_for * 2, self.max_reset_seconds)
+            elif self.failures < self.failure_threshold:
+                return
+            self._probing = False
+            self._opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(host: str) -> CircuitBreaker:
+    b = _breakers.get(host)
+    if b is None:
+        with _breakers_lock:
+            b = _breakers.get(host)
+            if b is None:
+                b = _breakers[host] = CircuitBreaker(
+                    host, config.CIRCUIT_FAILURES, config.CIRCUIT_RESET_SECONDS, config.CIRCUIT_MAX_RESET_SECONDS,
+                )
+    return b
+
+
+@contextmanager
+def _timed(host: str):
+    start = time.perf_counter()
+    try:
+        with tracing.span("upstream", host=host):
+            yield
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(host, type(e).__name__)
+        raise
+    finally:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, host)
+
+
+@contextmanager
+def track(host: str):
+    """
+    Guard a block that talks to `host` (e.g. an nba_api endpoint) with its circuit breaker,
+    time it and count its exceptions. Any exception counts as a failure of the host.
+    """
+    check_deadline()
+    b = breaker(host)
+    b.before_call()
+    try:
+        with _timed(host):
+            yield
+    except Exception:
+        b.record_failure()
+        raise
+    b.record_success()
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """requests.get with metrics and the host's circuit breaker; HTTP error statuses are counted but not raised."""
+    host = host_of(url)
+    left = remaining()
+    if left is not None:
+        if left <= 0:
+            raise DeadlineExceeded(f"request deadline passed before calling {host}")
+        capped = kwargs.get("timeout") is None or left < kwargs["timeout"]
+        if capped:
+            kwargs["timeout"] = left
+    else:
+        capped = False
+    b = breaker(host)
+    b.before_call()
+    try:
+        with _timed(host):
+            resp = requests.get(url, **kwargs)
+            tracing.annotate(status=resp.status_code, bytes=len(resp.content))
+    except requests.exceptions.Timeout as e:
+        if capped:
+            b.record_abandoned()
+            raise DeadlineExceeded(f"request deadline exceeded calling {host}") from e
+        b.record_failure()
+        raise
+    except Exception:
+        b.record_failure()
+        raise
+    if resp.status_code >= 400:
+        UPSTREAM_ERRORS.inc(host, str(resp.status_code))
+    # 404s and other 4xx are answers about the resource, not signs the host is struggling
+    if resp.status_code >= 500 or resp.status_code == 429:
+        b.record_failure()
+    else:
+        b.record_success()
+    return resp
@@ -11,24 +11,93 @@ Structured output:
 }
 """
 from pathlib import Path
+from threading import Lock
 from typing import Any
 import re
+import zlib
 
+import numpy as np
 import pandas as pd
 
-_ML_MODEL_PATH = Path(__file__).resolve().parent.parent / "ml" / "nn.joblib"
+import config
+from metrics import INFERENCE_LATENCY
+from models.game_state import GameState
+from tracing import traced
+
+_ML_DIR = Path(__file__).resolve().parent.parent / "ml"
+_ML_MODEL_PATH = _ML_DIR / f"{config.WP_MODEL}.joblib"
 _wp_model = None
+_wp_model_version = None
+_wp_model_lock = Lock()
+
+# Feature order/names the models in ml/ were trained on
+FEATURE_COLS = [
+    "SECONDS_REMAINING", "HOME_SCORE", "AWAY_SCORE",
+    "HOME_WINS", "HOME_LOSSES", "AWAY_WINS", "AWAY_LOSSES",
+    "HOME_L10_WINS", "AWAY_L10_WINS",
+]
 
 def _load_wp_model():
     """Load the win-probability model once; returns None if file missing."""
     global _wp_model
     if _wp_model is not None:
         return _wp_model
-    if not _ML_MODEL_PATH.is_file():
+    # Startup warm-up and the first poll may both get here; load once
+    with _wp_model_lock:
+        if _wp_model is None and _ML_MODEL_PATH.is_file():
+            import joblib
+            _wp_model = joblib.load(_ML_MODEL_PATH)
+    return _wp_model
+
+def warm_up_model() -> str | None:
+    """
+    Load the live model and run it once on a one-row and a full-game-sized dummy batch,
+    so the first poll and /wp-curve request don't pay for deserialization or the
+    framework's first-call setup. Returns the model name, or None if there is no model.
+    """
+    model = _load_wp_model()
+    if model is None:
         return None
+    row = [2880, 0, 0, 41, 41, 41, 41, 5, 5]
+    for n in (1, 512):
+        predict_home_win_proba(model, pd.DataFrame([row] * n, columns=FEATURE_COLS))
+    return live_model_name()
+
+def live_model_name() -> str:
+    """Name of the model artifact the live endpoints use (e.g. "nn")."""
+    return _ML_MODEL_PATH.stem
+
+def live_model_version() -> str:
+    """
+    Live model name plus a short hash of its artifact (e.g. "nn-3f2a9c1e"), so metrics
+    kept per version tell a retrained artifact from the old one. The name alone if missing.
+    """
+    global _wp_model_version
+    if _wp_model_version is None:
+        try:
+            digest = zlib.crc32(_ML_MODEL_PATH.read_bytes())
+        except OSError:
+            return live_model_name()
+        _wp_model_version = f"{live_model_name()}-{digest:08x}"
+    return _wp_model_version
+
+def list_model_names() -> list[str]:
+    """Names of the model artifacts available in ml/ (e.g. ["lr", "nn", "xgboost"])."""
+    return sorted(p.stem for p in _ML_DIR.glob("*.joblib"))
+
+def load_model(name: str):
+    """Load a specific model artifact from ml/ by name (not cached, not the live model)."""
     import joblib
-    _wp_model = joblib.load(_ML_MODEL_PATH)
-    return _wp_model
+    return joblib.load(_ML_DIR / f"{name}.joblib")
+
+def predict_home_win_proba(model, X: pd.DataFrame) -> np.ndarray:
+    """
+    Home win probability (0-1) for every row of X (FEATURE_COLS) in one model call.
+    Handles both sklearn-style estimators and the keras network.
+    """
+    if hasattr(model, "predict_proba"):
+        return np.asarray(model.predict_proba(X))[:, 1].astype(float)
+    return np.asarray(model.predict(X, verbose=0), dtype=float).ravel()
 
 _SEC_PER_QUARTER = 720
 _SEC_TOTAL_REGULATION = 2880
@@ -132,81 +201,49 @@ def calculate(
         if seconds_remaining is None:
             print("Invalid status")
             return 0, 0
-        FEATURE_COLS = ["SECONDS_REMAINING", "HOME_SCORE", "AWAY_SCORE", "HOME_WINS", "HOME_LOSSES", "AWAY_WINS", "AWAY_LOSSES", "HOME_L10_WINS", "AWAY_L10_WINS"]
         X = pd.DataFrame(
             [[seconds_remaining, home_score, away_score, home_wins, home_losses, away_wins, away_losses, home_l10_wins, away_l10_wins]],
             columns=FEATURE_COLS,
         )
-
-        # for xgboost, xgboost_calibrated, random_forest, lr
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(X)[0]
-        # neural network
-        else:
-            p = float(model.predict(X, verbose=0).ravel()[0])
-            proba = (1 - p, p)
-        home_win_prob = float(100 * proba[1])
+        home_win_prob = float(100 * predict_home_win_proba(model, X)[0])
         away_win_prob = float(100 - home_win_prob)
         return home_win_prob, away_win_prob
 
     print("No model found")
     return 50.0, 50.0  # Only fallback when model is completely missing
 
-def compute_win_probabilities(games: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+@traced
+def compute_win_probabilities(games: list[GameState]) -> dict[str, dict[str, float]]:
+    """Win probabilities by game_id; also set on each GameState."""
+    with INFERENCE_LATENCY.time(live_model_name(), "scoreboard"):
+        return _compute_win_probabilities(games)
+
+def _compute_win_probabilities(games: list[GameState]) -> dict[str, dict[str, float]]:
     result = {}
     for game in games:
-        game_id = game["game_id"]
-        home_score = game["home_score"]
-        away_score = game["away_score"]
-        status = game["status"]
-        home_wins = game["home_wins"]
-        home_losses = game["home_losses"]
-        away_wins = game["away_wins"]
-        away_losses = game["away_losses"]
-        home_l10_wins = game.get("home_l10_wins", 0)
-        away_l10_wins = game.get("away_l10_wins", 0)
-
+        home, away = game.home, game.away
         home_win_prob, away_win_prob = calculate(
-            home_score, away_score,
-            home_wins, home_losses, away_wins, away_losses,
-            home_l10_wins, away_l10_wins,
-            status,
+            home.score, away.score,
+            home.wins, home.losses, away.wins, away.losses,
+            home.l10_wins, away.l10_wins,
+            game.status,
         )
-        result[game_id] = {
-            "home_win_prob": float(home_win_prob),
-            "away_win_prob": float(away_win_prob),
+        game.home_win_prob, game.away_win_prob = float(home_win_prob), float(away_win_prob)
+        result[game.game_id] = {
+            "home_win_prob": game.home_win_prob,
+            "away_win_prob": game.away_win_prob,
         }
     return result
 
 
-def _get_stat(stats: list, name: str) -> str | None:
-    """Get displayValue for a stat by name."""
-    for s in stats or []:
-        if s.get("name") == name:
-            return s.get("displayValue")
-    return None
-
-
-def _get_leader(leaders: list, stat: str) -> tuple[str | None, str | None]:
-    """Get (name, value) for points/rebounds/assists leader. Value is displayValue string."""
-    for entry in leaders or []:
-        if entry.get("name") == stat and entry.get("leaders"):
-            leader = entry["leaders"][0]
-            name = leader.get("athlete", {}).get("fullName")
-            val = leader.get("displayValue")
-            return name, val
-    return None, None
-
-
-def _quarters_from_linescores(linescores: list) -> tuple[Any, Any, Any, Any]:
-    """Extract Q1-Q4 from linescores. Returns (q1, q2, q3, q4) with 0 for missing."""
-    by_period = {p.get("period"): p.get("value") for p in (linescores or []) if p.get("period") <= 4}
-    return (
-        by_period.get(1),
-        by_period.get(2),
-        by_period.get(3),
-        by_period.get(4),
-    )
+def parse_scoreboard(events: list[dict[str, Any]]) -> list[GameState]:
+    """One GameState per usable event, each walked once (see models/game_state.py)."""
+    games = []
+    for event in events:
+        game = GameState.from_event(event)
+        if game is not None:
+            games.append(game)
+    return games
 
 
 def parse_game_data(event: dict[str, Any]) -> dict[str, Any] | None:
@@ -214,96 +251,8 @@ def parse_game_data(event: dict[str, Any]) -> dict[str, Any] | None:
     Parse game data from ESPN scoreboard API event.
     Returns dictionary with team names, scores, points per quarter, status, team leaders, abbreviations, records.
     """
-    comps = event.get("competitions") or []
-    if not comps:
-        return None
-    comp = comps[0]
-    competitors = comp.get("competitors") or []
-    home = next((c for c in competitors if c.get("homeAway") == "home"), None)
-    away = next((c for c in competitors if c.get("homeAway") == "away"), None)
-    if not home or not away:
-        return None
-
-    status_obj = comp.get("status") or {}
-    status = status_obj.get("type", {}).get("shortDetail") or status_obj.get("type", {}).get("description") or ""
-
-    def _parse_records(records: list) -> tuple[int, int]:
-        rec = next((r for r in (records or []) if r.get("name") == "overall" or r.get("type") == "total"), None)
-        summary = (rec or {}).get("summary", "") or ""
-        parts = summary.split("-")
-        if len(parts) != 2:
-            return 0, 0
-        try:
-            return int(parts[0].strip()), int(parts[1].strip())
-        except ValueError:
-            return 0, 0
-
-    def _team(c: dict) -> dict:
-        t = c.get("team") or {}
-        stats_list = c.get("statistics") or c.get("stats") or []
-        leaders = c.get("leaders") or []
-        wins, losses = _parse_records(c.get("records"))
-        pts_name, pts_val = _get_leader(leaders, "points")
-        reb_name, reb_val = _get_leader(leaders, "rebounds")
-        ast_name, ast_val = _get_leader(leaders, "assists")
-        q1, q2, q3, q4 = _quarters_from_linescores(c.get("linescores"))
-        return {
-            "team_name": t.get("shortDisplayName") or t.get("name", ""),
-            "city": t.get("location", ""),
-            "abbreviation": t.get("abbreviation", ""),
-            "wins": wins,
-            "losses": losses,
-            "score": int(c.get("score", 0) or 0),
-            "q1": q1, "q2": q2, "q3": q3, "q4": q4,
-            "reb": _get_stat(stats_list, "rebounds"),
-            "ast": _get_stat(stats_list, "assists"),
-            "fga": _get_stat(stats_list, "fieldGoalsAttempted"),
-            "fgm": _get_stat(stats_list, "fieldGoalsMade"),
-            "fta": _get_stat(stats_list, "freeThrowsAttempted"),
-            "ftm": _get_stat(stats_list, "freeThrowsMade"),
-            "points": _get_stat(stats_list, "points"),
-            "three_pa": _get_stat(stats_list, "threePointFieldGoalsAttempted"),
-            "three_pm": _get_stat(stats_list, "threePointFieldGoalsMade"),
-            "leader_pts_name": pts_name, "leader_pts_val": pts_val,
-            "leader_reb_name": reb_name, "leader_reb_val": reb_val,
-            "leader_ast_name": ast_name, "leader_ast_val": ast_val,
-        }
-
-    h, a = _team(home), _team(away)
-
-    def _team_slice(team: dict, prefix: str) -> dict:
-        return {
-            f"{prefix}_team": team["team_name"],
-            f"{prefix}_city": team["city"],
-            f"{prefix}_abbreviation": team["abbreviation"],
-            f"{prefix}_wins": team["wins"],
-            f"{prefix}_losses": team["losses"],
-            f"{prefix}_score": team["score"],
-            f"{prefix}_q1": team["q1"], f"{prefix}_q2": team["q2"],
-            f"{prefix}_q3": team["q3"], f"{prefix}_q4": team["q4"],
-            f"{prefix}_leader_pts_name": team["leader_pts_name"],
-            f"{prefix}_leader_pts_val": team["leader_pts_val"],
-            f"{prefix}_leader_reb_name": team["leader_reb_name"],
-            f"{prefix}_leader_reb_val": team["leader_reb_val"],
-            f"{prefix}_leader_ast_name": team["leader_ast_name"],
-            f"{prefix}_leader_ast_val": team["leader_ast_val"],
-            f"{prefix}_reb": team.get("reb"),
-            f"{prefix}_ast": team.get("ast"),
-            f"{prefix}_fga": team.get("fga"),
-            f"{prefix}_fgm": team.get("fgm"),
-            f"{prefix}_fta": team.get("fta"),
-            f"{prefix}_ftm": team.get("ftm"),
-            f"{prefix}_points": team.get("points"),
-            f"{prefix}_3pa": team.get("three_pa"),
-            f"{prefix}_3pm": team.get("three_pm"),
-        }
-
-    return {
-        "game_id": event.get("id", ""),
-        "status": status,
-        **_team_slice(h, "home"),
-        **_team_slice(a, "away"),
-    }
+    game = GameState.from_event(event)
+    return game.full_dict(extras=False) if game else None
 
 def merge_gp(g: list[dict[str, Any]], p: dict[str, dict[str, float]]) -> list[dict[str, Any]]:
     """
@@ -323,60 +272,8 @@ def merge_gp(g: list[dict[str, Any]], p: dict[str, dict[str, float]]) -> list[di
 def parse_dashboard_game_data(event: dict[str, Any]) -> dict[str, Any] | None:
     """
     Parse lightweight game data for dashboard display.
-    Returns only: game_id, status, team names, abbreviations, records, scores.
+    Returns only: game_id, status, start time (UTC ISO), team names, abbreviations, records, scores.
     This is a minimal subset compared to parse_game_data().
     """
-    comps = event.get("competitions") or []
-    if not comps:
-        return None
-    comp = comps[0]
-    competitors = comp.get("competitors") or []
-    home = next((c for c in competitors if c.get("homeAway") == "home"), None)
-    away = next((c for c in competitors if c.get("homeAway") == "away"), None)
-    if not home or not away:
-        return None
-
-    status_obj = comp.get("status") or {}
-    status = status_obj.get("type", {}).get("shortDetail") or status_obj.get("type", {}).get("description") or ""
-
-    def _parse_records(records: list) -> tuple[int, int]:
-        rec = next((r for r in (records or []) if r.get("name") == "overall" or r.get("type") == "total"), None)
-        summary = (rec or {}).get("summary", "") or ""
-        parts = summary.split("-")
-        if len(parts) != 2:
-            return 0, 0
-        try:
-            return int(parts[0].strip()), int(parts[1].strip())
-        except ValueError:
-            return 0, 0
-
-    def _team_dashboard(c: dict) -> dict:
-        t = c.get("team") or {}
-        wins, losses = _parse_records(c.get("records"))
-        return {
-            "team_name": t.get("shortDisplayName") or t.get("name", ""),
-            "city": t.get("location", ""),
-            "abbreviation": t.get("abbreviation", ""),
-            "wins": wins,
-            "losses": losses,
-            "score": int(c.get("score", 0) or 0),
-        }
-
-    h, a = _team_dashboard(home), _team_dashboard(away)
-
-    return {
-        "game_id": event.get("id", ""),
-        "status": status,
-        "home_team": h["team_name"],
-        "home_city": h["city"],
-        "home_abbreviation": h["abbreviation"],
-        "home_wins": h["wins"],
-        "home_losses": h["losses"],
-        "home_score": h["score"],
-        "away_team": a["team_name"],
-        "away_city": a["city"],
-        "away_abbreviation": a["abbreviation"],
-        "away_wins": a["wins"],
-        "away_losses": a["losses"],
-        "away_score": a["score"],
-    }
+    game = GameState.from_event(event)
+    return game.dashboard_dict(extras=False) if game else None
@@ -0,0 +1,104 @@
+"""
+Wire formats for /ws, negotiated with the WebSocket subprotocol header.
+
+- "json" (default; also used when the client asks for nothing we know): text frames,
+  the same JSON the socket has always sent.
+- "msgpack.v1": binary MessagePack frames. Game dicts are keyed by field ID, an index
+  into FIELDS, instead of the long "home_leader_pts_name"-style names; the first frame
+  is {"type": "schema", "version": 1, "fields": [...]} so clients never hardcode IDs.
+  Keys not in FIELDS stay strings.
+- "msgpack.v1+zlib": the same MessagePack frames, zlib-compressed once per update.
+  Clients using it should not also offer permessage-deflate.
+
+permessage-deflate itself is negotiated by the server (uvicorn enables it by default,
+`--ws-per-message-deflate false` turns it off). It compresses per connection, so every
+format here is encoded once per update and the same frame object is sent to every
+client on that format; the binary formats shrink what each connection compresses, and
+the +zlib one skips per-connection compression entirely.
+
+MessagePack is optional: without the msgpack package only "json" is offered.
+"""
+import json
+import zlib
+from typing import Any
+
+from models.game_state import GameState
+
+try:
+    import msgpack
+except ImportError:  # binary formats disabled
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack.v1"
+MSGPACK_ZLIB = "msgpack.v1+zlib"
+
+SCHEMA_VERSION = 1
+# Field IDs are positions in this tuple: append only, and bump SCHEMA_VERSION if that's not possible
+FIELDS: tuple[str, ...] = tuple(dict.fromkeys(GameState.DASHBOARD_KEYS + GameState.FULL_KEYS))
+_FIELD_IDS = {name: i for i, name in enumerate(FIELDS)}
+
+
+def available_formats() -> tuple[str, ...]:
+    return (JSON, MSGPACK, MSGPACK_ZLIB) if msgpack is not None else (JSON,)
+
+
+def negotiate(requested: list[str]) -> str | None:
+    """First subprotocol the client offered that we speak; None means plain JSON, no subprotocol."""
+    formats = available_formats()
+    return next((p for p in requested if p in formats), None)
+
+
+def _compact(game: dict[str, Any]) -> dict[Any, Any]:
+    ids = _FIELD_IDS
+    return {ids.get(k, k): v for k, v in game.items()}
+
+
+def _pack(obj: Any, fmt: str) -> bytes:
+    packed = msgpack.packb(obj, use_bin_type=True)
+    return zlib.compress(packed) if fmt == MSGPACK_ZLIB else packed
+
+
+def encode(message: Any, fmt: str) -> str | bytes:
+    """A control message ({"type": ...}); a game under "data" is field-ID keyed in binary formats."""
+    if fmt == JSON:
+        return json.dumps(message)
+    if isinstance(message.get("data"), dict):
+        message = {**message, "data": _compact(message["data"])}
+    return _pack(message, fmt)
+
+
+def encode_games(games: list[dict[str, Any]], fmt: str) -> str | bytes:
+    """The dashboard payload: a bare array of game dicts."""
+    if fmt == JSON:
+        return json.dumps(games)
+    return _pack([_compact(g) for g in games], fmt)
+
+
+def schema_message() -> dict[str, Any]:
+    return {"type": "schema", "version": SCHEMA_VERSION, "fields": list(FIELDS)}
+
+
+def decode(frame: str | bytes, fmt: str) -> Any:
+    """Inverse of encode/encode_games with field IDs expanded back to names (for tools and tests)."""
+    if fmt == JSON:
+        return json.loads(frame)
+    if fmt == MSGPACK_ZLIB:
+        frame = zlib.decompress(frame)
+    obj = msgpack.unpackb(frame, raw=False, strict_map_key=False)
+
+    def expand(game: dict) -> dict:
+        return {FIELDS[k] if isinstance(k, int) else k: v for k, v in game.items()}
+
+    if isinstance(obj, list):
+        return [expand(g) for g in obj]
+    if isinstance(obj.get("data"), dict):
+        obj["data"] = expand(obj["data"])
+    return obj
+
+
+async def send(websocket: Any, frame: str | bytes) -> None:
+    if isinstance(frame, bytes):
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
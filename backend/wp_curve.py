@@ -0,0 +1,282 @@
+"""
+Full-game win probability curves from NBA CDN play-by-play.
+
+For a game we:
+1. fetch (or load from the scraper cache) its play-by-play,
+2. turn all actions into feature rows at once (pbp.actions_frame) and keep one row
+   per game second,
+3. add the teams' records and L10 as of the game date from the team-form store,
+4. score every row in a single model call.
+
+Curves are cached per game. Final games are computed once; for live games the next
+request only parses and scores actions after the last processed actionNumber and
+appends them to the cached curve. extend_live() does the same for several live games
+at once (live_pbp.py), scoring all their new plays in a single model call.
+
+Output shape (columnar, percentages like home_win_prob elsewhere):
+{
+    "game_id": "0022500788", "home_abbreviation": "GSW", "away_abbreviation": "SAS",
+    "final": false, "last_action_number": 412,
+    "elapsed": [...], "seconds_remaining": [...], "home_score": [...], "away_score": [...],
+    "home_win_prob": [...]
+}
+"""
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import requests
+
+from pbp import actions_frame, dedupe_by_elapsed, fetch_boxscore_summary, fetch_playbyplay
+from team_form import get_store, season_for_date
+from metrics import CACHE_REQUESTS, INFERENCE_LATENCY
+from util import FEATURE_COLS, _load_wp_model, live_model_name, predict_home_win_proba
+
+_MAX_CACHED_CURVES = 256
+
+
+class _Curve:
+    __slots__ = (
+        "game_id", "home", "away", "records", "final", "last_action_number",
+        "elapsed", "seconds_remaining", "home_score", "away_score", "home_win_prob",
+    )
+
+    def __init__(self, game_id: str, home: str, away: str, records: tuple[int, ...], final: bool):
+        self.game_id = game_id
+        self.home = home
+        self.away = away
+        # (home_wins, home_losses, away_wins, away_losses, home_l10_wins, away_l10_wins)
+        self.records = records
+        self.final = final
+        self.last_action_number = 0
+        self.elapsed: list[int] = []
+        self.seconds_remaining: list[int] = []
+        self.home_score: list[int] = []
+        self.away_score: list[int] = []
+        self.home_win_prob: list[float] = []
+
+    def latest(self) -> dict[str, Any]:
+        """The newest point of the curve."""
+        return {
+            "last_action_number": self.last_action_number,
+            "seconds_remaining": self.seconds_remaining[-1],
+            "home_score": self.home_score[-1],
+            "away_score": self.away_score[-1],
+            "home_win_prob": self.home_win_prob[-1],
+        }
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "game_id": self.game_id,
+            "home_abbreviation": self.home,
+            "away_abbreviation": self.away,
+            "final": self.final,
+            "last_action_number": self.last_action_number,
+            "elapsed": self.elapsed,
+            "seconds_remaining": self.seconds_remaining,
+            "home_score": self.home_score,
+            "away_score": self.away_score,
+            "home_win_prob": self.home_win_prob,
+        }
+
+
+_curves: "OrderedDict[str, _Curve]" = OrderedDict()
+_curves_lock = threading.Lock()
+_game_locks: dict[str, threading.Lock] = {}
+# Threads holding or waiting on each game's lock; a lock in use is never dropped
+_lock_users: dict[str, int] = {}
+
+
+@contextmanager
+def _locked(game_ids: list[str]):
+    """
+    Hold the locks of these games, taken in game ID order. A game's lock is dropped only
+    once no thread holds or waits on it and its curve is no longer cached, so two
+    threads can never end up with different locks for the same game.
+    """
+    game_ids = sorted(game_ids)
+    with _curves_lock:
+        locks = [_game_locks.setdefault(game_id, threading.Lock()) for game_id in game_ids]
+        for game_id in game_ids:
+            _lock_users[game_id] = _lock_users.get(game_id, 0) + 1
+    try:
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in locks:
+                lock.release()
+    finally:
+        with _curves_lock:
+            for game_id in game_ids:
+                _lock_users[game_id] -= 1
+                if not _lock_users[game_id]:
+                    del _lock_users[game_id]
+                    if game_id not in _curves:
+                        _game_locks.pop(game_id, None)
+
+
+def _new_curve(game_id: str) -> _Curve:
+    summary = fetch_boxscore_summary(game_id)
+    home, away = summary["home_abbreviation"], summary["away_abbreviation"]
+    tipoff = summary["game_time_utc"]
+    if tipoff:
+        game_day = datetime.fromisoformat(tipoff.replace("Z", "+00:00")).astimezone(ZoneInfo("America/New_York")).date()
+    else:
+        game_day = datetime.now(ZoneInfo("America/New_York")).date()
+    store = get_store(season_for_date(game_day))
+    hw, hl, hl10, _ = store.as_of(home, game_day)
+    aw, al, al10, _ = store.as_of(away, game_day)
+    return _Curve(game_id, home, away, (hw, hl, aw, al, hl10, al10), final=summary["game_status"] == 3)
+
+
+def _is_game_end(action: dict[str, Any]) -> bool:
+    return action.get("actionType") == "game" and action.get("subType") == "end"
+
+
+# New plays for a curve: one row per game second, the last action number they reach,
+# and whether they include the end of the game
+_Batch = tuple[pd.DataFrame, int, bool]
+
+
+def _new_rows(curve: _Curve, actions: list[dict[str, Any]]) -> _Batch | None:
+    """
+    The actions after curve.last_action_number (None if there are none). The curve is
+    left as it is: _append() commits the batch once its rows have been scored, so a
+    failed model call leaves the plays to be picked up again.
+    """
+    new_actions = [a for a in actions if (a.get("actionNumber") or 0) > curve.last_action_number]
+    if not new_actions:
+        return None
+    last = max(a.get("actionNumber") or 0 for a in new_actions)
+    ended = curve.final or any(_is_game_end(a) for a in new_actions)
+    return dedupe_by_elapsed(actions_frame(new_actions)), last, ended
+
+
+def _features(curve: _Curve, frame: pd.DataFrame) -> pd.DataFrame:
+    hw, hl, aw, al, hl10, al10 = curve.records
+    return pd.DataFrame({
+        "SECONDS_REMAINING": frame["SECONDS_REMAINING"],
+        "HOME_SCORE": frame["HOME_SCORE"],
+        "AWAY_SCORE": frame["AWAY_SCORE"],
+        "HOME_WINS": hw, "HOME_LOSSES": hl, "AWAY_WINS": aw, "AWAY_LOSSES": al,
+        "HOME_L10_WINS": hl10, "AWAY_L10_WINS": al10,
+    }, columns=FEATURE_COLS)
+
+
+def _model():
+    model = _load_wp_model()
+    if model is None:
+        raise RuntimeError("No win probability model available")
+    return model
+
+
+def _extend(curve: _Curve, actions: list[dict[str, Any]]) -> None:
+    """Score the actions after curve.last_action_number and append them to the curve."""
+    batch = _new_rows(curve, actions)
+    if batch is None:
+        return
+    frame = batch[0]
+    probs = np.empty(0)
+    if not frame.empty:
+        model = _model()
+        with INFERENCE_LATENCY.time(live_model_name(), "wp_curve"):
+            probs = (predict_home_win_proba(model, _features(curve, frame)) * 100).round(2)
+    _append(curve, batch, probs)
+
+
+def _append(curve: _Curve, batch: _Batch, probs: np.ndarray) -> None:
+    """Add a scored batch to the curve and move last_action_number past it."""
+    frame, last, ended = batch
+    if not frame.empty:
+        # The previous batch may have ended mid-second; the newer action wins
+        if curve.elapsed and curve.elapsed[-1] == int(frame["ELAPSED"].iloc[0]):
+            for col in (curve.elapsed, curve.seconds_remaining, curve.home_score, curve.away_score, curve.home_win_prob):
+                col.pop()
+        curve.elapsed.extend(frame["ELAPSED"].tolist())
+        curve.seconds_remaining.extend(frame["SECONDS_REMAINING"].tolist())
+        curve.home_score.extend(frame["HOME_SCORE"].tolist())
+        curve.away_score.extend(frame["AWAY_SCORE"].tolist())
+        curve.home_win_prob.extend(probs.tolist())
+    curve.last_action_number = last
+    curve.final = ended
+
+    # Same convention as calculate(): a finished game is 100/0
+    if curve.final and curve.home_score and curve.home_score[-1] != curve.away_score[-1]:
+        curve.home_win_prob[-1] = 100.0 if curve.home_score[-1] > curve.away_score[-1] else 0.0
+
+
+def get_wp_curve(game_id: str) -> dict[str, Any]:
+    """
+    Win probability curve for an NBA game ID, computing or extending the cached curve.
+    Raises requests.HTTPError if the CDN has no such game.
+    """
+    with _locked([game_id]):
+        with _curves_lock:
+            curve = _curves.get(game_id)
+            if curve is not None:
+                _curves.move_to_end(game_id)
+        if curve is not None and curve.final:
+            CACHE_REQUESTS.inc("wp_curve", "hit")
+            return curve.to_json()
+        CACHE_REQUESTS.inc("wp_curve", "miss")
+
+        if curve is None:
+            curve = _new_curve(game_id)
+        _extend(curve, fetch_playbyplay(game_id, use_cache=curve.final))
+        _remember(curve)
+        return curve.to_json()
+
+
+def _remember(curve: _Curve) -> None:
+    with _curves_lock:
+        _curves[curve.game_id] = curve
+        _curves.move_to_end(curve.game_id)
+        while len(_curves) > _MAX_CACHED_CURVES:
+            evicted, _ = _curves.popitem(last=False)
+            if evicted not in _lock_users:
+                _game_locks.pop(evicted, None)
+
+
+def extend_live(actions_by_game: dict[str, list[dict[str, Any]]]) -> dict[str, dict[str, Any]]:
+    """
+    Extend the curves of several games (NBA game ID -> the feed's actions), scoring the
+    new plays of all of them in one model call. Returns the latest point (see
+    _Curve.latest) of each game that got new plays.
+    """
+    model = _model()
+    game_ids = sorted(actions_by_game)
+    with _locked(game_ids):
+        pending: list[tuple[_Curve, _Batch]] = []
+        for game_id in game_ids:
+            with _curves_lock:
+                curve = _curves.get(game_id)
+            if curve is None:
+                try:
+                    curve = _new_curve(game_id)
+                except requests.exceptions.RequestException as e:
+                    print(f"wp curve {game_id}: boxscore fetch failed: {e}")
+                    continue
+            batch = _new_rows(curve, actions_by_game[game_id])
+            if batch is not None and batch[0].empty:
+                _append(curve, batch, np.empty(0))  # nothing to score
+            elif batch is not None:
+                pending.append((curve, batch))
+            _remember(curve)
+        if not pending:
+            return {}
+
+        X = pd.concat([_features(curve, frame) for curve, (frame, _, _) in pending], ignore_index=True)
+        with INFERENCE_LATENCY.time(live_model_name(), "live_pbp"):
+            probs = (predict_home_win_proba(model, X) * 100).round(2)
+        start = 0
+        for curve, batch in pending:
+            _append(curve, batch, probs[start:start + len(batch[0])])
+            start += len(batch[0])
+        return {curve.game_id: curve.latest() for curve, _ in pending}
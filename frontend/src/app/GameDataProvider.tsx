@@ -18,21 +18,34 @@ const MAX_RECONNECT_ATTEMPTS = 10;
 
 type GameDataContextValue = {
   games: Game[];
+  // full-stats views of the games subscribed to with subscribeGame, by game_id
+  details: Record<string, Game>;
   status: ConnectionStatus;
   error: string | null;
   reconnect: () => void;
+  subscribeGame: (gameId: string) => () => void;
 };
 
 const GameDataContext = createContext<GameDataContextValue | null>(null);
 
 export function GameDataProvider({ children }: { children: React.ReactNode }) {
   const [games, setGames] = useState<Game[]>([]);
+  const [details, setDetails] = useState<Record<string, Game>>({});
   const [status, setStatus] = useState<ConnectionStatus>("connecting");
   const [error, setError] = useState<string | null>(null);
 
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
   const reconnectAttemptsRef = useRef(0);
+  // game_id -> number of mounted components subscribed to it
+  const subscriptionsRef = useRef<Map<string, number>>(new Map());
+
+  const send = useCallback((command: object) => {
+    const ws = wsRef.current;
+    if (ws && ws.readyState === WebSocket.OPEN) {
+      ws.send(JSON.stringify(command));
+    }
+  }, []);
 
   // used for initial data population
   const fetchGames = useCallback(async () => {
@@ -60,12 +73,23 @@ export function GameDataProvider({ children }: { children: React.ReactNode }) {
         setStatus("connected");
         setError(null);
         reconnectAttemptsRef.current = 0;
+        // subscriptions are per connection, so renew them after a reconnect
+        const gameIds = Array.from(subscriptionsRef.current.keys());
+        if (gameIds.length) {
+          ws.send(JSON.stringify({ action: "subscribe", game_ids: gameIds }));
+        }
       };
 
       ws.onmessage = (event) => {
         try {
           const data = JSON.parse(event.data);
-          setGames(data);
+          if (Array.isArray(data)) {
+            setGames(data);
+          } else if (data?.type === "game") {
+            setDetails((prev) => ({ ...prev, [data.game_id]: data.data }));
+          } else if (data?.type === "error") {
+            console.error("Subscription error:", data.detail, data.game_id);
+          }
         } catch (err) {
           console.error("Failed to parse game data:", err);
           setError("Failed to parse game data");
@@ -108,6 +132,33 @@ export function GameDataProvider({ children }: { children: React.ReactNode }) {
     connect();
   }, [connect]);
 
+  // push the game's full-stats view into `details` while the caller is mounted;
+  // returns the matching unsubscribe
+  const subscribeGame = useCallback(
+    (gameId: string) => {
+      const subs = subscriptionsRef.current;
+      const count = subs.get(gameId) ?? 0;
+      subs.set(gameId, count + 1);
+      if (count === 0) send({ action: "subscribe", game_id: gameId });
+
+      return () => {
+        const left = (subs.get(gameId) ?? 1) - 1;
+        if (left > 0) {
+          subs.set(gameId, left);
+          return;
+        }
+        subs.delete(gameId);
+        send({ action: "unsubscribe", game_id: gameId });
+        setDetails((prev) => {
+          const next = { ...prev };
+          delete next[gameId];
+          return next;
+        });
+      };
+    },
+    [send],
+  );
+
   useEffect(() => {
     fetchGames();
   }, [fetchGames]);
@@ -127,9 +178,11 @@ export function GameDataProvider({ children }: { children: React.ReactNode }) {
 
   const value: GameDataContextValue = {
     games,
+    details,
     status,
     error,
     reconnect,
+    subscribeGame,
   };
 
   return (
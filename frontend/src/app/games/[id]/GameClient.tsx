@@ -1,5 +1,6 @@
 'use client';
 
+import { useEffect } from "react";
 import Image from "next/image";
 import { Game } from '@/app/types';
 import { useGameData } from '@/app/GameDataProvider';
@@ -7,10 +8,11 @@ import { mockGames } from '../mock';
 
 export default function GameClient({ id }: { id: string }) {
     const imgSize = 150;
-    let { games, status, error } = useGameData();
+    let { games, details, status, error, subscribeGame } = useGameData();
+    // box score pushed over /ws instead of polling /api/games/stats/{id}
+    useEffect(() => subscribeGame(id), [id, subscribeGame]);
     if (!games.length) games = mockGames;
-    console.log(games[0].game_id, id);
-    const game: Game | undefined = games.find((g) => g.game_id === id);
+    const game: Game | undefined = details[id] ?? games.find((g) => g.game_id === id);
     if (!game) {
         
     }
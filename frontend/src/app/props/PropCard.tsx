@@ -1,40 +1,49 @@
-type Prop = {
+// One entry of GET /api/props results (backend/props.py)
+type PropLine = {
+  line: number;
+  over_prob: number;
+  under_prob: number;
+  over_odds: number | null;
+  under_odds: number | null;
+};
+
+export type StatKey = "pts" | "reb" | "ast";
+
+export type PlayerProp = {
+  game_id: string;
   player: string;
   team: string;
   opponent: string;
+  status: string;
+  team_score: number;
+  opp_score: number;
 
-  projected: {
-    pts: number;
-    reb: number;
-    ast: number;
-  };
+  // only the stats the player currently leads their team in
+  projected: Partial<Record<StatKey, number>>;
+  props: Partial<
+    Record<StatKey, { current: number; projected: number; lines: PropLine[] }>
+  >;
+};
 
-  onFloor: boolean;
+const STATS: StatKey[] = ["pts", "reb", "ast"];
 
-  game: {
-    teamScore: number;
-    oppScore: number;
-    quarter: string;
-    clock: string;
-  };
-};
+function formatOdds(odds: number | null) {
+  if (odds === null) return "-";
+  return odds > 0 ? `+${odds}` : `${odds}`;
+}
 
-function FloorIndicator({ on }: { on: boolean }) {
-  return (
-    <div className="flex items-center gap-2 text-xs font-medium">
-      <span
-        className={`h-2.5 w-2.5 rounded-full ${
-          on ? "bg-emerald-500" : "bg-zinc-300"
-        }`}
-      />
-      <span className={on ? "text-emerald-600" : "text-zinc-500"}>
-        {on ? "On floor" : "Off floor"}
-      </span>
-    </div>
+// the half-point line closest to the projection
+function nearestLine(data: PlayerProp, stat: StatKey): PropLine | undefined {
+  const prop = data.props[stat];
+  if (!prop || !prop.lines.length) return undefined;
+  return prop.lines.reduce((best, l) =>
+    Math.abs(l.line - prop.projected) < Math.abs(best.line - prop.projected)
+      ? l
+      : best,
   );
 }
 
-export default function PlayerPropCard({ data }: { data: Prop }) {
+export default function PlayerPropCard({ data }: { data: PlayerProp }) {
   return (
     <div className="w-full max-w-md rounded-2xl border border-zinc-200 bg-white p-4 shadow-sm">
       {/* Header */}
@@ -48,7 +57,7 @@ export default function PlayerPropCard({ data }: { data: Prop }) {
           </div>
         </div>
 
-        <FloorIndicator on={data.onFloor} />
+        <div className="text-xs font-medium text-zinc-500">{data.status}</div>
       </div>
 
       {/* Projected Stats */}
@@ -60,24 +69,23 @@ export default function PlayerPropCard({ data }: { data: Prop }) {
           <div className="mt-3 h-px w-full bg-zinc-200" />
         </div>
         <div className="grid grid-cols-3 gap-4 text-center">
-          <div>
-            <div className="text-xs text-zinc-500">PTS</div>
-            <div className="mt-1 text-xl font-semibold">
-              {data.projected.pts}
-            </div>
-          </div>
-          <div>
-            <div className="text-xs text-zinc-500">REB</div>
-            <div className="mt-1 text-xl font-semibold">
-              {data.projected.reb}
-            </div>
-          </div>
-          <div>
-            <div className="text-xs text-zinc-500">AST</div>
-            <div className="mt-1 text-xl font-semibold">
-              {data.projected.ast}
-            </div>
-          </div>
+          {STATS.map((stat) => {
+            const line = nearestLine(data, stat);
+            return (
+              <div key={stat}>
+                <div className="text-xs uppercase text-zinc-500">{stat}</div>
+                <div className="mt-1 text-xl font-semibold">
+                  {data.projected[stat] ?? "-"}
+                </div>
+                {line && (
+                  <div className="mt-1 text-xs text-zinc-500">
+                    O/U {line.line}: {formatOdds(line.over_odds)} /{" "}
+                    {formatOdds(line.under_odds)}
+                  </div>
+                )}
+              </div>
+            );
+          })}
         </div>
       </div>
 
@@ -85,11 +93,7 @@ export default function PlayerPropCard({ data }: { data: Prop }) {
       <div className="mt-4 flex items-center justify-between text-xs text-zinc-500">
         <span>
           <span className="font-medium text-zinc-600">Game Score:</span>{" "}
-          {data.game.teamScore}–{data.game.oppScore}
-        </span>
-
-        <span>
-          {data.game.quarter} • {data.game.clock}
+          {data.team_score}–{data.opp_score}
         </span>
       </div>
     </div>
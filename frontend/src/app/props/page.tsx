@@ -1,20 +1,45 @@
 "use client";
 
-import { useState, useMemo } from "react";
-import PlayerPropCard from "./PropCard";
-import { mockProps } from "./mock";
+import { useEffect, useState, useMemo } from "react";
+import PlayerPropCard, { type PlayerProp, type StatKey } from "./PropCard";
+import { useGameData } from "../GameDataProvider";
+
+const PROPS_URL = "https://pj09-sports-betting.onrender.com/api/props";
 
 export default function PropsPage() {
+  const [props, setProps] = useState<PlayerProp[]>([]);
+  const [loading, setLoading] = useState(true);
   const [selectedTeam, setSelectedTeam] = useState<string>("All");
   const [selectedCategory, setSelectedCategory] = useState<string>("All");
 
+  // props are repriced on every scoreboard poll, which is also when the
+  // dashboard push arrives, so refetch whenever it does
+  const { games } = useGameData();
+
+  useEffect(() => {
+    async function fetchProps() {
+      try {
+        const res = await fetch(PROPS_URL);
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const json = await res.json();
+        setProps(json?.results ?? []);
+      } catch (error) {
+        console.error("Failed to fetch props:", error);
+      } finally {
+        setLoading(false);
+      }
+    }
+
+    fetchProps();
+  }, [games]);
+
   const uniqueTeams = useMemo(() => {
-    const teams = mockProps.map((p) => p.team);
+    const teams = props.map((p) => p.team);
     return Array.from(new Set(teams)).sort();
-  }, []);
+  }, [props]);
 
   const filteredProps = useMemo(() => {
-    let result = [...mockProps];
+    let result = [...props];
 
     if (selectedTeam !== "All") {
       result = result.filter((p) => p.team === selectedTeam);
@@ -22,13 +47,13 @@ export default function PropsPage() {
 
     if (selectedCategory !== "All") {
       result.sort((a, b) => {
-        const key = selectedCategory.toLowerCase() as "pts" | "reb" | "ast";
-        return b.projected[key] - a.projected[key];
+        const key = selectedCategory.toLowerCase() as StatKey;
+        return (b.projected[key] ?? -1) - (a.projected[key] ?? -1);
       });
     }
 
     return result;
-  }, [selectedTeam, selectedCategory]);
+  }, [props, selectedTeam, selectedCategory]);
 
   const clearFilters = () => {
     setSelectedTeam("All");
@@ -44,7 +69,8 @@ export default function PropsPage() {
               Live Player Props
             </h1>
             <p className="mt-1 text-zinc-600">
-              Check out today&apos;s player props and predictions
+              Projections and lines for each team&apos;s current points,
+              rebounds and assists leaders in games in play
             </p>
           </div>
         </div>
@@ -109,13 +135,17 @@ export default function PropsPage() {
           {filteredProps.length > 0 ? (
             filteredProps.map((player) => (
               <PlayerPropCard
-                key={`${player.player}-${player.team}`}
+                key={`${player.game_id}-${player.player}`}
                 data={player}
               />
             ))
           ) : (
             <div className="col-span-full py-12 text-center text-zinc-500">
-              No props found matching your filters.
+              {loading
+                ? "Loading props..."
+                : props.length
+                  ? "No props found matching your filters."
+                  : "No games in play right now."}
             </div>
           )}
         </div>
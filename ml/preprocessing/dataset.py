@@ -0,0 +1,134 @@
+'''
+Season-partitioned Parquet store for the win probability training data.
+
+Layout (hive partitioning, one small file per game so the scraper can append as
+games finish and a crash never corrupts what was already written):
+
+  ml/datasets/wp/SEASON=2023-24/part-0022300061.parquet
+
+Integer columns are downcast (scores fit in int16, records in int8) which keeps the
+store several times smaller than the old CSV and means readers never re-parse text.
+
+Reading is lazy: load_dataset / iter_batches only touch the columns and seasons you
+ask for, e.g. from a notebook in ml/:
+
+  from preprocessing.dataset import load_dataset, FEATURE_COLS, TARGET_COL
+  gamesDF = load_dataset(columns=FEATURE_COLS + [TARGET_COL], seasons=["2023-24"])
+'''
+
+import os
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DATASETS_DIR = Path(__file__).resolve().parent.parent / "datasets"
+WP_DATASET_DIR = DATASETS_DIR / "wp"
+
+# Features the win probability models are trained on (order matters for the saved models)
+FEATURE_COLS = [
+    "SECONDS_REMAINING", "HOME_SCORE", "AWAY_SCORE",
+    "HOME_WINS", "HOME_LOSSES", "AWAY_WINS", "AWAY_LOSSES",
+    "HOME_L10_WINS", "AWAY_L10_WINS",
+]
+TARGET_COL = "HOME_WIN"
+
+# On-disk schema. SEASON is not stored in the files, it comes from the partition directory.
+SCHEMA = pa.schema([
+    ("GAME_ID", pa.string()),
+    ("PERIOD", pa.int8()),
+    ("SECONDS_REMAINING", pa.int16()),
+    ("HOME_SCORE", pa.int16()),
+    ("AWAY_SCORE", pa.int16()),
+    ("POINT_DIFF", pa.int16()),
+    ("HOME_WIN", pa.int8()),
+    ("HOME_WINS", pa.int8()),
+    ("HOME_LOSSES", pa.int8()),
+    ("AWAY_WINS", pa.int8()),
+    ("AWAY_LOSSES", pa.int8()),
+    ("HOME_L10_WINS", pa.int8()),
+    ("HOME_L10_LOSSES", pa.int8()),
+    ("AWAY_L10_WINS", pa.int8()),
+    ("AWAY_L10_LOSSES", pa.int8()),
+])
+_PARTITIONING = ds.partitioning(pa.schema([("SEASON", pa.string())]), flavor="hive")
+
+
+def _part_path(root: Path, season: str, game_id: str) -> Path:
+    return root / f"SEASON={season}" / f"part-{game_id}.parquet"
+
+
+class DatasetWriter:
+    """
+    Appends one game at a time to the partitioned store. Safe to share between
+    scraper threads: each game goes to its own file via temp file + rename.
+    """
+
+    def __init__(self, root: Path = WP_DATASET_DIR):
+        self.root = Path(root)
+
+    def has_game(self, season: str, game_id: str) -> bool:
+        return _part_path(self.root, season, game_id).is_file()
+
+    def write_game(self, df: pd.DataFrame) -> int:
+        """Write the rows for a single game; returns the number of rows written."""
+        if df.empty:
+            return 0
+        season = str(df["SEASON"].iloc[0])
+        game_id = str(df["GAME_ID"].iloc[0])
+        table = pa.Table.from_pandas(
+            df[SCHEMA.names].astype({f.name: f.type.to_pandas_dtype() for f in SCHEMA if f.name != "GAME_ID"}),
+            schema=SCHEMA,
+            preserve_index=False,
+        )
+        path = _part_path(self.root, season, game_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp{threading.get_ident()}")
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, path)
+        return table.num_rows
+
+
+def open_dataset(root: Path = WP_DATASET_DIR) -> ds.Dataset:
+    return ds.dataset(root, format="parquet", partitioning=_PARTITIONING, exclude_invalid_files=True)
+
+
+def _season_filter(seasons: list[str] | None):
+    if not seasons:
+        return None
+    return ds.field("SEASON").isin(list(seasons))
+
+
+def iter_batches(
+    columns: list[str] | None = None,
+    seasons: list[str] | None = None,
+    batch_size: int = 250_000,
+    root: Path = WP_DATASET_DIR,
+) -> Iterator[pd.DataFrame]:
+    """Stream the dataset as DataFrames of at most `batch_size` rows without loading it all."""
+    scanner = open_dataset(root).scanner(
+        columns=columns, filter=_season_filter(seasons), batch_size=batch_size
+    )
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def load_dataset(
+    columns: list[str] | None = None,
+    seasons: list[str] | None = None,
+    root: Path = WP_DATASET_DIR,
+) -> pd.DataFrame:
+    """Load only the requested columns/seasons into one DataFrame (None means all)."""
+    table = open_dataset(root).to_table(columns=columns, filter=_season_filter(seasons))
+    return table.to_pandas()
+
+
+def list_seasons(root: Path = WP_DATASET_DIR) -> list[str]:
+    if not root.is_dir():
+        return []
+    return sorted(p.name.split("=", 1)[1] for p in root.glob("SEASON=*") if p.is_dir())
@@ -1,71 +1,131 @@
 '''
-This script pulls all the games from the 2022-2023, 2023-2024, and 2024-2025 NBA seasons
+This script pulls all the games from the 2021-22 through 2024-25 NBA seasons
 and pulls the game IDs from every reagular season game from the perspective of the home
 team (nba_api -> leaguegamefinder). Then for every game we pull the play by play data
 directly from the nba.com CDN (content delivery network) playbyplay endpoint and for each
 play we store a row in our final dataset that contains:
-  
+
   GAME_ID | SEASON | PERIOD | SECONDS_REMAINING | HOME_SCORE | AWAY_SCORE | POINT_DIFF | HOME_WINS | HOME_LOSSES | AWAY_WINS | AWAY_LOSSES | HOME_L10_WINS | HOME_L10_LOSSES | AWAY_L10_WINS | AWAY_L10_LOSSES | HOME_WIN
 
-The data for each game is then stored in a CSV in ml/datasets
+The rows for each game are streamed into the season-partitioned Parquet dataset in
+ml/datasets/wp as soon as the game is processed (see dataset.py for the layout and loaders).
 This data is intended to be use to train the win probability model with the 2 seasons intended
 to be training data and the last season to be test data.
 
   GAME_ID, SEASON = Identifiers
   PERIOD, SECONDS_REMAINING, HOME_SCORE, AWAY_SCORE, PINT_DIFF = Features
   HOME_WIN = Target (label)
+
+Raw play-by-play JSON is cached on disk in ml/datasets/pbp_cache (one gzipped file per
+game ID), so reruns only download games that are missing and a crash mid-scrape loses
+nothing that was already fetched. Downloads run on a bounded worker pool that shares a
+token-bucket rate limiter so we don't get throttled by the CDN.
+
+Usage (from ml/preprocessing):
+  python scrape_v1.py --workers 8 --rate 4
 '''
 
+import argparse
+import gzip
+import json
 import os
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 
 import pandas as pd
 import requests
 from nba_api.stats.endpoints import leaguegamefinder
-import threading
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/120.0.0.0 Safari/537.36"
-    ),
-    "Accept": "application/json, text/plain, */*",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Origin": "https://www.nba.com",
-    "Referer": "https://www.nba.com/",
-}
+from dataset import DATASETS_DIR, WP_DATASET_DIR, DatasetWriter
+
+# team form, CDN constants and clock parsing live with the backend so training and live serving share one
+# implementation; pbp_parse and team_form import nothing backend-only
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend"))
+from pbp_parse import CDN_HEADERS, CLOCK_PATTERN, PBP_URL, parse_clock_series, seconds_remaining_in_game  # noqa: E402
+from team_form import TeamFormStore  # noqa: E402
+
+PBP_CACHE_DIR = DATASETS_DIR / "pbp_cache"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows `rate` requests per second on average,
+    with bursts of up to `capacity` requests.
+    """
+
+    def __init__(self, rate: float, capacity: int | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def pbp_cache_path(game_id: str) -> Path:
+    return PBP_CACHE_DIR / f"{game_id}.json.gz"
+
+
+def load_cached_pbp(game_id: str) -> dict | None:
+    """Return the cached raw play-by-play payload for a game, or None if not cached."""
+    path = pbp_cache_path(game_id)
+    if not path.is_file():
+        return None
+    with gzip.open(path, "rb") as f:
+        return json.loads(f.read())
+
+
+def fetch_pbp(game_id: str, session: requests.Session, bucket: TokenBucket) -> dict:
+    """
+    Return the raw play-by-play payload for a game, downloading it only if it is
+    not already in the on-disk cache. Cache writes go through a temp file + rename
+    so an interrupted run never leaves a truncated entry behind.
+    """
+    cached = load_cached_pbp(game_id)
+    if cached is not None:
+        return cached
+
+    bucket.acquire()
+    resp = session.get(PBP_URL.format(game_id=game_id), headers=CDN_HEADERS, timeout=20)
+    resp.raise_for_status()
+    data = resp.json()
+
+    path = pbp_cache_path(game_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".tmp{threading.get_ident()}")
+    with gzip.open(tmp, "wb") as f:
+        f.write(resp.content)
+    os.replace(tmp, path)
+    return data
 
 
 def parse_clock_to_seconds(clock: str | None) -> int | None:
-    if not clock:
+    """Seconds left in the period for one clock; same formats as parse_clock_series, without pandas."""
+    match = CLOCK_PATTERN.match(str(clock).strip()) if clock else None
+    if match is None:
         return None
-    s = str(clock).strip()
-    if s.startswith("PT") and s.endswith("S"):
-        # PT11M32.00S
-        s = s[2:-1]
-        minutes = 0
-        seconds = 0
-        if "M" in s:
-            mins, rest = s.split("M", 1)
-            minutes = int(mins) if mins.isdigit() else 0
-            s = rest
-        if s:
-            try:
-                seconds = int(float(s))
-            except ValueError:
-                seconds = 0
-        return minutes * 60 + seconds
-    if ":" in s:
-        try:
-            mins, secs = s.split(":", 1)
-            return int(mins) * 60 + int(float(secs))
-        except ValueError:
-            return None
-    return None
+    minutes = match["iso_min"] or match["min"] or 0
+    seconds = match["iso_sec"] or match["sec"]
+    return int(minutes) * 60 + int(float(seconds))
 
 
 def build_training_table(
+    actions: list[dict],
     game_id: str,
     season: str,
     home_win: int,
@@ -74,29 +134,14 @@ def build_training_table(
     home_l10: tuple[int, int],
     away_l10: tuple[int, int],
 ) -> pd.DataFrame:
-    url = f"https://cdn.nba.com/static/json/liveData/playbyplay/playbyplay_{game_id}.json"
-    print(url)
-    exit()
-    data = requests.get(url, headers=HEADERS, timeout=20).json()
-    print(data)
-    
-    pbp_df = pd.DataFrame(data["game"]["actions"])
+    pbp_df = pd.DataFrame(actions, columns=["period", "clock", "scoreHome", "scoreAway"])
     pbp_df["PERIOD"] = pd.to_numeric(pbp_df["period"], errors="coerce")
-    pbp_df["CLOCK_SEC"] = pbp_df["clock"].apply(parse_clock_to_seconds)
+    pbp_df["CLOCK_SEC"] = parse_clock_series(pbp_df["clock"])
 
     pbp_df["HOME_SCORE"] = pd.to_numeric(pbp_df["scoreHome"], errors="coerce").ffill()
     pbp_df["AWAY_SCORE"] = pd.to_numeric(pbp_df["scoreAway"], errors="coerce").ffill()
 
-    def total_seconds_remaining(row: pd.Series) -> int | None:
-        if pd.isna(row["PERIOD"]) or pd.isna(row["CLOCK_SEC"]):
-            return None
-        period = int(row["PERIOD"])
-        clock_sec = int(row["CLOCK_SEC"])
-        if period <= 4:
-            return (4 - period) * 12 * 60 + clock_sec
-        return clock_sec
-
-    pbp_df["SECONDS_REMAINING"] = pbp_df.apply(total_seconds_remaining, axis=1)
+    pbp_df["SECONDS_REMAINING"] = seconds_remaining_in_game(pbp_df["PERIOD"], pbp_df["CLOCK_SEC"])
     pbp_df["POINT_DIFF"] = pbp_df["HOME_SCORE"] - pbp_df["AWAY_SCORE"]
 
     out = pbp_df[
@@ -129,102 +174,116 @@ def fetch_games_for_season(season: str) -> pd.DataFrame:
             time.sleep(2 * attempt)
     raise RuntimeError("LeagueGameFinder failed after 3 attempts.")
 
-all_rows = []
-lock = threading.Lock()
 
-def scrape_season(season: str) -> None:
+def build_games_index(season: str) -> pd.DataFrame:
+    """
+    One row per game (home team perspective), sorted by date, with the records each
+    team had *before* the game. This only needs the season game log, not play-by-play,
+    so it runs sequentially up front and the downloads can then go in any order.
+    """
     games_df = fetch_games_for_season(season)
     games_df["SEASON"] = season
     games_df["IS_HOME"] = games_df["MATCHUP"].str.contains("vs", case=False, na=False)
 
     # Get home teams, rename TEAM_ID to HOME_TEAM_ID
-    home_teams = games_df[games_df["IS_HOME"]][["GAME_ID", "TEAM_ID"]].rename(
-        columns={"TEAM_ID": "HOME_TEAM_ID"}
+    home_teams = games_df[games_df["IS_HOME"]][["GAME_ID", "TEAM_ID", "TEAM_ABBREVIATION"]].rename(
+        columns={"TEAM_ID": "HOME_TEAM_ID", "TEAM_ABBREVIATION": "HOME_ABBREV"}
     )
     # Get away teams, rename TEAM_ID to AWAY_TEAM_ID
-    away_teams = games_df[~games_df["IS_HOME"]][["GAME_ID", "TEAM_ID"]].rename(
-        columns={"TEAM_ID": "AWAY_TEAM_ID"}
+    away_teams = games_df[~games_df["IS_HOME"]][["GAME_ID", "TEAM_ID", "TEAM_ABBREVIATION"]].rename(
+        columns={"TEAM_ID": "AWAY_TEAM_ID", "TEAM_ABBREVIATION": "AWAY_ABBREV"}
     )
     # Merge home and away teams on GAME_ID
     games_with_teams = home_teams.merge(away_teams, on="GAME_ID")
 
-    home_rows = games_df[games_df["IS_HOME"]].copy()
+    home_rows = games_df[games_df["IS_HOME"]][["GAME_ID", "SEASON", "GAME_DATE", "WL"]].copy()
     home_rows["HOME_WIN"] = (home_rows["WL"] == "W").astype(int)
     games_index = home_rows.merge(games_with_teams, on="GAME_ID")[
-        ["GAME_ID", "SEASON", "GAME_DATE", "HOME_WIN", "HOME_TEAM_ID", "AWAY_TEAM_ID"]
+        ["GAME_ID", "SEASON", "GAME_DATE", "HOME_WIN", "HOME_TEAM_ID", "AWAY_TEAM_ID", "HOME_ABBREV", "AWAY_ABBREV"]
     ].drop_duplicates("GAME_ID")
     games_index["GAME_DATE"] = pd.to_datetime(games_index["GAME_DATE"])
     games_index = games_index.sort_values("GAME_DATE").reset_index(drop=True)
 
-    # Cumulative W-L and last-10: records each team had *before* this game
-    team_records: dict[int, tuple[int, int]] = {}
-    team_l10: dict[int, list[int]] = {}  # 1=win, 0=loss, oldest to newest
-    total_games = len(games_index)
-    print(f"\nSeason {season}: {total_games} games (sorted by date)")
-
-    for idx, row in games_index.iterrows():
-        game_id = row["GAME_ID"]
-        home_id = int(row["HOME_TEAM_ID"])
-        away_id = int(row["AWAY_TEAM_ID"])
-        home_record = team_records.get(home_id, (0, 0))
-        away_record = team_records.get(away_id, (0, 0))
-        home_recent = team_l10.get(home_id, [])
-        away_recent = team_l10.get(away_id, [])
-        home_l10_record = (sum(home_recent), len(home_recent) - sum(home_recent))
-        away_l10_record = (sum(away_recent), len(away_recent) - sum(away_recent))
-
-        print(f"[{idx + 1}/{total_games}] Fetching {game_id}")
-        try:
-            training_df = build_training_table(
-                game_id=game_id,
-                season=row["SEASON"],
-                home_win=int(row["HOME_WIN"]),
-                home_record=home_record,
-                away_record=away_record,
-                home_l10=home_l10_record,
-                away_l10=away_l10_record,
-            )
-            if not training_df.empty:
-                with lock:
-                    all_rows.append(training_df)
-        except Exception as exc:
-            print(f"Failed {game_id}: {exc}")
+    # Cumulative W-L and last-10 come from the shared team-form store (the same one the
+    # live backend uses): record every result, then read each team's form as of the game date.
+    form = TeamFormStore.load(season)
+    added = 0
+    for row in games_index.itertuples(index=False):
+        added += form.record_game(row.GAME_DATE.date(), row.HOME_ABBREV, row.AWAY_ABBREV, bool(row.HOME_WIN))
+    if added:
+        form.save()
 
-        # Update cumulative records after this game
-        hw, hl = team_records.get(home_id, (0, 0))
-        aw, al = team_records.get(away_id, (0, 0))
-        if row["HOME_WIN"]:
-            team_records[home_id] = (hw + 1, hl)
-            team_records[away_id] = (aw, al + 1)
-        else:
-            team_records[home_id] = (hw, hl + 1)
-            team_records[away_id] = (aw + 1, al)
+    home_forms = [form.as_of(row.HOME_ABBREV, row.GAME_DATE.date()) for row in games_index.itertuples(index=False)]
+    away_forms = [form.as_of(row.AWAY_ABBREV, row.GAME_DATE.date()) for row in games_index.itertuples(index=False)]
+    games_index["HOME_RECORD"] = [(w, l) for w, l, _, _ in home_forms]
+    games_index["AWAY_RECORD"] = [(w, l) for w, l, _, _ in away_forms]
+    games_index["HOME_L10"] = [(w, l) for _, _, w, l in home_forms]
+    games_index["AWAY_L10"] = [(w, l) for _, _, w, l in away_forms]
+    return games_index
 
-        # Update last-10 (append result, keep only last 10)
-        home_result = 1 if row["HOME_WIN"] else 0
-        away_result = 0 if row["HOME_WIN"] else 1
-        team_l10[home_id] = (team_l10.get(home_id, []) + [home_result])[-10:]
-        team_l10[away_id] = (team_l10.get(away_id, []) + [away_result])[-10:]
+
+def scrape_game(row, session: requests.Session, bucket: TokenBucket, writer: DatasetWriter) -> int:
+    """Fetch (or load from cache) one game's play-by-play and append its rows to the store."""
+    data = fetch_pbp(row.GAME_ID, session, bucket)
+    training_df = build_training_table(
+        actions=data["game"]["actions"],
+        game_id=row.GAME_ID,
+        season=row.SEASON,
+        home_win=int(row.HOME_WIN),
+        home_record=row.HOME_RECORD,
+        away_record=row.AWAY_RECORD,
+        home_l10=row.HOME_L10,
+        away_l10=row.AWAY_L10,
+    )
+    return writer.write_game(training_df)
+
+
+def scrape_seasons(seasons: list[str], workers: int, rate: float, writer: DatasetWriter) -> int:
+    """
+    Scrape every game of every season on a pool of `workers` threads sharing one
+    rate limiter, streaming each game's rows to the dataset as soon as it finishes.
+    Games already in the dataset are skipped; games that fail are reported and
+    picked up again on the next run. Returns the number of rows written.
+    """
+    games_index = pd.concat([build_games_index(season) for season in seasons], ignore_index=True)
+    todo = [
+        row for row in games_index.itertuples(index=False)
+        if not writer.has_game(row.SEASON, row.GAME_ID)
+    ]
+    total_games = len(todo)
+    cached = sum(pbp_cache_path(row.GAME_ID).is_file() for row in todo)
+    print(
+        f"{len(games_index)} games across {len(seasons)} seasons: "
+        f"{len(games_index) - total_games} already in dataset, {total_games} to process ({cached} cached)"
+    )
+
+    bucket = TokenBucket(rate)
+    rows_written = 0
+    failed = []
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(scrape_game, row, session, bucket, writer): row.GAME_ID for row in todo}
+        for done, future in enumerate(as_completed(futures), start=1):
+            game_id = futures[future]
+            try:
+                rows_written += future.result()
+            except Exception as exc:
+                failed.append(game_id)
+                print(f"Failed {game_id}: {exc}")
+            if done % 100 == 0 or done == total_games:
+                print(f"[{done}/{total_games}] games processed")
+
+    if failed:
+        print(f"{len(failed)} games failed; rerun to retry them.")
+    return rows_written
 
 
 if __name__ == "__main__":
-    seasons = ["2021-22", "2022-23", "2023-24", "2024-25"]
-    output_csv = "../datasets/training_dataset_4szn_wp.csv"
-
-    threads = []
-    for season in seasons:
-        thread = threading.Thread(target=scrape_season, args=(season,))
-        thread.start()
-        threads.append(thread)
-
-    for thread in threads:
-        thread.join()
-    
-    if all_rows:
-        full_df = pd.concat(all_rows, ignore_index=True)
-        full_df = full_df.sort_values(["SEASON", "GAME_ID"]).reset_index(drop=True)
-        os.makedirs("../datasets", exist_ok=True)
-        full_df.to_csv(output_csv, index=False)
-        print(f"Saved {len(full_df)} rows to {output_csv}")
-    else:
-        print("No rows generated.")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seasons", nargs="+", default=["2021-22", "2022-23", "2023-24", "2024-25"])
+    parser.add_argument("--workers", type=int, default=8, help="max concurrent downloads")
+    parser.add_argument("--rate", type=float, default=4.0, help="max CDN requests per second")
+    parser.add_argument("--output", default=str(WP_DATASET_DIR), help="partitioned Parquet dataset directory")
+    args = parser.parse_args()
+
+    rows = scrape_seasons(args.seasons, args.workers, args.rate, DatasetWriter(Path(args.output)))
+    print(f"Wrote {rows} rows to {args.output}")
@@ -0,0 +1,278 @@
+'''
+Out-of-core training CLI for the win probability models.
+
+Streams the season-partitioned Parquet dataset (preprocessing/dataset.py) in chunks
+instead of loading it into memory like the notebooks do:
+
+1. One pass over the training seasons fits a StandardScaler incrementally.
+2. Every hyperparameter combination is trained in its own process (all cores by
+   default). Estimators with partial_fit (sgd, mlp) see the training seasons chunk by
+   chunk, shuffled within each chunk, for --epochs passes. Those without it (lr) load
+   only the feature columns of the training seasons.
+3. Each trial is scored on the held-out test seasons, again streamed: Brier score,
+   log loss and accuracy. The trial with the lowest log loss wins.
+
+Train and test are split by season (by default the newest season is the test set),
+so no game contributes plays to both.
+
+The winner is saved as a scaler + estimator Pipeline, the same joblib format
+backend/util._load_wp_model loads and predict_home_win_proba scores (FEATURE_COLS in,
+predict_proba out), under a versioned name with its metrics next to it:
+
+  ml/sgd-20260301-142210.joblib
+  ml/sgd-20260301-142210.metrics.json
+
+--promote also copies it over the live model, ml/<WP_MODEL>.joblib (backend/config.py,
+nn by default), which the backend loads on its next start.
+
+Usage (from ml/):
+  python train.py sgd
+  python train.py mlp --test-seasons 2024-25 --param alpha 1e-4 1e-3 --param hidden_layer_sizes "(64,)" "(64, 32)"
+  python train.py lr --workers 4 --promote
+'''
+
+import argparse
+import ast
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from preprocessing.dataset import FEATURE_COLS, TARGET_COL, WP_DATASET_DIR, iter_batches, list_seasons, load_dataset
+
+ML_DIR = Path(__file__).resolve().parent
+CLASSES = np.array([0, 1])
+_EPS = 1e-15
+
+# Estimator factories and the grid searched when no --param is given
+ESTIMATORS: dict[str, tuple[Callable[..., Any], dict[str, list]]] = {
+    "sgd": (
+        lambda **p: SGDClassifier(loss="log_loss", **p),
+        {"alpha": [1e-5, 1e-4, 1e-3], "penalty": ["l2", "elasticnet"]},
+    ),
+    "mlp": (
+        lambda **p: MLPClassifier(**p),
+        {"hidden_layer_sizes": [(32,), (64, 32)], "alpha": [1e-4, 1e-3]},
+    ),
+    "lr": (
+        lambda **p: LogisticRegression(max_iter=3000, **p),
+        {"C": [0.1, 1.0, 10.0]},
+    ),
+}
+
+
+def parse_value(text: str) -> Any:
+    """A --param value as a Python literal (1e-4, "(64, 32)", None), else the string itself."""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def expand_grid(grid: dict[str, list]) -> list[dict[str, Any]]:
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def chunks(columns: list[str], seasons: list[str], batch_size: int, root: Path) -> Iterator[pd.DataFrame]:
+    """
+    The dataset in chunks of about `batch_size` rows. Each game is its own file, so the
+    scanner's batches are single games; they're gathered up so a chunk mixes many games.
+    """
+    pending, rows = [], 0
+    for batch in iter_batches(columns, seasons, batch_size, root):
+        pending.append(batch)
+        rows += len(batch)
+        if rows >= batch_size:
+            yield pd.concat(pending, ignore_index=True)
+            pending, rows = [], 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def fit_scaler(seasons: list[str], batch_size: int, root: Path) -> tuple[StandardScaler, int]:
+    """Feature scaler fitted over every training row in one streaming pass; also returns the row count."""
+    scaler = StandardScaler()
+    rows = 0
+    for batch in chunks(FEATURE_COLS, seasons, batch_size, root):
+        scaler.partial_fit(batch[FEATURE_COLS])
+        rows += len(batch)
+    return scaler, rows
+
+
+def evaluate(model: Pipeline, seasons: list[str], batch_size: int, root: Path) -> dict[str, float]:
+    """Brier score, log loss and accuracy of `model` over `seasons`, streamed."""
+    n = 0
+    brier = log_loss = correct = 0.0
+    for batch in chunks(FEATURE_COLS + [TARGET_COL], seasons, batch_size, root):
+        p = np.clip(model.predict_proba(batch[FEATURE_COLS])[:, 1], _EPS, 1 - _EPS)
+        y = batch[TARGET_COL].to_numpy(dtype=float)
+        n += len(y)
+        brier += float(np.sum((p - y) ** 2))
+        log_loss += float(-np.sum(y * np.log(p) + (1 - y) * np.log(1 - p)))
+        correct += float(np.sum((p >= 0.5) == (y == 1)))
+    n = max(n, 1)
+    return {"rows": n, "brier": brier / n, "log_loss": log_loss / n, "accuracy": correct / n}
+
+
+def run_trial(
+    estimator: str, params: dict[str, Any], scaler: StandardScaler,
+    train_seasons: list[str], test_seasons: list[str],
+    batch_size: int, epochs: int, seed: int, root: Path,
+) -> dict[str, Any]:
+    """Train one configuration and score it on the test seasons (runs in a worker process)."""
+    start = time.perf_counter()
+    clf = ESTIMATORS[estimator][0](**params)
+    if hasattr(clf, "partial_fit"):
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            for batch in chunks(FEATURE_COLS + [TARGET_COL], train_seasons, batch_size, root):
+                order = rng.permutation(len(batch))
+                X = scaler.transform(batch[FEATURE_COLS])[order]
+                clf.partial_fit(X, batch[TARGET_COL].to_numpy()[order], classes=CLASSES)
+    else:
+        data = load_dataset(FEATURE_COLS + [TARGET_COL], train_seasons, root)
+        clf.fit(scaler.transform(data[FEATURE_COLS]), data[TARGET_COL].to_numpy())
+        del data
+    model = Pipeline([("scale", scaler), ("model", clf)])
+    train_seconds = time.perf_counter() - start
+    metrics = evaluate(model, test_seasons, batch_size, root)
+    return {"params": params, "train_seconds": train_seconds, **metrics, "model": model}
+
+
+def split_seasons(
+    available: list[str], train: list[str] | None, test: list[str] | None,
+) -> tuple[list[str], list[str]]:
+    """Train/test seasons: by default the newest season is the test set and the rest train."""
+    test = test or available[-1:]
+    train = train or [s for s in available if s not in test]
+    if not train or not test:
+        raise SystemExit(f"need at least one train and one test season (have {available})")
+    if set(train) & set(test):
+        raise SystemExit(f"seasons in both train and test: {sorted(set(train) & set(test))}")
+    return train, test
+
+
+def train(
+    estimator: str,
+    grid: dict[str, list],
+    train_seasons: list[str],
+    test_seasons: list[str],
+    workers: int,
+    batch_size: int = 250_000,
+    epochs: int = 3,
+    seed: int = 0,
+    root: Path = WP_DATASET_DIR,
+) -> tuple[Pipeline, dict[str, Any]]:
+    """Search `grid` in parallel; returns the best model and the run's metrics report."""
+    started = time.perf_counter()
+    scaler, train_rows = fit_scaler(train_seasons, batch_size, root)
+    trials = expand_grid(grid)
+    print(f"{estimator}: {len(trials)} trials on {train_rows:,} training rows, {min(workers, len(trials))} processes")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(trials))) as pool:
+        futures = [
+            pool.submit(run_trial, estimator, params, scaler, train_seasons, test_seasons, batch_size, epochs, seed, root)
+            for params in trials
+        ]
+        for future in futures:
+            result = future.result()
+            print(f"  {result['params']}: log loss {result['log_loss']:.4f}, brier {result['brier']:.4f}, "
+                  f"accuracy {result['accuracy']:.2%} ({result['train_seconds']:.1f}s)")
+            results.append(result)
+
+    best = min(results, key=lambda r: r["log_loss"])
+    report = {
+        "estimator": estimator,
+        "features": FEATURE_COLS,
+        "train_seasons": train_seasons,
+        "test_seasons": test_seasons,
+        "train_rows": train_rows,
+        "epochs": epochs,
+        "seed": seed,
+        "sklearn": sklearn.__version__,
+        "wall_seconds": time.perf_counter() - started,
+        "best": {k: v for k, v in best.items() if k != "model"},
+        "trials": [{k: v for k, v in r.items() if k != "model"} for r in results],
+    }
+    return best["model"], report
+
+
+def live_model_path() -> Path:
+    """ml/<WP_MODEL>.joblib, the artifact the backend serves."""
+    # Backend-only config (and its dotenv dependency), so only imported when promoting
+    sys.path.insert(0, str(ML_DIR.parent / "backend"))
+    import config
+
+    return ML_DIR / f"{config.WP_MODEL}.joblib"
+
+
+def save(model: Pipeline, report: dict[str, Any], name: str, out_dir: Path = ML_DIR, promote: bool = False) -> tuple[Path, Path | None]:
+    """
+    Write <name>-<timestamp>.joblib and its .metrics.json; with promote, also replace the
+    live model. Returns the versioned path and the promoted one (None without promote).
+    """
+    version = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    path = out_dir / f"{version}.joblib"
+    joblib.dump(model, path)
+    with open(out_dir / f"{version}.metrics.json", "w") as f:
+        json.dump({"version": version, **report}, f, indent=2, default=str)
+    if not promote:
+        return path, None
+    live = live_model_path()
+    tmp = live.with_suffix(".joblib.tmp")
+    shutil.copyfile(path, tmp)
+    os.replace(tmp, live)
+    return path, live
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train a win probability model out of core with a parallel grid search.")
+    parser.add_argument("estimator", choices=sorted(ESTIMATORS))
+    parser.add_argument("--param", nargs="+", action="append", metavar=("NAME", "VALUE"),
+                        help="grid values for one hyperparameter (repeatable); replaces the default grid")
+    parser.add_argument("--train-seasons", nargs="+", help="default: every season not in --test-seasons")
+    parser.add_argument("--test-seasons", nargs="+", help="default: the newest season")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for the search")
+    parser.add_argument("--batch-size", type=int, default=250_000, help="rows per streamed chunk")
+    parser.add_argument("--epochs", type=int, default=3, help="passes over the training data (partial_fit estimators)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--name", help="artifact name (default: the estimator)")
+    parser.add_argument("--data", default=str(WP_DATASET_DIR), help="partitioned Parquet dataset directory")
+    parser.add_argument("--output", default=str(ML_DIR), help="where to write the artifact and metrics")
+    parser.add_argument("--promote", action="store_true", help="also replace the live model, ml/<WP_MODEL>.joblib")
+    args = parser.parse_args()
+
+    root = Path(args.data)
+    train_seasons, test_seasons = split_seasons(list_seasons(root), args.train_seasons, args.test_seasons)
+    grid = ESTIMATORS[args.estimator][1]
+    if args.param:
+        if any(len(p) < 2 for p in args.param):
+            parser.error("--param needs a name and at least one value")
+        grid = {p[0]: [parse_value(v) for v in p[1:]] for p in args.param}
+
+    model, report = train(
+        args.estimator, grid, train_seasons, test_seasons,
+        args.workers, args.batch_size, args.epochs, args.seed, root,
+    )
+    path, live = save(model, report, args.name or args.estimator, Path(args.output), args.promote)
+    best = report["best"]
+    print(f"Best {best['params']}: log loss {best['log_loss']:.4f}, brier {best['brier']:.4f}, "
+          f"accuracy {best['accuracy']:.2%} on {', '.join(test_seasons)}")
+    print(f"Saved {path}" + (f"; promoted to {live} (restart the backend to serve it)" if live else ""))